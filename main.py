@@ -4,6 +4,7 @@
 #  Author: MrAndiGamesDev (Refactored by AI Becuase i dont know much about python)
 # ─────────────────────────────────────────────────────────────────────────────
 import os
+import sys
 import json
 import time
 import signal
@@ -410,7 +411,20 @@ def setup_wizard():
 # ─────────────────────────────────────────────────────────────────────────────
 #  Main
 # ─────────────────────────────────────────────────────────────────────────────
+def read_version() -> str:
+    # Read current version from a file named VERSION in the same directory
+    try:
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "VERSION")) as vf:
+            return vf.read().strip()
+    except (FileNotFoundError, NameError):
+        return "v1.0.0"
+
 def main():
+    # Exits before touching config or the network (used by build benchmarks).
+    if "--version" in sys.argv[1:]:
+        print(read_version())
+        return
+
     config = Config()
 
     # First run?
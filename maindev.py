@@ -4,14 +4,62 @@
 #  Author: MrAndiGamesDev (Refactored by AI Becuase i dont know much about python)
 # ─────────────────────────────────────────────────────────────────────────────
 import os
+import io
+import gc
+import sys
+import shutil
+import csv
 import json
+import zlib
+import struct
+import tempfile
+import tracemalloc
+import cProfile
+import pstats
+import contextlib
+import contextvars
+import http.server
 import time
 import signal
+import socket
+import asyncio
+import heapq
+import queue
+import mmap
+import bisect
+import random
+import sqlite3
+import hashlib
+import argparse
 import threading
+import multiprocessing
 import requests
+from urllib.parse import urlparse
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+try:
+    import aiohttp
+except ImportError:  # Only needed by the asyncio monitor (supervise --async)
+    aiohttp = None
+try:
+    import resource
+except ImportError:  # Windows has no RLIMIT_NOFILE to raise
+    resource = None
+try:
+    import orjson
+except ImportError:  # Optional faster JSON backend; the stdlib one is used otherwise
+    orjson = None
+from array import array
+from collections import deque
+from itertools import accumulate
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeout
 from datetime import datetime, timezone
 from getpass import getpass  # <-- Hides input
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, Optional
 
 # ─────────────────────────────────────────────────────────────────────────────
 #  Configuration
@@ -29,15 +77,68 @@ class Configuration:
         "DISCORD_EMOJI_ID": "",
         "DISCORD_EMOJI_NAME": "",
         "CHECK_INTERVAL": "60",
-        "TOTAL_CHECKS_TYPE": "Day"
+        "ROBUX_INTERVAL": "15",
+        "TOTALS_INTERVAL": "60",
+        "STATUS_INTERVAL": "900",
+        "TOTAL_CHECKS_TYPE": "Day",
+        "TRANSACTION_TYPES": "",
+        "GROUP_IDS": "",
+        "ACCOUNTS": [],
+        "NOTIFY_SINKS": [],
+        "WORKERS": "0",
+        "CLUSTER_DB": "",
+        "HOST_ID": "",
+        "LEASE_TTL": "30",
+        "CYCLE_BUDGET": "30",
+        "HEDGE_REQUESTS": "0",
+        "RULES_FILE": "",
+        "DIGEST_WINDOW": "0"
     }
 
+    TRANSACTION_FIELDS = [
+        "salesTotal", "purchasesTotal", "affiliateSalesTotal", "groupPayoutsTotal",
+        "currencyPurchasesTotal", "premiumStipendsTotal", "tradeSystemEarningsTotal",
+        "tradeSystemCostsTotal", "premiumPayoutsTotal", "groupPremiumPayoutsTotal",
+        "adSpendTotal", "developerExchangeTotal", "pendingRobuxTotal", "incomingRobuxTotal",
+        "outgoingRobuxTotal", "individualToGroupTotal", "csAdjustmentTotal",
+        "adsRevsharePayoutsTotal", "groupAdsRevsharePayoutsTotal", "subscriptionsRevshareTotal",
+        "groupSubscriptionsRevshareTotal", "subscriptionsRevshareOutgoingTotal",
+        "groupSubscriptionsRevshareOutgoingTotal", "publishingAdvanceRebatesTotal",
+        "affiliatePayoutTotal"
+    ]
+
+    # Upper bound on concurrent in-flight requests (and pooled connections).
+    MAX_WORKERS = 8
+
+    # Pooled connections shared by every account in the asyncio monitor.
+    ASYNC_MAX_CONNECTIONS = 100
+
+    # Pages of the per-transaction listing walked per cycle before the walk
+    # is parked on its cursor and resumed next cycle.
+    TRANSACTION_PAGE_SIZE = 100
+    TRANSACTION_MAX_PAGES = 5
+
+    # The GitHub release lookup runs at most once per this many seconds.
+    UPDATE_CHECK_TTL = 24 * 60 * 60
+
+    # A cached user id is trusted for this long before it is revalidated.
+    AUTH_CACHE_TTL = 6 * 60 * 60
+
 # Convenience aliases for backward compatibility
 APP_DIR = Configuration.APP_DIR
 CONFIG_FILE = Configuration.CONFIG_FILE
 STORAGE_DIR = Configuration.STORAGE_DIR
 DEFAULT_CONFIG = Configuration.DEFAULT_CONFIG
+TRANSACTION_PAGE_SIZE = Configuration.TRANSACTION_PAGE_SIZE
+TRANSACTION_MAX_PAGES = Configuration.TRANSACTION_MAX_PAGES
+MAX_WORKERS = Configuration.MAX_WORKERS
+ASYNC_MAX_CONNECTIONS = Configuration.ASYNC_MAX_CONNECTIONS
+TRANSACTION_FIELDS = Configuration.TRANSACTION_FIELDS
+UPDATE_CHECK_TTL = Configuration.UPDATE_CHECK_TTL
+AUTH_CACHE_TTL = Configuration.AUTH_CACHE_TTL
 _last_call = Configuration._LAST_CALL
+_rate_lock = threading.Lock()
+_session = None
 
 # ─────────────────────────────────────────────────────────────────────────────
 #  Terminal Colors
@@ -71,14 +172,482 @@ def censor_cookie(cookie: str) -> str:
 # ─────────────────────────────────────────────────────────────────────────────
 #  Utilities
 # ─────────────────────────────────────────────────────────────────────────────
-def rate_limited_request(*args, **kwargs):
+class Clock:
+    def time(self) -> float:
+        return time.time()
+
+    def sleep(self, seconds: float):
+        time.sleep(seconds)
+
+    def wait(self, event: threading.Event, seconds: float) -> bool:
+        return event.wait(seconds)
+
+    async def asleep(self, seconds: float):
+        await asyncio.sleep(seconds)
+
+    async def wait_async(self, event: asyncio.Event, seconds: float) -> bool:
+        try:
+            await asyncio.wait_for(event.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+        return event.is_set()
+
+class FakeClock(Clock):
+    # Sleeping advances virtual time instantly; used by the soak test.
+    def __init__(self, start: Optional[float] = None):
+        self.now = time.time() if start is None else start
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += max(0.0, seconds)
+
+    def wait(self, event: threading.Event, seconds: float) -> bool:
+        if not event.is_set():
+            self.now += max(0.0, seconds)
+        return event.is_set()
+
+    async def asleep(self, seconds: float):
+        self.sleep(seconds)
+        await asyncio.sleep(0)
+
+    async def wait_async(self, event: asyncio.Event, seconds: float) -> bool:
+        self.wait(event, seconds)
+        await asyncio.sleep(0)
+        return event.is_set()
+
+clock = Clock()
+
+def use_clock(new_clock: Clock) -> Clock:
+    global clock
+    previous, clock = clock, new_clock
+    return previous
+
+def use_app_dir(path: str) -> tuple:
+    # Re-points the module-level paths (used by Config and Storage) at another
+    # data directory; returns the previous values so callers can restore them.
+    global APP_DIR, CONFIG_FILE, STORAGE_DIR
+    previous = (APP_DIR, CONFIG_FILE, STORAGE_DIR)
+    APP_DIR = path
+    CONFIG_FILE = os.path.join(path, "config.json")
+    STORAGE_DIR = os.path.join(path, "transaction_info")
+    return previous
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  Profiling
+# ─────────────────────────────────────────────────────────────────────────────
+class _Phase:
+    __slots__ = ("profiler", "name", "started")
+
+    def __init__(self, profiler: "PhaseProfiler", name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, time.perf_counter() - self.started)
+        return False
+
+_NO_PHASE = contextlib.nullcontext()
+
+class PhaseProfiler:
+    # Off by default: phase() then hands back one shared no-op context, so the
+    # instrumentation left in the hot paths costs a call and an attribute check.
+    RESERVOIR = 2048
+
+    def __init__(self):
+        self.mode = None
+        self._stats = {}
+        # Reentrant: dump() runs from a SIGUSR1 handler, which can interrupt
+        # the main thread while it is inside record().
+        self._lock = threading.RLock()
+        self._cprofile = None
+
+    def enable(self, mode: str):
+        self.mode = mode
+        if mode == "cprofile":
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def phase(self, name: str):
+        if self.mode != "phases":
+            return _NO_PHASE
+        return _Phase(self, name)
+
+    def record(self, name: str, seconds: float):
+        with self._lock:
+            entry = self._stats.get(name)
+            if entry is None:
+                entry = self._stats[name] = [0, 0.0, deque(maxlen=self.RESERVOIR)]
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2].append(seconds)
+
+    def report(self) -> str:
+        if self.mode == "cprofile" and self._cprofile:
+            out = io.StringIO()
+            pstats.Stats(self._cprofile, stream=out).sort_stats("cumulative").print_stats(30)
+            return out.getvalue()
+        lines = [f"{'phase':<20}{'count':>10}{'total s':>12}{'p50 ms':>10}{'p99 ms':>10}"]
+        with self._lock:
+            stats = [(name, count, total, list(recent)) for name, (count, total, recent) in self._stats.items()]
+        for name, count, total, recent in sorted(stats, key=lambda item: item[2], reverse=True):
+            if not recent:
+                continue
+            ordered = sorted(recent)
+            p50 = ordered[len(ordered) // 2] * 1000
+            p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000
+            lines.append(f"{name:<20}{count:>10}{total:>12.3f}{p50:>10.2f}{p99:>10.2f}")
+        return "\n".join(lines)
+
+    def dump(self, signum=None, frame=None):
+        if self.mode:
+            print(f"\n{Colors.CYAN}Profile ({self.mode}):{Colors.RESET}\n{self.report()}", file=sys.stderr)
+
+profiler = PhaseProfiler()
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  JSON Codec
+# ─────────────────────────────────────────────────────────────────────────────
+class JsonCodec:
+    # Compact stdlib encoding; dumps() returns UTF-8 bytes, loads() takes
+    # bytes or str. Files written through the codec are read back in
+    # binary mode.
+    name = "json"
+
+    @staticmethod
+    def loads(data):
+        return json.loads(data)
+
+    @staticmethod
+    def dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+class OrjsonCodec(JsonCodec):
+    name = "orjson"
+
+    @staticmethod
+    def loads(data):
+        return orjson.loads(data)
+
+    @staticmethod
+    def dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+JSON_CODECS = {"json": JsonCodec, "orjson": OrjsonCodec}
+JSON_HEADERS = {"Content-Type": "application/json"}
+codec = OrjsonCodec() if orjson is not None else JsonCodec()
+
+def use_codec(name: str) -> JsonCodec:
+    global codec
+    previous = codec
+    codec = JSON_CODECS[name]()
+    return previous
+
+def decode_json(r):
+    with profiler.phase("json"):
+        return codec.loads(r.content)
+
+def _json_bench_payloads() -> tuple:
+    # One monitor cycle's JSON: the API bodies it decodes, and the journal
+    # records, history rows and notification it encodes. ``state`` is an
+    # auth cache for a 200-account host.
+    item = {"id": 123456789, "idHash": "a1b2c3d4e5f6a1b2c3d4e5f6", "created": "2026-10-19T12:00:00.000Z",
+            "isPending": False, "agent": {"id": 1, "type": "User", "name": "SomeBuyer"},
+            "details": {"id": 42, "name": "Cool Hat", "type": "Asset"}, "currency": {"amount": 75, "type": "Robux"}}
+    totals = {field: i * 1234 for i, field in enumerate(TRANSACTION_FIELDS)}
+    responses = [
+        {"id": 1, "name": "user", "displayName": "User"},
+        {"robux": 123456},
+        totals,
+        {"previousPageCursor": None, "nextPageCursor": "c" * 60, "data": [dict(item, id=i) for i in range(25)]},
+        {"description": "", "created": "2015-01-01T00:00:00Z", "isBanned": False, "id": 1, "name": "user", "displayName": "User"},
+    ]
+    records = [
+        {"k": "robux", "v": 123456},
+        {"k": "transactions", "d": dict(list(totals.items())[:5])},
+        {"ts": 1760000000, "robux": 123456},
+        {"ts": 1760000000, **totals},
+    ]
+    embed = {"embeds": [{
+        "title": "Roblox Transaction Updated",
+        "color": 0x00ff00,
+        "fields": [{"name": f, "value": "From <:robux:1> 1.2K to <:robux:1> 1.3K", "inline": False} for f in TRANSACTION_FIELDS[:10]],
+        "timestamp": "2026-10-19T12:00:00+00:00"
+    }]}
+    state = {f"{i:064x}": {"user_id": i, "validated_at": 1760000000.5} for i in range(200)}
+    return [json.dumps(r).encode() for r in responses], records, embed, state
+
+def run_json_bench(args: argparse.Namespace):
+    bodies, records, embed, state = _json_bench_payloads()
+    responses = []
+    for body in bodies:
+        r = requests.models.Response()
+        r._content, r.status_code = body, 200
+        r.headers["Content-Type"] = "application/json"
+        responses.append(r)
+
+    def timed(func, repeat: int) -> float:
+        begin = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        return (time.perf_counter() - begin) / repeat * 1e6
+
+    cycles, writes = args.cycles, max(1, args.cycles // 20)
+    rows = [("before (r.json, json=, indent=2)",
+             timed(lambda: [r.json() for r in responses], cycles),
+             timed(lambda: ([json.dumps(rec, separators=(",", ":")).encode() for rec in records],
+                            json.dumps(embed, allow_nan=False).encode()), cycles),
+             timed(lambda: json.dumps(state, indent=2).encode(), writes))]
+    previous = codec
+    try:
+        for name in ("json", "orjson"):
+            if name == "orjson" and orjson is None:
+                continue
+            use_codec(name)
+            rows.append((f"codec: {name}",
+                         timed(lambda: [decode_json(r) for r in responses], cycles),
+                         timed(lambda: ([codec.dumps(rec) for rec in records], codec.dumps(embed)), cycles),
+                         timed(lambda: codec.dumps(state), writes)))
+    finally:
+        use_codec(previous.name)
+    print(f"{Colors.CYAN}JSON cost per monitor cycle ({cycles} cycles; state = {len(state)}-entry auth cache){Colors.RESET}")
+    print(f"  {'':<34}{'decode us':>12}{'encode us':>12}{'state us':>12}")
+    for label, decode, encode, write in rows:
+        print(f"  {label:<34}{decode:>12.1f}{encode:>12.1f}{write:>12.1f}")
+    if orjson is None:
+        print(f"{Colors.YELLOW}orjson is not installed (pip install orjson); the stdlib codec is in use.{Colors.RESET}")
+
+def get_session() -> requests.Session:
+    global _session
+    with _rate_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=MAX_WORKERS)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+        return _session
+
+class RequestRateMeter:
+    # Requests asked for per wall-clock second (before the limiter smooths
+    # them out), kept for the last WINDOW seconds. Peak-to-mean over that
+    # window shows how evenly the schedule spreads the load: 1.0 is flat.
+    WINDOW = 600
+
+    def __init__(self):
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def record(self, now: Optional[float] = None):
+        second = int(clock.time() if now is None else now)
+        with self._lock:
+            self._counts[second] = self._counts.get(second, 0) + 1
+            if len(self._counts) > 2 * self.WINDOW:
+                cutoff = second - self.WINDOW
+                self._counts = {k: v for k, v in self._counts.items() if k > cutoff}
+
+    def buckets(self, now: Optional[float] = None) -> dict:
+        cutoff = int(clock.time() if now is None else now) - self.WINDOW
+        with self._lock:
+            return {k: v for k, v in self._counts.items() if k > cutoff}
+
+    @classmethod
+    def smoothness(cls, buckets: dict, now: Optional[float] = None) -> dict:
+        # Idle seconds count as zero; the window starts at the first request
+        # so a fresh process is not diluted by the time before it started.
+        if not buckets:
+            return {"rps_mean": 0.0, "rps_peak": 0, "peak_to_mean": 0.0}
+        now = int(clock.time() if now is None else now)
+        span = max(1, min(cls.WINDOW, now - min(buckets) + 1))
+        mean = sum(buckets.values()) / span
+        peak = max(buckets.values())
+        return {"rps_mean": round(mean, 3), "rps_peak": peak, "peak_to_mean": round(peak / mean, 2)}
+
+request_meter = RequestRateMeter()
+
+def reserve_request_slot() -> float:
+    # Callers reserve the next free one-second slot under the lock and sleep
+    # outside of it, so concurrent callers are spaced out instead of bursting.
+    # Shared by the threaded and asyncio clients; returns the delay to wait.
+    # A slot past the cycle deadline is refused rather than taken and
+    # abandoned, which would waste limiter capacity for everyone else.
     global _last_call
-    now = time.time()
-    sleep = 1.0 - (now - _last_call)
+    request_meter.record()
+    deadline = _deadline.get()
+    with _rate_lock:
+        slot = max(clock.time(), _last_call + 1.0)
+        if deadline is not None and slot >= deadline:
+            raise DeadlineExceeded("no rate-limit slot left before the cycle deadline")
+        _last_call = slot
+    return slot - clock.time()
+
+class AccountRequestSlots:
+    # The asyncio client's limiter: one per cookie, since Roblox limits each
+    # account separately and accounts sharing the loop must not queue behind
+    # each other. Same slot reservation and deadline refusal as above.
+    INTERVAL = 1.0
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self._next_slot = 0.0
+
+    async def reserve(self) -> float:
+        request_meter.record()
+        deadline = _deadline.get()
+        async with self._lock:
+            slot = max(clock.time(), self._next_slot)
+            if deadline is not None and slot >= deadline:
+                raise DeadlineExceeded("no rate-limit slot left before the cycle deadline")
+            self._next_slot = slot + self.INTERVAL
+        return slot - clock.time()
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  Deadlines & Hedging
+# ─────────────────────────────────────────────────────────────────────────────
+class DeadlineExceeded(Exception):
+    pass
+
+# Absolute deadline of the current monitor cycle; contextvars carry it into
+# asyncio tasks, and the group pool copies it into its threads.
+_deadline = contextvars.ContextVar("deadline", default=None)
+
+@contextlib.contextmanager
+def cycle_budget(seconds: Optional[float]):
+    token = _deadline.set(clock.time() + seconds if seconds else None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+def check_budget():
+    deadline = _deadline.get()
+    if deadline is not None and clock.time() >= deadline:
+        raise DeadlineExceeded("cycle time budget exhausted")
+
+def remaining_time(timeout: float) -> float:
+    # The request timeout, cut down to what is left of the cycle budget.
+    check_budget()
+    deadline = _deadline.get()
+    return timeout if deadline is None else min(timeout, deadline - clock.time())
+
+class LatencyTracker:
+    SAMPLES = 256
+    MIN_SAMPLES = 20
+
+    def __init__(self):
+        self._samples = deque(maxlen=self.SAMPLES)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def p95(self) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < self.MIN_SAMPLES:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[int(len(ordered) * 0.95)]
+
+class HedgePolicy:
+    # When a GET outlives the recent p95 latency, a second copy is sent and
+    # whichever answers first wins. Hedges skip the limiter queue (a slot
+    # there would land them a second or more later) and are instead capped
+    # at RATIO of all GETs.
+    RATIO = 0.05
+
+    def __init__(self):
+        self.enabled = False
+        self.latency = LatencyTracker()
+        self.requests = 0
+        self.hedges = 0
+        self._lock = threading.Lock()
+
+    def delay(self, timeout: float) -> Optional[float]:
+        # How long to wait before hedging this request, or None for never.
+        with self._lock:
+            self.requests += 1
+        if not self.enabled:
+            return None
+        p95 = self.latency.p95()
+        return p95 if p95 is not None and p95 < timeout else None
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.hedges + 1 > self.RATIO * self.requests:
+                return False
+            self.hedges += 1
+            return True
+
+hedging = HedgePolicy()
+_hedge_pool = None
+
+def _send(session: requests.Session, method: str, url: str, kwargs: dict):
+    started = time.perf_counter()
+    r = session.request(method, url, **kwargs)
+    hedging.latency.record(time.perf_counter() - started)
+    return r
+
+def _hedged_get(session: requests.Session, url: str, delay: float, kwargs: dict):
+    global _hedge_pool
+    with _rate_lock:
+        if _hedge_pool is None:
+            _hedge_pool = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="hedge")
+    first = _hedge_pool.submit(_send, session, "GET", url, kwargs)
+    try:
+        return first.result(timeout=delay)
+    except FutureTimeout:
+        pass
+    if not hedging.allow():
+        return first.result()
+    # The hedge only gets what is left of the original timeout.
+    second = _hedge_pool.submit(_send, session, "GET", url, dict(kwargs, timeout=max(0.001, kwargs["timeout"] - delay)))
+    error = None
+    for future in as_completed([first, second]):
+        try:
+            return future.result()
+        except Exception as e:
+            error = e
+    raise error
+
+def rate_limited_request(method: str, url: str, **kwargs):
+    session = get_session()
+    check_budget()
+    sleep = reserve_request_slot()
     if sleep > 0:
-        time.sleep(sleep)
-    _last_call = time.time()
-    return requests.request(*args, **kwargs)
+        with profiler.phase("rate_limit"):
+            clock.sleep(sleep)
+    kwargs["timeout"] = remaining_time(kwargs.get("timeout", 10))
+    with profiler.phase("network"):
+        delay = hedging.delay(kwargs["timeout"]) if method == "GET" else None
+        if delay is not None:
+            return _hedged_get(session, url, delay, kwargs)
+        return _send(session, method, url, kwargs)
+
+def cookie_fingerprint(cookie: str) -> str:
+    return hashlib.sha256(cookie.encode()).hexdigest()[:16]
+
+def utc_day(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%d")
+
+def parse_time(value: Optional[str]) -> Optional[float]:
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+def parse_id_list(value: str) -> list:
+    return [v.strip() for v in str(value or "").split(",") if v.strip()]
 
 def abbreviate_number(num: int) -> str:
     abs_num = abs(num)
@@ -87,44 +656,142 @@ def abbreviate_number(num: int) -> str:
             return f"{num/limit:.2f}{suffix}"
     return str(num)
 
-def safe_write(path: str, data: dict):
-    tmp = path + ".tmp"
-    with open(tmp, "w") as f:
-        json.dump(data, f, indent=2)
-    os.replace(tmp, path)
+class FileLock:
+    # Advisory OS lock on a small lock file (flock on POSIX, msvcrt byte-range
+    # lock on Windows). Released automatically if the process dies.
+    def __init__(self, path: str):
+        self.path = path
+        self._fd = None
+        self._thread_lock = threading.Lock()
+
+    def acquire(self, blocking: bool = True) -> bool:
+        if not self._thread_lock.acquire(blocking):
+            return False
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            else:
+                while True:
+                    try:
+                        os.lseek(fd, 0, os.SEEK_SET)
+                        msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                        break
+                    except OSError:
+                        if not blocking:
+                            raise
+                        time.sleep(0.05)
+        except OSError:
+            os.close(fd)
+            self._thread_lock.release()
+            return False
+        self._fd = fd
+        return True
+
+    def release(self):
+        if self._fd is None:
+            return
+        try:
+            if fcntl:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+            self._thread_lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+        return False
+
+def safe_write(path: str, data: dict, indent: Optional[int] = None):
+    # State files are written compact through the codec; only files meant
+    # for hand editing (config.json) pass an indent.
+    with profiler.phase("storage"):
+        # Unique tmp name per writer, so concurrent writers never rename each
+        # other's half-written file into place.
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(json.dumps(data, indent=indent).encode() if indent else codec.dumps(data))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
 
 # ─────────────────────────────────────────────────────────────────────────────
 #  Update Checker
 # ─────────────────────────────────────────────────────────────────────────────
+def read_version() -> str:
+    # Read current version from a file named VERSION in the same directory
+    try:
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "VERSION")) as vf:
+            return vf.read().strip()
+    except (FileNotFoundError, NameError):
+        return "v1.0.0"
+
+def _update_cache_path() -> str:
+    return os.path.join(APP_DIR, "update_check.json")
+
+def _fetch_latest_release() -> dict:
+    repoownername = "MrAndiGamesDev"
+    repo = f"{repoownername}/Roblox-Transaction-Monitor-CTL-Edition"
+    url = f"https://api.github.com/repos/{repo}/releases/latest"
+    r = requests.get(url, timeout=5)
+    latest = r.json() if r.status_code == 200 else {}
+    return {"tag_name": latest.get("tag_name", ""), "html_url": latest.get("html_url", "")}
+
 def check_for_update():
     try:
-        repoownername = "MrAndiGamesDev"
-        repo = f"{repoownername}/Roblox-Transaction-Monitor-CTL-Edition"
-        url = f"https://api.github.com/repos/{repo}/releases/latest"
-        r = requests.get(url, timeout=5)
-        if r.status_code == 200:
-            latest = r.json()
-            latest_tag = latest.get("tag_name", "")
-            # Read current version from a file named VERSION in the same directory
+        # A cached answer younger than the TTL (including "nothing found" after
+        # a failed lookup) is reused, so firewalled hosts pay at most one
+        # timeout per day.
+        cache_path = _update_cache_path()
+        try:
+            with open(cache_path, "rb") as f:
+                cached = codec.loads(f.read())
+        except (OSError, ValueError):
+            cached = {}
+        if clock.time() - cached.get("checked_at", 0) < UPDATE_CHECK_TTL:
+            latest = cached
+        else:
             try:
-                with open(os.path.join(os.path.dirname(__file__), "VERSION")) as vf:
-                    current_tag = vf.read().strip()
-            except FileNotFoundError:
-                current_tag = "v1.0.0"
-            if latest_tag and latest_tag != current_tag:
-                print(f"{Colors.YELLOW}Update available: {latest_tag} (you have {current_tag}){Colors.RESET}")
-                print(f"{Colors.CYAN}Download: {latest.get('html_url', '')}{Colors.RESET}\n")
+                latest = _fetch_latest_release()
+            except Exception:
+                latest = {"tag_name": "", "html_url": ""}
+            latest["checked_at"] = clock.time()
+            os.makedirs(APP_DIR, exist_ok=True, mode=0o700)
+            safe_write(cache_path, latest)
+        latest_tag = latest.get("tag_name", "")
+        current_tag = read_version()
+        if latest_tag and latest_tag != current_tag:
+            print(f"{Colors.YELLOW}Update available: {latest_tag} (you have {current_tag}){Colors.RESET}")
+            print(f"{Colors.CYAN}Download: {latest.get('html_url', '')}{Colors.RESET}\n")
     except Exception:
         pass
 
+def start_update_check() -> threading.Thread:
+    # Runs off the startup path; the notice prints whenever the answer arrives.
+    thread = threading.Thread(target=check_for_update, name="update-check", daemon=True)
+    thread.start()
+    return thread
+
 # ─────────────────────────────────────────────────────────────────────────────
 #  Config Manager
 # ─────────────────────────────────────────────────────────────────────────────
 class Config:
-    def __init__(self):
+    def __init__(self, data: Optional[dict] = None):
         self._make_dirs()
         self.data = DEFAULT_CONFIG.copy()
-        self._load()
+        if data is None:
+            self._load()
+        else:
+            # Snapshot handed down from a supervisor; workers never rewrite the file.
+            self.data.update(data)
 
     def _make_dirs(self):
         os.makedirs(APP_DIR, exist_ok=True, mode=0o700)
@@ -142,7 +809,7 @@ class Config:
         self.save()
 
     def save(self):
-        safe_write(CONFIG_FILE, self.data)
+        safe_write(CONFIG_FILE, self.data, indent=2)
 
     def __getitem__(self, key):
         return self.data[key]
@@ -157,135 +824,1017 @@ class Config:
             ("Webhook", censor_webhook(self['DISCORD_WEBHOOK_URL'])),
             ("Cookie", censor_cookie(self['ROBLOSECURITY'])),
             ("Emoji", f"{self['DISCORD_EMOJI_NAME']}:{self['DISCORD_EMOJI_ID']}"),
-            ("Interval", f"{self['CHECK_INTERVAL']}s"),
-            ("Timeframe", self['TOTAL_CHECKS_TYPE'])
+            ("Interval", f"{self['CHECK_INTERVAL']}s (robux {self['ROBUX_INTERVAL']}s, totals {self['TOTALS_INTERVAL']}s, status {self['STATUS_INTERVAL']}s)"),
+            ("Timeframe", self['TOTAL_CHECKS_TYPE']),
+            ("Ledger", self['TRANSACTION_TYPES'] or "off"),
+            ("Groups", self['GROUP_IDS'] or "none")
         ]
         for label, value in items:
             print(f"  {label}: {value}")
         print()
 
+# ─────────────────────────────────────────────────────────────────────────────
+#  Journal
+# ─────────────────────────────────────────────────────────────────────────────
+def fsync_dir(path: str):
+    if os.name == "nt":
+        return  # directory handles cannot be fsynced on Windows
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+_io_worker: Optional[ThreadPoolExecutor] = None
+
+def offload_io(func, *args):
+    # Under the asyncio monitor, blocking disk work (journal fsyncs, history
+    # appends) goes to one worker thread, in submission order, so a slow disk
+    # never stalls the event loop. Everywhere else it simply runs inline.
+    global _io_worker
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return func(*args)
+    if _io_worker is None:
+        _io_worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="io")
+    _io_worker.submit(_run_io, func, *args)
+
+def _run_io(func, *args):
+    try:
+        func(*args)
+    except OSError as e:
+        print(f"{Colors.RED}Background write failed: {e}{Colors.RESET}")
+
+def drain_io():
+    # Waits for everything offload_io queued so far.
+    if _io_worker is not None:
+        _io_worker.submit(lambda: None).result()
+
+class Journal:
+    # Key/value state kept as snapshot.json plus an append-only log of small
+    # records: {"k": key, "v": value} replaces a key, {"k": key, "d": {...}}
+    # merges changed fields into a dict value. Records are flushed on every
+    # write (safe against process crashes) and fsynced in groups (bounding
+    # what a power loss can take to one group). The log is folded into a new
+    # snapshot once it grows past COMPACT_BYTES.
+    SYNC_RECORDS = 32
+    SYNC_SECONDS = 1.0
+    COMPACT_BYTES = 1024 * 1024
+
+    def __init__(self, directory: str, legacy: Optional[dict] = None):
+        self.directory = directory
+        self.snapshot_file = os.path.join(directory, "state.snapshot.json")
+        self.journal_file = os.path.join(directory, "state.journal")
+        self.state = {}
+        self._lock = threading.RLock()
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        fresh = not os.path.exists(self.snapshot_file) and not os.path.exists(self.journal_file)
+        self._recover()
+        self._log = open(self.journal_file, "ab")
+        if fresh and legacy:
+            self.state.update(legacy)
+            self.compact()
+
+    def _recover(self):
+        self.state, good = self.replay(self.snapshot_file, self.journal_file)
+        if os.path.exists(self.journal_file) and good != os.path.getsize(self.journal_file):
+            with open(self.journal_file, "r+b") as f:
+                f.truncate(good)
+
+    @classmethod
+    def replay(cls, snapshot_file: str, journal_file: str) -> tuple:
+        # The recovered state and the length of the log's intact prefix.
+        # Touches nothing on disk, so readers can use it without the lock.
+        state = {}
+        if os.path.exists(snapshot_file):
+            with open(snapshot_file, "rb") as f:
+                state = codec.loads(f.read())
+        good = 0
+        if os.path.exists(journal_file):
+            with open(journal_file, "rb") as f:
+                for line in f:
+                    # A record without its newline is torn even if it
+                    # parses; the next append would land on the same line.
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        cls._apply_to(state, codec.loads(line))
+                    except ValueError:
+                        break  # torn tail from a crash mid-append; drop it
+                    good += len(line)
+        return state, good
+
+    def _apply(self, record: dict):
+        self._apply_to(self.state, record)
+
+    @staticmethod
+    def _apply_to(state: dict, record: dict):
+        if "d" in record:
+            current = state.get(record["k"])
+            if not isinstance(current, dict):
+                current = state[record["k"]] = {}
+            current.update(record["d"])
+        else:
+            state[record["k"]] = record["v"]
+
+    def get(self, key: str, default=None):
+        with self._lock:
+            return self.state.get(key, default)
+
+    def put(self, key: str, value):
+        self._write({"k": key, "v": value})
+
+    def patch(self, key: str, changes: dict):
+        if changes:
+            self._write({"k": key, "d": changes})
+
+    def _write(self, record: dict):
+        line = codec.dumps(record) + b"\n"
+        with profiler.phase("storage"), self._lock:
+            self._apply(record)
+            self._log.write(line)
+            self._log.flush()
+            self._unsynced += 1
+            if self._log.tell() >= self.COMPACT_BYTES:
+                self.compact()
+            elif self._unsynced >= self.SYNC_RECORDS or time.monotonic() - self._last_sync >= self.SYNC_SECONDS:
+                # The group fsync runs on a duplicate of the log's descriptor so
+                # it can be offloaded without holding the lock or racing close().
+                self._unsynced = 0
+                self._last_sync = time.monotonic()
+                offload_io(self._fsync_and_close, os.dup(self._log.fileno()))
+
+    @staticmethod
+    def _fsync_and_close(fd: int):
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def sync(self):
+        with self._lock:
+            self._last_sync = time.monotonic()
+            if not self._unsynced or self._log.closed:
+                return
+            self._unsynced = 0
+            fd = os.dup(self._log.fileno())
+        self._fsync_and_close(fd)
+
+    def compact(self):
+        with self._lock:
+            tmp = f"{self.snapshot_file}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(codec.dumps(self.state))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.snapshot_file)
+            fsync_dir(self.directory)
+            # Only now is it safe to drop the records the snapshot absorbed.
+            self._log.truncate(0)
+            self._log.seek(0)
+            os.fsync(self._log.fileno())
+            self._unsynced = 0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return codec.loads(codec.dumps(self.state))
+
+    def replace(self, state: dict):
+        with self._lock:
+            self.state = dict(state)
+            self.compact()
+
+    def close(self):
+        with self._lock:
+            if not self._log.closed:
+                self.sync()
+                self._log.close()
+
 # ─────────────────────────────────────────────────────────────────────────────
 #  Storage
 # ─────────────────────────────────────────────────────────────────────────────
+class StorageBusy(Exception):
+    pass
+
 class Storage:
-    def __init__(self):
-        self.trans_file = os.path.join(STORAGE_DIR, "last_transaction_data.json")
-        self.robux_file = os.path.join(STORAGE_DIR, "last_robux.json")
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or STORAGE_DIR
+        os.makedirs(self.directory, exist_ok=True)
+        # Pre-journal state files; only read once to seed a new journal.
+        self.trans_file = os.path.join(self.directory, "last_transaction_data.json")
+        self.robux_file = os.path.join(self.directory, "last_robux.json")
+        self.cursor_file = os.path.join(self.directory, "transaction_cursor.json")
+        self.ledger_file = os.path.join(self.directory, "transactions.jsonl")
+        self.history_dir = os.path.join(self.directory, "history")
+        # Readers never lock; the journal's writer holds this until close().
+        self.write_lock = FileLock(os.path.join(self.directory, ".write.lock"))
+        self._journal = None
+        self._segments = {}
+
+    @classmethod
+    def for_group(cls, group_id: str) -> "Storage":
+        return cls(os.path.join(STORAGE_DIR, "groups", str(group_id)))
+
+    @classmethod
+    def for_account(cls, cookie: str) -> "Storage":
+        return cls(os.path.join(STORAGE_DIR, "accounts", cookie_fingerprint(cookie)))
+
+    @property
+    def journal(self) -> Journal:
+        # Opened lazily so read-only users (export, query) never touch the log.
+        # One writer at a time: a second one would work from stale in-memory
+        # state, and its compaction would drop the other's records.
+        if self._journal is None:
+            if not self.write_lock.acquire(blocking=False):
+                raise StorageBusy(f"{self.directory} is already being written by another process")
+            try:
+                self._journal = Journal(self.directory, self._legacy_state())
+            except BaseException:
+                self.write_lock.release()
+                raise
+        return self._journal
+
+    def _legacy_state(self) -> dict:
+        state = {}
+        for key, path in (("transactions", self.trans_file), ("robux", self.robux_file), ("cursors", self.cursor_file)):
+            try:
+                with open(path) as f:
+                    state[key] = json.load(f)
+            except (OSError, ValueError):
+                continue
+        if "robux" in state:
+            state["robux"] = state["robux"].get("robux", 0)
+        return state
+
+    def sync(self):
+        if self._journal is not None:
+            self._journal.sync()
+
+    def close(self):
+        drain_io()
+        if self._journal is not None:
+            self._journal.close()
+            self.write_lock.release()
+        for segment in self._segments.values():
+            if segment is not None:
+                segment.close()
+        self._segments = {}
+
+    def export_state(self) -> dict:
+        if self._journal is None:
+            # Nothing written through this Storage: read the files as they are,
+            # without taking the writer lock.
+            files = (os.path.join(self.directory, "state.snapshot.json"), os.path.join(self.directory, "state.journal"))
+            if not any(os.path.exists(path) for path in files):
+                return self._legacy_state()
+            return Journal.replay(*files)[0]
+        return self.journal.snapshot()
+
+    def import_state(self, state: dict):
+        self.journal.replace(state)
 
     def load_transactions(self) -> dict:
-        if not os.path.exists(self.trans_file):
-            default = {k: 0 for k in [
-                "salesTotal", "purchasesTotal", "affiliateSalesTotal", "groupPayoutsTotal",
-                "currencyPurchasesTotal", "premiumStipendsTotal", "tradeSystemEarningsTotal",
-                "tradeSystemCostsTotal", "premiumPayoutsTotal", "groupPremiumPayoutsTotal",
-                "adSpendTotal", "developerExchangeTotal", "pendingRobuxTotal", "incomingRobuxTotal",
-                "outgoingRobuxTotal", "individualToGroupTotal", "csAdjustmentTotal",
-                "adsRevsharePayoutsTotal", "groupAdsRevsharePayoutsTotal", "subscriptionsRevshareTotal",
-                "groupSubscriptionsRevshareTotal", "subscriptionsRevshareOutgoingTotal",
-                "groupSubscriptionsRevshareOutgoingTotal", "publishingAdvanceRebatesTotal",
-                "affiliatePayoutTotal"
-            ]}
-            self.save_transactions(default)
-            return default
-        with open(self.trans_file) as f:
-            return json.load(f)
+        data = self.journal.get("transactions")
+        if data is None:
+            data = {k: 0 for k in TRANSACTION_FIELDS}
+            self.journal.put("transactions", data)
+        return dict(data)
 
     def save_transactions(self, data: dict):
-        safe_write(self.trans_file, data)
+        # Only the fields that moved are journaled.
+        current = self.journal.get("transactions") or {}
+        self.journal.patch("transactions", {k: v for k, v in data.items() if current.get(k) != v})
 
     def load_robux(self) -> int:
-        if not os.path.exists(self.robux_file):
-            return 0
-        try:
-            with open(self.robux_file) as f:
-                return json.load(f).get("robux", 0)
-        except:
-            return 0
+        return self.journal.get("robux", 0)
 
     def save_robux(self, robux: int):
-        safe_write(self.robux_file, {"robux": robux})
+        self.journal.put("robux", robux)
+
+    def load_tx_cursor(self, tx_type: str) -> dict:
+        return dict((self.journal.get("cursors") or {}).get(tx_type, {}))
+
+    def save_tx_cursor(self, tx_type: str, state: dict):
+        self.journal.patch("cursors", {tx_type: dict(state)})
+
+    def record_history(self, kind: str, values: dict, ts: Optional[float] = None):
+        # History is partitioned into one JSON-lines file per UTC day, which
+        # doubles as a coarse time index for range reads.
+        ts = int(clock.time() if ts is None else ts)
+        folder = os.path.join(self.history_dir, kind)
+        offload_io(self._append_history, folder, f"{utc_day(ts)}.jsonl", codec.dumps({"ts": ts, **values}) + b"\n")
+
+    @staticmethod
+    def _append_history(folder: str, name: str, line: bytes):
+        os.makedirs(folder, exist_ok=True)
+        with profiler.phase("storage"), open(os.path.join(folder, name), "ab") as f:
+            f.write(line)
+
+    def log_days(self, kind: str) -> list:
+        # Days still held as JSON lines.
+        folder = os.path.join(self.history_dir, kind)
+        if not os.path.isdir(folder):
+            return []
+        return sorted(name[:-6] for name in os.listdir(folder) if name.endswith(".jsonl"))
+
+    def segment(self, kind: str, month: str) -> Optional["HistorySegment"]:
+        # The sealed segment for one month, opened (mmapped) once per Storage.
+        path = os.path.join(self.history_dir, kind, f"{month}{HistorySegment.SUFFIX}")
+        if path not in self._segments:
+            segment = None
+            if os.path.exists(path):
+                try:
+                    segment = HistorySegment(path)
+                except (OSError, ValueError, zlib.error, struct.error) as e:
+                    print(f"{Colors.YELLOW}Warning: Skipping unreadable history segment {path}: {e}{Colors.RESET}")
+            self._segments[path] = segment
+        return self._segments[path]
+
+    def sealed_days(self, kind: str) -> dict:
+        # Day -> HistorySegment for every day sealed by `archive`.
+        sealed = {}
+        folder = os.path.join(self.history_dir, kind)
+        names = os.listdir(folder) if os.path.isdir(folder) else []
+        for name in sorted(n for n in names if n.endswith(HistorySegment.SUFFIX)):
+            segment = self.segment(kind, name[:-len(HistorySegment.SUFFIX)])
+            if segment is not None:
+                sealed.update(dict.fromkeys(segment.days, segment))
+        return sealed
+
+    def history_days(self, kind: str) -> list:
+        return sorted(set(self.log_days(kind)) | set(self.sealed_days(kind)))
+
+    def iter_history(self, kind: str, since: Optional[float] = None, until: Optional[float] = None) -> Iterator[dict]:
+        first = utc_day(since) if since is not None else None
+        last = utc_day(until) if until is not None else None
+        sealed = self.sealed_days(kind)
+        for day in self.history_days(kind):
+            if (first and day < first) or (last and day > last):
+                continue
+            if day in sealed:
+                # A day file left behind by an interrupted archive run is a
+                # copy of the sealed day.
+                yield from sealed[day].rows(day, since, until)
+                continue
+            with open(os.path.join(self.history_dir, kind, f"{day}.jsonl"), "rb") as f:
+                for line in f:
+                    try:
+                        row = codec.loads(line)
+                    except ValueError:
+                        continue  # torn final line from an interrupted append
+                    if since is not None and row["ts"] < since:
+                        continue
+                    if until is not None and row["ts"] >= until:
+                        break
+                    yield row
+
+    def append_transactions(self, items: list):
+        with profiler.phase("storage"), open(self.ledger_file, "ab") as f:
+            f.write(b"".join(codec.dumps(item) + b"\n" for item in items))
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  Session Cache
+# ─────────────────────────────────────────────────────────────────────────────
+class AuthCache:
+    # Resolved user id and last validation time per cookie fingerprint, shared
+    # by every process on the host. The cookie itself is never written here.
+    # Updates are batched: at most one rewrite per FLUSH_INTERVAL, so a fleet
+    # authenticating at once does not rewrite the file once per account.
+    FLUSH_INTERVAL = 1.0
+
+    def __init__(self):
+        self._path = None
+        self._entries = {}
+        self._pending = {}
+        self._flushed_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> str:
+        return os.path.join(APP_DIR, "auth_cache.json")
+
+    def _read(self) -> dict:
+        try:
+            with open(self._path, "rb") as f:
+                return codec.loads(f.read())
+        except (OSError, ValueError):
+            return {}
+
+    def _sync_path(self):
+        if self._path != self.path:
+            if self._pending:
+                self._flush()
+            self._path = self.path
+            self._entries = self._read()
+
+    def get(self, fingerprint: str) -> Optional[dict]:
+        with self._lock:
+            self._sync_path()
+            return self._entries.get(fingerprint)
+
+    def _update(self, fingerprint: str, entry: Optional[dict]):
+        with self._lock:
+            self._sync_path()
+            self._pending[fingerprint] = entry
+            if entry is None:
+                self._entries.pop(fingerprint, None)
+            else:
+                self._entries[fingerprint] = entry
+            if clock.time() - self._flushed_at >= self.FLUSH_INTERVAL:
+                self._flush()
+
+    def flush(self, force: bool = False):
+        with self._lock:
+            if self._pending and (force or clock.time() - self._flushed_at >= self.FLUSH_INTERVAL):
+                self._flush()
+
+    def _flush(self):
+        os.makedirs(os.path.dirname(self._path), exist_ok=True, mode=0o700)
+        # Re-read under the file lock so shards never drop each other's entries.
+        with FileLock(self._path + ".lock"):
+            entries = self._read()
+            for fingerprint, entry in self._pending.items():
+                if entry is None:
+                    entries.pop(fingerprint, None)
+                else:
+                    entries[fingerprint] = entry
+            safe_write(self._path, entries)
+        self._entries = entries
+        self._pending.clear()
+        self._flushed_at = clock.time()
+
+    def put(self, fingerprint: str, user_id: int, validated_at: float):
+        self._update(fingerprint, {"user_id": user_id, "validated_at": validated_at})
+
+    def drop(self, fingerprint: str):
+        self._update(fingerprint, None)
+
+auth_cache = AuthCache()
 
 # ─────────────────────────────────────────────────────────────────────────────
 #  Roblox API
 # ─────────────────────────────────────────────────────────────────────────────
 class RobloxAPI:
+    USERS_API = "https://users.roblox.com"
+    ECONOMY_API = "https://economy.roblox.com"
+
+    # Minimum gap between 401-triggered revalidations, so an endpoint that
+    # keeps answering 401 cannot turn every poll into an extra auth call.
+    REVALIDATE_COOLDOWN = 60
+
     def __init__(self, cookie: str):
         self.cookies = {".ROBLOSECURITY": cookie}
+        self.fingerprint = cookie_fingerprint(cookie)
         self.user_id = None
+        self.validated_at = None
+        self.persisted_at = None
+        # Set by resume() until the monitor's first health check consumes it.
+        self.resumed = False
 
     def authenticate(self) -> bool:
         try:
-            r = rate_limited_request("GET", "https://users.roblox.com/v1/users/authenticated", cookies=self.cookies, timeout=10)
-            if r.status_code == 200:
-                self.user_id = r.json().get("id")
-                print(f"{Colors.CYAN}Authenticated as user ID: {self.user_id}{Colors.RESET}")
-                return True
+            r = rate_limited_request("GET", f"{self.USERS_API}/v1/users/authenticated", cookies=self.cookies, timeout=10)
+            return self._auth_result(r.status_code, decode_json(r) if r.status_code == 200 else None)
+        except DeadlineExceeded:
+            # Out of cycle budget is not a bad cookie: let the check be settled.
+            raise
         except Exception as e:
             print(f"{Colors.RED}Auth failed: {e}{Colors.RESET}")
         return False
 
+    def _auth_result(self, status: int, data: Optional[dict]) -> bool:
+        if status == 200:
+            self.user_id = data.get("id")
+            self.validated_at = self.persisted_at = clock.time()
+            auth_cache.put(self.fingerprint, self.user_id, self.validated_at)
+            print(f"{Colors.CYAN}Authenticated as user ID: {self.user_id}{Colors.RESET}")
+            return True
+        if status == 401:
+            self.user_id = None
+            auth_cache.drop(self.fingerprint)
+        return False
+
+    def resume(self) -> bool:
+        # Picks up the user id from the session cache without a network call;
+        # it is checked again lazily on the first 401 or once it expires.
+        entry = auth_cache.get(self.fingerprint)
+        if not entry or not entry.get("user_id"):
+            return False
+        self.user_id = entry["user_id"]
+        self.validated_at = self.persisted_at = entry.get("validated_at", 0)
+        self.resumed = True
+        print(f"{Colors.CYAN}Resumed session for user ID: {self.user_id}{Colors.RESET}")
+        return True
+
+    def login(self) -> bool:
+        return self.resume() or self.authenticate()
+
+    def mark_validated(self, user_id: Optional[int]):
+        # A successful /authenticated probe elsewhere (the API health check)
+        # proves the cookie is still good; refresh the cache entry now and
+        # then instead of on every probe.
+        if user_id != self.user_id:
+            return
+        self.validated_at = clock.time()
+        if self.validated_at - (self.persisted_at or 0) > AUTH_CACHE_TTL / 2:
+            self.persisted_at = self.validated_at
+            auth_cache.put(self.fingerprint, self.user_id, self.validated_at)
+
+    def _expired(self) -> bool:
+        return self.validated_at is not None and clock.time() - self.validated_at > AUTH_CACHE_TTL
+
+    def _should_revalidate(self, status: int) -> bool:
+        return status == 401 and clock.time() - (self.validated_at or 0) > self.REVALIDATE_COOLDOWN
+
+    def _get(self, url: str, **kwargs):
+        if self._expired():
+            self.authenticate()
+        r = rate_limited_request("GET", url, cookies=self.cookies, timeout=10, **kwargs)
+        if self._should_revalidate(r.status_code):
+            self.authenticate()
+        return r
+
     def get_transaction_totals(self, timeframe: str) -> Optional[dict]:
         if not self.user_id: return None
-        url = f"https://economy.roblox.com/v2/users/{self.user_id}/transaction-totals?timeFrame={timeframe}&transactionType=summary"
-        r = rate_limited_request("GET", url, cookies=self.cookies, timeout=10)
-        return r.json() if r.status_code == 200 else None
+        url = f"{self.ECONOMY_API}/v2/users/{self.user_id}/transaction-totals?timeFrame={timeframe}&transactionType=summary"
+        r = self._get(url)
+        return decode_json(r) if r.status_code == 200 else None
 
     def get_robux(self) -> Optional[int]:
         if not self.user_id: return None
-        r = rate_limited_request("GET", f"https://economy.roblox.com/v1/users/{self.user_id}/currency", cookies=self.cookies, timeout=10)
-        return r.json().get("robux") if r.status_code == 200 else None
+        r = self._get(f"{self.ECONOMY_API}/v1/users/{self.user_id}/currency")
+        return decode_json(r).get("robux") if r.status_code == 200 else None
+
+    def _transactions_request(self, tx_type: str, cursor: Optional[str]) -> tuple:
+        params = {"transactionType": tx_type, "limit": TRANSACTION_PAGE_SIZE, "sortOrder": "Desc"}
+        if cursor:
+            params["cursor"] = cursor
+        return f"{self.ECONOMY_API}/v2/users/{self.user_id}/transactions", params
+
+    def get_transactions_page(self, tx_type: str, cursor: Optional[str] = None) -> Optional[dict]:
+        if not self.user_id: return None
+        url, params = self._transactions_request(tx_type, cursor)
+        r = self._get(url, params=params)
+        return decode_json(r) if r.status_code == 200 else None
+
+    def iter_transaction_pages(self, tx_type: str, state: dict, max_pages: int = TRANSACTION_MAX_PAGES) -> Iterator[tuple]:
+        # Walks the listing newest-first and yields (items, update) per page:
+        # the items above the high-water mark in ``state`` (last_id), and the
+        # state update to apply once they are flushed. Before each page,
+        # ``state`` is pointed at it (head_id, cursor), so the caller can
+        # persist progress mid-page together with flushed_id. A walk that
+        # hits ``max_pages`` parks its cursor and the id of the newest item
+        # it started from (head_id) and resumes there next cycle; new items
+        # above head_id are picked up by the following walk from the top.
+        walk = self.start_walk(state)
+        while True:
+            cursor = walk["cursor"]
+            page = self.get_transactions_page(tx_type, cursor)
+            if page is None:
+                return
+            items, update, done = self.walk_transactions_page(walk, page, max_pages)
+            state.update({"head_id": walk["head_id"], "cursor": cursor})
+            yield items, update
+            if done:
+                return
+
+    @staticmethod
+    def start_walk(state: dict) -> dict:
+        return {"cursor": state.get("cursor"), "head_id": state.get("head_id"), "last_id": state.get("last_id"),
+                "flushed_id": state.get("flushed_id"), "pages": 0}
+
+    @staticmethod
+    def walk_transactions_page(walk: dict, page: dict, max_pages: int) -> tuple:
+        # One step of the walk above, shared with the asyncio client. Returns
+        # the new items, the state update to apply once they are consumed, and
+        # whether the walk is over for this cycle.
+        # A walk cut short mid-page resumes on that page with its head_id
+        # kept, skipping items at or above flushed_id (already delivered) and
+        # anything newer than head_id (left for the next walk).
+        items = page.get("data") or []
+        if not walk["cursor"] and walk["head_id"] is None:
+            walk["head_id"] = int(items[0].get("id", 0)) if items else (walk["last_id"] or 0)
+            if walk["last_id"] is None:
+                # First run: record where history ends instead of replaying it.
+                return [], {"last_id": walk["head_id"], "head_id": None, "cursor": None, "flushed_id": None}, True
+        finished = {"last_id": walk["head_id"], "head_id": None, "cursor": None, "flushed_id": None}
+        flushed = walk["flushed_id"]
+        fresh = []
+        for item in items:
+            item_id = int(item.get("id", 0))
+            if item_id <= walk["last_id"]:
+                return fresh, finished, True
+            if item_id > walk["head_id"] or (flushed is not None and item_id >= flushed):
+                continue
+            fresh.append(item)
+        walk["cursor"] = page.get("nextPageCursor")
+        if not walk["cursor"]:
+            return fresh, finished, True
+        walk["pages"] += 1
+        # Keep the low-water mark of what was delivered: the next page may
+        # still overlap it when new rows shifted the listing under the cursor.
+        if fresh:
+            walk["flushed_id"] = int(fresh[-1].get("id", 0))
+        return fresh, {"head_id": walk["head_id"], "cursor": walk["cursor"], "flushed_id": walk["flushed_id"]}, walk["pages"] >= max_pages
+
+    def get_group_funds(self, group_id: str) -> Optional[int]:
+        r = self._get(f"{self.ECONOMY_API}/v1/groups/{group_id}/currency")
+        return decode_json(r).get("robux") if r.status_code == 200 else None
+
+    def get_group_revenue(self, group_id: str, timeframe: str) -> Optional[dict]:
+        url = f"{self.ECONOMY_API}/v1/groups/{group_id}/revenue/summary/{timeframe.lower()}"
+        r = self._get(url)
+        return decode_json(r) if r.status_code == 200 else None
 
     def get_account_status(self) -> Optional[dict]:
         if not self.user_id: return None
-        r = rate_limited_request("GET", f"https://users.roblox.com/v1/users/{self.user_id}", cookies=self.cookies, timeout=10)
-        if r.status_code == 200:
-            data = r.json()
-            return {
-                "is_banned": data.get("isBanned", False),
-                "username": data.get("name", "Unknown"),
-                "created": data.get("created", "Unknown")
-            }
-        return None
+        r = self._get(f"{self.USERS_API}/v1/users/{self.user_id}")
+        return self.account_status_from(decode_json(r)) if r.status_code == 200 else None
+
+    @staticmethod
+    def account_status_from(data: dict) -> dict:
+        return {
+            "is_banned": data.get("isBanned", False),
+            "username": data.get("name", "Unknown"),
+            "created": data.get("created", "Unknown")
+        }
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  Notification Sinks
+# ─────────────────────────────────────────────────────────────────────────────
+def as_embeds(embed) -> list:
+    # Sinks are handed one embed, or a list of embeds making up one message
+    # (digests).
+    return embed if isinstance(embed, list) else [embed]
+
+class NotificationSink:
+    # Each sink owns a single delivery thread, so a slow or dead endpoint only
+    # ever backs up its own queue. Deliveries beyond MAX_PENDING are dropped.
+    MAX_PENDING = 100
+
+    def __init__(self, name: str, timeout: float = 10, retries: int = 2):
+        self.name = name
+        self.timeout = float(timeout)
+        self.retries = int(retries)
+        self.pending = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"sink-{name}")
+
+    def deliver(self, embed: dict):
+        raise NotImplementedError
+
+    async def deliver_async(self, http, embed: dict):
+        # Used by AsyncNotifier; local sinks are quick enough to run inline.
+        self.deliver(embed)
+
+    def submit(self, embed: dict) -> bool:
+        with self._lock:
+            if self.pending >= self.MAX_PENDING:
+                self.failures += 1
+                return False
+            self.pending += 1
+        self._executor.submit(self._run, embed)
+        return True
+
+    def _run(self, embed: dict):
+        try:
+            for attempt in range(self.retries + 1):
+                try:
+                    self.deliver(embed)
+                    return
+                except Exception as e:
+                    if attempt == self.retries:
+                        self.failures += 1
+                        print(f"{Colors.RED}Notification sink '{self.name}' failed: {e}{Colors.RESET}")
+                        return
+                    time.sleep(min(2 ** attempt, self.timeout))
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    def close(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+class DiscordSink(NotificationSink):
+    def __init__(self, name: str, url: str, **kwargs):
+        super().__init__(name, **kwargs)
+        self.url = url
+
+    def deliver(self, embed):
+        r = get_session().post(self.url, data=codec.dumps({"embeds": as_embeds(embed)}), headers=JSON_HEADERS, timeout=self.timeout)
+        if r.status_code == 429:
+            # Honour Discord's bucket reset before the retry loop tries again.
+            try:
+                retry_after = float(r.json().get("retry_after", 1))
+            except Exception:
+                retry_after = 1.0
+            time.sleep(min(retry_after, self.timeout))
+        r.raise_for_status()
+
+    async def deliver_async(self, http, embed):
+        async with http.post(self.url, data=codec.dumps({"embeds": as_embeds(embed)}), headers=JSON_HEADERS,
+                             timeout=aiohttp.ClientTimeout(total=self.timeout)) as r:
+            if r.status == 429:
+                try:
+                    retry_after = float((await r.json()).get("retry_after", 1))
+                except Exception:
+                    retry_after = 1.0
+                await clock.asleep(min(retry_after, self.timeout))
+            r.raise_for_status()
+
+class JsonWebhookSink(NotificationSink):
+    def __init__(self, name: str, url: str, **kwargs):
+        super().__init__(name, **kwargs)
+        self.url = url
+
+    def deliver(self, embed):
+        r = get_session().post(self.url, data=codec.dumps(self._payload(embed)), headers=JSON_HEADERS, timeout=self.timeout)
+        r.raise_for_status()
+
+    async def deliver_async(self, http, embed):
+        async with http.post(self.url, data=codec.dumps(self._payload(embed)), headers=JSON_HEADERS,
+                             timeout=aiohttp.ClientTimeout(total=self.timeout)) as r:
+            r.raise_for_status()
+
+    @staticmethod
+    def _payload(embed) -> dict:
+        if isinstance(embed, list):
+            return {"source": "roblox-monitor", "events": embed}
+        return {"source": "roblox-monitor", "event": embed}
+
+class FileSink(NotificationSink):
+    def __init__(self, name: str, path: str, **kwargs):
+        super().__init__(name, **kwargs)
+        self.path = os.path.expanduser(path)
+
+    def deliver(self, embed):
+        with open(self.path, "ab") as f:
+            for item in as_embeds(embed):
+                f.write(codec.dumps(item) + b"\n")
+
+SINK_TYPES = {"discord": DiscordSink, "webhook": JsonWebhookSink, "file": FileSink}
+
+def build_sinks(config) -> list:
+    sinks = []
+    primary = config["DISCORD_WEBHOOK_URL"]
+    if primary and "discord.com" in primary:
+        sinks.append(DiscordSink("discord", primary))
+    for index, spec in enumerate(config["NOTIFY_SINKS"] or []):
+        cls = SINK_TYPES.get(str(spec.get("type", "")).lower())
+        target = spec.get("path") if cls is FileSink else spec.get("url")
+        if not cls or not target:
+            print(f"{Colors.YELLOW}Warning: Skipping invalid notification sink #{index + 1}.{Colors.RESET}")
+            continue
+        if cls is DiscordSink and "discord.com" not in target:
+            print(f"{Colors.YELLOW}Warning: Skipping non-Discord URL for sink #{index + 1}.{Colors.RESET}")
+            continue
+        sinks.append(cls(
+            spec.get("name") or f"{spec['type']}-{index + 1}",
+            target,
+            timeout=spec.get("timeout", 10),
+            retries=spec.get("retries", 2)
+        ))
+    return sinks
 
 # ─────────────────────────────────────────────────────────────────────────────
 #  Discord Notifier
 # ─────────────────────────────────────────────────────────────────────────────
+# Discord's hard limits: fields per embed, characters across every embed
+# of a message, embeds per message.
+DISCORD_MAX_FIELDS = 25
+DISCORD_MAX_CHARS = 6000
+DISCORD_MAX_EMBEDS = 10
+
+def embed_size(embed: dict) -> int:
+    # Characters Discord counts towards DISCORD_MAX_CHARS.
+    size = len(embed.get("title", "")) + len(embed.get("description", ""))
+    size += len((embed.get("footer") or {}).get("text", ""))
+    return size + sum(len(f["name"]) + len(f["value"]) for f in embed.get("fields", ()))
+
+def pack_embeds(embeds: list) -> list:
+    # Greedy packing into messages of at most DISCORD_MAX_EMBEDS embeds and
+    # DISCORD_MAX_CHARS characters.
+    messages, current, size = [], [], 0
+    for embed in embeds:
+        cost = embed_size(embed)
+        if current and (len(current) >= DISCORD_MAX_EMBEDS or size + cost > DISCORD_MAX_CHARS):
+            messages.append(current)
+            current, size = [], 0
+        current.append(embed)
+        size += cost
+    if current:
+        messages.append(current)
+    return messages
+
+def window_label(seconds: float) -> str:
+    seconds = int(seconds)
+    if seconds % 3600 == 0:
+        return f"{seconds // 3600}h"
+    return f"{seconds // 60}m" if seconds % 60 == 0 else f"{seconds}s"
+
+class NotificationDigest:
+    # Per-field net change over a DIGEST_WINDOW: [first, last, count, low,
+    # high], grouped by (alert title, sink route). Changes come from the
+    # monitor thread and the group pool, hence the lock.
+    def __init__(self, window: float):
+        self.window = window
+        self.started = None
+        self.sections = {}
+        self.residuals = {}
+        self._lock = threading.Lock()
+
+    def add(self, title: str, field: str, old: int, new: int, sinks: Optional[frozenset] = None):
+        with self._lock:
+            if self.started is None:
+                self.started = clock.time()
+            fields = self.sections.setdefault((title, sinks), {})
+            stats = fields.get(field)
+            if stats is None:
+                fields[field] = [old, new, 1, min(old, new), max(old, new)]
+            else:
+                stats[1] = new
+                stats[2] += 1
+                stats[3] = min(stats[3], new)
+                stats[4] = max(stats[4], new)
+
+    def add_residual(self, title: str, residual: int, sinks: Optional[frozenset] = None):
+        with self._lock:
+            key = (title, sinks)
+            self.residuals[key] = self.residuals.get(key, 0) + residual
+
+    def due(self) -> bool:
+        return self.started is not None and clock.time() - self.started >= self.window
+
+    def drain(self) -> tuple:
+        with self._lock:
+            sections, residuals = self.sections, self.residuals
+            self.sections, self.residuals, self.started = {}, {}, None
+        return sections, residuals
+
 class DiscordNotifier:
-    def __init__(self, url: str, emoji_name: str, emoji_id: str):
+    def __init__(self, url: str, emoji_name: str, emoji_id: str, sinks: Optional[list] = None, digest_window: float = 0):
         self.url = url
         self.emoji = f"<:{emoji_name}:{emoji_id}>"
+        if sinks is None:
+            sinks = [DiscordSink("discord", url)] if url and "discord.com" in url else []
+        self.sinks = sinks
+        # Balance and totals changes are folded into one message per window
+        # instead of an embed per change.
+        self.digest = NotificationDigest(digest_window) if digest_window > 0 else None
 
-    def send(self, embed: dict):
-        if not self.url or "discord.com" not in self.url:
-            return
-        try:
-            r = rate_limited_request("POST", self.url, json={"embeds": [embed]})
-            r.raise_for_status()
-        except:
-            pass
+    def send(self, embed: dict, sinks: Optional[frozenset] = None):
+        # The embed is rendered once by the caller and queued on every sink
+        # (or the named ones an alert rule routed it to); delivery happens
+        # on the sinks' own threads.
+        with profiler.phase("notify"):
+            for sink in self._targets(sinks):
+                sink.submit(embed)
 
-    def transaction_change(self, changes: dict):
+    def _targets(self, sinks: Optional[frozenset]) -> list:
+        return self.sinks if sinks is None else [sink for sink in self.sinks if sink.name in sinks]
+
+    def close(self, wait: bool = True):
+        for sink in self.sinks:
+            sink.close(wait)
+
+    def transaction_change(self, changes: dict, title: str = "Roblox Transaction Updated", sinks: Optional[frozenset] = None):
+        if self.digest:
+            for k, (old, new) in changes.items():
+                self.digest.add(title, k, old, new, sinks)
+            return
         fields = [
             {"name": k, "value": f"From {self.emoji} {abbreviate_number(old)} to {self.emoji} {abbreviate_number(new)}", "inline": False}
             for k, (old, new) in changes.items()
         ]
         self.send({
-            "title": "Roblox Transaction Updated",
+            "title": title,
             "color": 0x00ff00,
             "fields": fields,
             "timestamp": datetime.utcnow().isoformat()
-        })
+        }, sinks)
 
-    def robux_change(self, old: int, new: int):
+    def new_transactions(self, tx_type: str, items: list):
+        fields = []
+        for item in items[:25]:
+            agent = (item.get("agent") or {}).get("name", "Unknown")
+            details = (item.get("details") or {}).get("name", "")
+            amount = (item.get("currency") or {}).get("amount", 0)
+            fields.append({
+                "name": f"{agent} ({item.get('created', '')[:19]})",
+                "value": f"{self.emoji} {abbreviate_number(amount)} {details}".strip(),
+                "inline": False
+            })
         self.send({
-            "title": "Robux Balance Changed",
+            "title": f"New {tx_type} Transactions ({len(items)})",
+            "color": 0x00ff00,
+            "fields": fields,
+            "timestamp": datetime.now(timezone.utc).isoformat()
+        })
+
+    def robux_change(self, old: int, new: int, title: str = "Robux Balance Changed", sinks: Optional[frozenset] = None):
+        if self.digest:
+            self.digest.add(title, "Robux", old, new, sinks)
+            return
+        self.send({
+            "title": title,
             "color": 0x00ff00 if new > old else 0xff0000,
             "fields": [
                 {"name": "Before", "value": f"{self.emoji} {abbreviate_number(old)}", "inline": True},
                 {"name": "After", "value": f"{self.emoji} {abbreviate_number(new)}", "inline": True}
             ],
             "timestamp": datetime.now(timezone.utc).isoformat()
-        })
+        }, sinks)
+
+    def balance_attribution(self, old: int, new: int, attribution: dict, changes: Optional[dict] = None,
+                            sinks: Optional[frozenset] = None):
+        if self.digest:
+            self.digest.add("Robux Balance Changed", "Robux", old, new, sinks)
+            if attribution["residual"]:
+                self.digest.add_residual("Robux Balance Changed", attribution["residual"], sinks)
+            for field, (before, after) in (changes or {}).items():
+                self.digest.add("Roblox Transaction Updated", field, before, after, sinks)
+            return
+
+        def signed(value: int) -> str:
+            return f"{'+' if value > 0 else '-'}{self.emoji} {abbreviate_number(abs(value))}"
+
+        fields = [
+            {"name": "Before", "value": f"{self.emoji} {abbreviate_number(old)}", "inline": True},
+            {"name": "After", "value": f"{self.emoji} {abbreviate_number(new)}", "inline": True}
+        ]
+        # Every totals field that moved is listed, annotated with its effect
+        # on the balance when it has one.
+        explained, unmatched = attribution["explained"], attribution["unmatched"]
+        for field, (before, after) in (changes or {}).items():
+            value = f"From {self.emoji} {abbreviate_number(before)} to {self.emoji} {abbreviate_number(after)}"
+            if field in explained:
+                value += f" ({signed(explained[field])})"
+            elif field in unmatched:
+                value += f" ({signed(unmatched[field])} not yet in balance)"
+            fields.append({"name": field, "value": value, "inline": False})
+        residual = attribution["residual"]
+        if residual:
+            fields.append({"name": "\u26a0\ufe0f Unexplained", "value": signed(residual), "inline": False})
+        embed = {
+            "title": "Robux Balance Changed",
+            "color": 0xffaa00 if residual else (0x00ff00 if new > old else 0xff0000),
+            "fields": fields[:25],
+            "timestamp": datetime.now(timezone.utc).isoformat()
+        }
+        if attribution["rolled_over"]:
+            embed["description"] = "Totals window rolled over during this change."
+        self.send(embed, sinks)
+
+    def flush_digest(self, force: bool = False):
+        # Called once per cycle; sends when the window has elapsed (or on
+        # shutdown), one message per sink route split to Discord's limits.
+        if not self.digest or not (force or self.digest.due()):
+            return
+        sections, residuals = self.digest.drain()
+        routes = {}
+        for (title, sinks), fields in sections.items():
+            routes.setdefault(sinks, []).extend(self._digest_embeds(title, fields, residuals.get((title, sinks), 0)))
+        for sinks, embeds in routes.items():
+            for message in pack_embeds(embeds):
+                self.send(message, sinks)
+
+    def _digest_embeds(self, title: str, fields: dict, residual: int) -> list:
+        def signed(value: int) -> str:
+            return f"{'+' if value >= 0 else '-'}{abbreviate_number(abs(value))}"
+
+        rendered = [
+            {
+                "name": k,
+                "value": (f"{self.emoji} {abbreviate_number(first)} to {self.emoji} {abbreviate_number(last)} ({signed(last - first)})\n"
+                          f"{count} change(s), low {abbreviate_number(low)}, high {abbreviate_number(high)}"),
+                "inline": False
+            }
+            for k, (first, last, count, low, high) in fields.items()
+        ]
+        if residual:
+            rendered.append({"name": "\u26a0\ufe0f Unexplained", "value": f"{self.emoji} {signed(residual)}", "inline": False})
+        changes = sum(stats[2] for stats in fields.values())
+        embeds, chunk = [], []
+        header = {
+            "title": f"{title} ({window_label(self.digest.window)} digest)",
+            "description": f"{changes} change(s) across {len(fields)} field(s)",
+            "color": 0xffaa00 if residual else 0x00ff00,
+            "timestamp": datetime.now(timezone.utc).isoformat()
+        }
+        size = embed_size(header)
+        for field in rendered:
+            cost = len(field["name"]) + len(field["value"])
+            if chunk and (len(chunk) >= DISCORD_MAX_FIELDS or size + cost > DISCORD_MAX_CHARS):
+                embeds.append({**header, "fields": chunk})
+                header = {**header, "title": f"{title} (continued)", "description": ""}
+                chunk, size = [], embed_size(header)
+            chunk.append(field)
+            size += cost
+        embeds.append({**header, "fields": chunk})
+        return embeds
 
     def account_status(self, status: dict, previous: dict = None):
         if previous and previous == status:
@@ -314,110 +1863,2476 @@ class DiscordNotifier:
             "timestamp": datetime.now(timezone.utc).isoformat()
         })
 
+# ─────────────────────────────────────────────────────────────────────────────
+#  Balance Attribution
+# ─────────────────────────────────────────────────────────────────────────────
+BALANCE_CREDITS = (
+    "salesTotal", "affiliateSalesTotal", "groupPayoutsTotal", "currencyPurchasesTotal",
+    "premiumStipendsTotal", "tradeSystemEarningsTotal", "premiumPayoutsTotal",
+    "groupPremiumPayoutsTotal", "csAdjustmentTotal", "adsRevsharePayoutsTotal",
+    "groupAdsRevsharePayoutsTotal", "subscriptionsRevshareTotal",
+    "groupSubscriptionsRevshareTotal", "publishingAdvanceRebatesTotal", "affiliatePayoutTotal"
+)
+BALANCE_DEBITS = (
+    "purchasesTotal", "tradeSystemCostsTotal", "adSpendTotal", "developerExchangeTotal",
+    "individualToGroupTotal", "subscriptionsRevshareOutgoingTotal",
+    "groupSubscriptionsRevshareOutgoingTotal"
+)
+# Roll-ups of the fields above (and robux still held as pending); never
+# matched on their own, or every move would be counted twice.
+BALANCE_AGGREGATES = ("pendingRobuxTotal", "incomingRobuxTotal", "outgoingRobuxTotal")
+# Fields searched for a matching subset; only a few move per cycle.
+ATTRIBUTION_MAX_FIELDS = 12
+
+def balance_effect(field: str, old: int, new: int) -> tuple:
+    # Signed effect of one totals change on the balance, and whether the
+    # field went backwards (the TOTAL_CHECKS_TYPE window rolled over, so
+    # the new value is everything since the reset).
+    if field in BALANCE_AGGREGATES or (field not in BALANCE_CREDITS and field not in BALANCE_DEBITS):
+        return 0, False
+    if field == "csAdjustmentTotal":
+        return new - old, False  # adjustments go either way
+    rolled = abs(new) < abs(old)
+    moved = abs(new) if rolled else abs(new) - abs(old)
+    # Debits may be reported as negative or positive totals; magnitude is what moves.
+    return (-moved if field in BALANCE_DEBITS else moved), rolled
+
+def attribute_balance(old_balance: int, new_balance: int, changes: dict) -> dict:
+    # Matches the balance delta against the totals deltas seen in the same
+    # cycle. All moved fields are tried together first; otherwise the
+    # subset whose effects sum closest to the delta wins (e.g. a sale still
+    # held as pending explains nothing yet). Whatever remains is the
+    # residual and is flagged.
+    delta = new_balance - old_balance
+    effects, rolled_over = {}, False
+    for field, (old, new) in changes.items():
+        effect, rolled = balance_effect(field, old, new)
+        rolled_over = rolled_over or rolled
+        if effect:
+            effects[field] = effect
+    candidates = sorted(effects.items(), key=lambda item: -abs(item[1]))[:ATTRIBUTION_MAX_FIELDS]
+    best_sum, best = 0, ()
+    if sum(effects.values()) == delta:
+        best_sum, best = delta, tuple(effects)
+    else:
+        # Reachable sums -> the fields producing them; stops at an exact match.
+        reachable = {0: ()}
+        for field, effect in candidates:
+            for total, fields in list(reachable.items()):
+                reachable.setdefault(total + effect, fields + (field,))
+            if delta in reachable:
+                break
+        best_sum = min(reachable, key=lambda total: (abs(delta - total), -len(reachable[total])))
+        best = reachable[best_sum]
+    return {
+        "delta": delta,
+        "explained": {field: effects[field] for field in best},
+        "unmatched": {field: effect for field, effect in effects.items() if field not in best},
+        "residual": delta - best_sum,
+        "rolled_over": rolled_over
+    }
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  Alert Rules
+# ─────────────────────────────────────────────────────────────────────────────
+# RULES_FILE (default APP_DIR/rules.json):
+# {
+#   "default": "alert",
+#   "rules": [
+#     {"name": "big-sales", "field": "salesTotal", "min_delta": 1000, "sinks": ["ops"]},
+#     {"name": "drain", "field": "robux", "direction": "down",
+#      "rate_per_hour": 50000, "window": 3600, "quiet_hours": "23:00-07:00"},
+#     {"name": "payouts", "accounts": ["group:123"], "field": "*", "above": 100000}
+#   ]
+# }
+# "field" is a totals/revenue key, "robux" (balance or group funds) or "*";
+# "accounts" takes the export's account names ("primary", a cookie
+# fingerprint, "group:<id>") and defaults to every account. A change no
+# rule covers follows "default" ("alert" or "drop"); a matching rule with
+# no "sinks" goes to every sink.
+class AlertRule:
+    def __init__(self, spec: dict, index: int):
+        self.name = str(spec.get("name") or f"rule-{index + 1}")
+        self.sinks = frozenset(str(s) for s in spec["sinks"]) if spec.get("sinks") else None
+        self.rate = float(spec["rate_per_hour"]) if "rate_per_hour" in spec else None
+        self.window = float(spec.get("window", 3600))
+        self.quiet = self._parse_quiet(spec.get("quiet_hours"))
+        self.conditions = self._compile(spec)
+
+    @staticmethod
+    def _parse_quiet(value) -> Optional[tuple]:
+        if not value:
+            return None
+        def minutes(text: str) -> int:
+            hours, _, mins = text.strip().partition(":")
+            return (int(hours) * 60 + int(mins or 0)) % 1440
+        start, end = str(value).split("-")
+        return minutes(start), minutes(end)
+
+    @staticmethod
+    def _compile(spec: dict) -> tuple:
+        # Only the conditions a rule sets are kept, so matching is a walk
+        # over a tuple of a few closures.
+        conditions = []
+        direction = str(spec.get("direction", "any")).lower()
+        if direction == "up":
+            conditions.append(lambda old, new: new > old)
+        elif direction == "down":
+            conditions.append(lambda old, new: new < old)
+        elif direction != "any":
+            raise ValueError(f"unknown direction '{direction}'")
+        if "min_delta" in spec:
+            min_delta = abs(float(spec["min_delta"]))
+            conditions.append(lambda old, new: abs(new - old) >= min_delta)
+        if "above" in spec:
+            above = float(spec["above"])
+            conditions.append(lambda old, new: old < above <= new)
+        if "below" in spec:
+            below = float(spec["below"])
+            conditions.append(lambda old, new: old > below >= new)
+        return tuple(conditions)
+
+    def is_quiet(self, now: float) -> bool:
+        if not self.quiet:
+            return False
+        local = datetime.fromtimestamp(now)
+        minute = local.hour * 60 + local.minute
+        start, end = self.quiet
+        return start <= minute < end if start <= end else (minute >= start or minute < end)
+
+    def matches(self, old, new, now: float, samples) -> bool:
+        if self.quiet and self.is_quiet(now):
+            return False
+        for condition in self.conditions:
+            if not condition(old, new):
+                return False
+        if self.rate is None:
+            return True
+        # Net movement since the value held before the first change inside
+        # the window, against the budget the hourly rate allows for it.
+        base = new
+        for ts, before in samples:
+            if ts >= now - self.window:
+                base = before
+                break
+        return abs(new - base) >= self.rate * self.window / 3600
+
+class RuleSet:
+    # Rules are compiled once and indexed by (account, field); each change
+    # looks up at most four index entries, so evaluation cost depends on the
+    # rules covering that change, not on how many rules or accounts exist.
+    def __init__(self, spec: dict):
+        self.default = str(spec.get("default", "alert")).lower()
+        self.rules = []
+        self.index = {}
+        self.rated_fields = set()
+        self.max_window = 0.0
+        for i, rule_spec in enumerate(spec.get("rules") or []):
+            try:
+                rule = AlertRule(rule_spec, i)
+            except (TypeError, ValueError, KeyError, AttributeError) as e:
+                print(f"{Colors.YELLOW}Warning: Skipping invalid alert rule #{i + 1}: {e}{Colors.RESET}")
+                continue
+            self.rules.append(rule)
+            fields = rule_spec.get("field") or "*"
+            accounts = rule_spec.get("accounts") or ["*"]
+            for field in ([fields] if isinstance(fields, str) else fields):
+                for account in ([accounts] if isinstance(accounts, str) else accounts):
+                    self.index.setdefault((str(account), str(field)), []).append(rule)
+                if rule.rate is not None:
+                    self.rated_fields.add(str(field))
+                    self.max_window = max(self.max_window, rule.window)
+
+    def _record(self, account: str, field: str, old, now: float, history: dict):
+        samples = history.get((account, field))
+        if samples is None:
+            samples = history[(account, field)] = deque()
+        samples.append((now, old))
+        while samples and samples[0][0] < now - self.max_window:
+            samples.popleft()
+        return samples
+
+    def route(self, account: str, changes: dict, now: float, history: dict) -> list:
+        # -> [(sinks, changes)], one entry per distinct destination; sinks is
+        # None for "every sink". ``history`` is the caller's per-account
+        # sample store for rate rules.
+        routes = {}
+        index = self.index
+        for field, (old, new) in changes.items():
+            samples = ()
+            if field in self.rated_fields or "*" in self.rated_fields:
+                samples = self._record(account, field, old, now, history)
+            covered, fired, sinks = False, False, set()
+            for key in ((account, field), (account, "*"), ("*", field), ("*", "*")):
+                rules = index.get(key)
+                if not rules:
+                    continue
+                covered = True
+                for rule in rules:
+                    if rule.matches(old, new, now, samples):
+                        fired = True
+                        if rule.sinks is None:
+                            sinks = None
+                        elif sinks is not None:
+                            sinks |= rule.sinks
+            if not covered:
+                if self.default == "drop":
+                    continue
+                fired, sinks = True, None
+            if fired:
+                target = None if sinks is None else frozenset(sinks)
+                routes.setdefault(target, {})[field] = (old, new)
+        return list(routes.items())
+
+_rules_cache = {}
+_rules_lock = threading.Lock()
+
+def load_rules(config) -> Optional[RuleSet]:
+    # Parsed and compiled once per file version and shared by every monitor
+    # in the process; None (no rules file) keeps the alert-on-every-change
+    # behaviour.
+    path = config["RULES_FILE"] or os.path.join(APP_DIR, "rules.json")
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        return None
+    with _rules_lock:
+        cached = _rules_cache.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        try:
+            with open(path, "r") as f:
+                spec = json.load(f)
+            if not isinstance(spec, dict):
+                raise ValueError(f"expected an object at the top level, got {type(spec).__name__}")
+            rules = RuleSet(spec)
+        except (OSError, ValueError) as e:
+            print(f"{Colors.YELLOW}Warning: Ignoring rules file {path}: {e}{Colors.RESET}")
+            return None
+        print(f"{Colors.CYAN}Loaded {len(rules.rules)} alert rule(s) from {path}{Colors.RESET}")
+        _rules_cache[path] = (mtime, rules)
+        return rules
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  Scheduler
+# ─────────────────────────────────────────────────────────────────────────────
+class Check:
+    def __init__(self, name: str, func, interval: float, priority: int = 10):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.priority = priority
+        self.due = 0.0
+        self.slot = None  # phase-grid time once spread(), else None
+        self.retried = False  # already re-run once after a blown cycle budget
+
+class CheckScheduler:
+    # Min-heap of (due, priority, seq); checks due at the same time run in
+    # priority order (lower first).
+    # Jitter added on top of a spread check's slot: a fraction of its
+    # interval, capped in seconds.
+    JITTER = 0.05
+    MAX_JITTER = 5.0
+
+    def __init__(self):
+        self._heap = []
+        self._seq = 0
+        self._rng = random.Random()
+
+    def add(self, check: Check, due: Optional[float] = None):
+        check.due = clock.time() if due is None else due
+        self._push(check)
+
+    def _push(self, check: Check):
+        self._seq += 1
+        heapq.heappush(self._heap, (check.due, check.priority, self._seq, check))
+
+    def next_due(self) -> float:
+        return self._heap[0][0] if self._heap else clock.time() + 60
+
+    def pop_due(self, now: Optional[float] = None) -> list:
+        now = clock.time() if now is None else now
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            due.append(heapq.heappop(self._heap)[3])
+        return sorted(due, key=lambda c: c.priority)
+
+    def spread(self, key: str, now: Optional[float] = None):
+        # Moves every check onto a stable slot within its interval, derived
+        # from ``key`` (the user id) and anchored to wall-clock time. A fleet
+        # restarted at once then polls evenly across the interval instead of
+        # in lockstep, and each account keeps its slot across restarts.
+        now = clock.time() if now is None else now
+        self._rng.seed(key)
+        checks = [entry[3] for entry in self._heap]
+        self._heap = []
+        for check in checks:
+            digest = hashlib.sha256(f"{key}:{check.name}".encode()).digest()
+            phase = int.from_bytes(digest[:8], "big") / 2 ** 64 * check.interval
+            check.slot = now + (phase - now) % check.interval
+            check.due = check.slot + self._jitter(check)
+            self._push(check)
+
+    def _jitter(self, check: Check) -> float:
+        return self._rng.uniform(0, min(check.interval * self.JITTER, self.MAX_JITTER))
+
+    def reschedule(self, checks: list, now: Optional[float] = None):
+        now = clock.time() if now is None else now
+        for check in checks:
+            if check.slot is None:
+                check.due = max(check.due + check.interval, now)
+            else:
+                # Stay on the phase grid; after a long stall (API downtime)
+                # run once now-ish instead of replaying every missed slot.
+                check.slot += check.interval
+                if check.slot <= now - check.interval:
+                    check.slot += (now - check.slot) // check.interval * check.interval
+                check.due = check.slot + self._jitter(check)
+            self._push(check)
+
+    def defer(self, checks: list):
+        for check in checks:
+            self._push(check)
+
 # ─────────────────────────────────────────────────────────────────────────────
 #  Monitor
 # ─────────────────────────────────────────────────────────────────────────────
 class Monitor:
-    def __init__(self):
-        self.config = Config()
-        self.storage = Storage()
-        self.api = RobloxAPI(self.config["ROBLOSECURITY"])
+    def __init__(self, cookie: Optional[str] = None, config: Optional[Config] = None, interactive: bool = True):
+        self.config = config or Config()
+        primary = not cookie or cookie == self.config["ROBLOSECURITY"]
+        # The primary account keeps the original flat STORAGE_DIR layout.
+        self.storage = Storage() if primary else Storage.for_account(cookie)
+        self.api = RobloxAPI(cookie or self.config["ROBLOSECURITY"])
+        self.interactive = interactive
+        self.on_event = None
+        self.stats = {"cycles": 0, "errors": 0, "changes": 0}
         self.notifier = DiscordNotifier(
             self.config["DISCORD_WEBHOOK_URL"],
             self.config["DISCORD_EMOJI_NAME"],
-            self.config["DISCORD_EMOJI_ID"]
+            self.config["DISCORD_EMOJI_ID"],
+            sinks=build_sinks(self.config),
+            digest_window=float(self.config["DIGEST_WINDOW"] or 0)
         )
+        # Account name alert rules are written against (as in history export).
+        self.account_key = "primary" if primary else self.api.fingerprint
+        self.rules = load_rules(self.config)
+        self.rule_history = {}
+        self.group_ids = parse_id_list(self.config["GROUP_IDS"]) if primary else []
+        self.group_storage = {gid: Storage.for_group(gid) for gid in self.group_ids}
+        self.pool = ThreadPoolExecutor(max_workers=MAX_WORKERS) if self.group_ids else None
+        self._group_cursor = 0  # first group a budget-cut cycle did not reach
         self.stop_event = threading.Event()
         self.last_status = None
         self.downtime_start = None
+        # Per-cycle hand-off from the robux/totals checks to _attribute().
+        self._balance_change = None
+        self._totals_changes = None
+        self._totals_fetched = False
+        self.instance_lock = FileLock(os.path.join(self.storage.directory, "monitor.lock"))
+        self.api_ok_until = 0.0  # clock time until which the last API probe stands
+        self.cycle_budget = float(self.config["CYCLE_BUDGET"] or 0)
+        if str(self.config["HEDGE_REQUESTS"]).lower() in ("1", "true", "yes"):
+            hedging.enabled = True
+        self.scheduler = CheckScheduler()
+        for check in self._checks():
+            self.scheduler.add(check)
 
     def start(self):
         print(f"{Colors.BOLD}{Colors.MAGENTA}Roblox Transaction & Robux Monitor (CLI){Colors.RESET}\n")
         self.config.show_summary()
 
-        if not self.api.authenticate():
+        if not self.claim():
+            print(f"{Colors.RED}Cannot start: another monitor is already running for this account.{Colors.RESET}")
+            return
+
+        if not self.api.login():
             print(f"{Colors.RED}Cannot start: Invalid or expired .ROBLOSECURITY cookie.{Colors.RESET}")
+            self.instance_lock.release()
             return
 
         print(f"{Colors.GREEN}Monitoring started. Press Ctrl+C to stop.{Colors.RESET}")
         signal.signal(signal.SIGINT, self._signal_handler)
+        if profiler.mode and hasattr(signal, "SIGUSR1"):
+            signal.signal(signal.SIGUSR1, profiler.dump)
+        self.run()
 
+    def _spread(self):
+        # Fleet monitors (supervisor, cluster, asyncio) take a per-account
+        # phase; the interactive single-account monitor checks right away.
+        if not self.interactive:
+            self.scheduler.spread(str(self.api.user_id or self.api.fingerprint))
+
+    def run(self):
+        self._spread()
         while not self.stop_event.is_set():
+            self.run_once()
+
+        if self.pool:
+            self.pool.shutdown(wait=False)
+        auth_cache.flush(force=True)
+        self.notifier.flush_digest(force=True)
+        self.notifier.close()
+        self.storage.close()
+        for storage in self.group_storage.values():
+            storage.close()
+        self.instance_lock.release()
+
+    def claim(self) -> bool:
+        # One monitor per account: a second process (or supervisor shard) for
+        # the same account would double every alert.
+        return self.instance_lock.acquire(blocking=False)
+
+    def export_state(self) -> dict:
+        return {
+            "account": self.storage.export_state(),
+            "groups": {gid: storage.export_state() for gid, storage in self.group_storage.items()},
+            # Carried so the next host does not announce the status it already had.
+            "status": self.last_status
+        }
+
+    def import_state(self, state: dict):
+        self.last_status = state.get("status")
+        self.storage.import_state(state.get("account") or {})
+        for gid, data in (state.get("groups") or {}).items():
+            if gid in self.group_storage:
+                self.group_storage[gid].import_state(data)
+
+    def run_once(self):
+        auth_cache.flush()
+        due = self.scheduler.pop_due()
+        if not due:
+            self._wait(self.scheduler.next_due() - clock.time())
+            return
+        if not self._api_healthy():
+            self.scheduler.defer(due)
+            self._wait()
+            return
+        overran = []
+        with cycle_budget(self.cycle_budget):
+            for check in due:
+                try:
+                    with profiler.phase(f"check:{check.name}"):
+                        check.func()
+                except DeadlineExceeded:
+                    overran.append(check)
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    print(f"{Colors.RED}Error in {check.name}: {e}{Colors.RESET}")
             try:
-                if not self._check_api():
-                    self._wait()
-                    continue
-                self._check_transactions()
-                self._check_robux()
-                self._check_account_status()
+                self._fetch_for_attribution()
             except Exception as e:
-                print(f"{Colors.RED}Error: {e}{Colors.RESET}")
-            self._wait()
+                print(f"{Colors.RED}Error in attribution: {e}{Colors.RESET}")
+        self._attribute()
+        self.notifier.flush_digest()
+        self._settle(due, overran)
+        self._sync_storage()
+        self.stats["cycles"] += 1
+
+    def _fetch_for_attribution(self):
+        # A balance move is attributed in the cycle it is seen, so the totals
+        # check is pulled forward when it was not due this cycle.
+        if self._balance_change and not self._totals_fetched:
+            self._check_transactions()
+
+    def _attribute(self):
+        balance, changes, fetched = self._balance_change, self._totals_changes, self._totals_fetched
+        self._balance_change, self._totals_changes, self._totals_fetched = None, None, False
+        if balance and fetched:
+            attribution = attribute_balance(*balance, changes or {})
+            explained = ", ".join(f"{k} {v:+d}" for k, v in attribution["explained"].items()) or "nothing"
+            color = Colors.YELLOW if attribution["residual"] else Colors.CYAN
+            print(f"{color}Balance {attribution['delta']:+d} explained by {explained}; residual {attribution['residual']:+d}{Colors.RESET}")
+            # Balance and totals are routed together so each field keeps its
+            # own rules: destinations that get the balance receive one
+            # attributed record, the rest the plain totals alert.
+            for sinks, routed in self._route(self.account_key, {"robux": balance, **(changes or {})}):
+                if "robux" in routed:
+                    totals = {field: change for field, change in routed.items() if field != "robux"}
+                    self.notifier.balance_attribution(*balance, attribution, totals, sinks=sinks)
+                else:
+                    self.notifier.transaction_change(routed, sinks=sinks)
+            self._emit("attribution", old=balance[0], new=balance[1], **attribution)
+            return
+        if balance:
+            for sinks, _ in self._route(self.account_key, {"robux": balance}):
+                self.notifier.robux_change(*balance, sinks=sinks)
+        if changes:
+            for sinks, routed in self._route(self.account_key, changes):
+                self.notifier.transaction_change(routed, sinks=sinks)
+
+    def _route(self, account: str, changes: dict) -> list:
+        if self.rules is None:
+            return [(None, changes)]
+        return self.rules.route(account, changes, clock.time(), self.rule_history)
+
+    def _settle(self, due: list, overran: list):
+        # Checks cut off by the cycle budget run again straight away with a
+        # fresh budget, once; a check that overruns twice in a row waits for
+        # its next slot so it cannot spin.
+        retry = [check for check in overran if not check.retried]
+        for check in due:
+            check.retried = check in retry
+        if overran:
+            print(f"{Colors.YELLOW}Cycle budget of {self.cycle_budget:.0f}s exhausted: {', '.join(c.name for c in overran)}{Colors.RESET}")
+        self.scheduler.defer(retry)
+        self.scheduler.reschedule([check for check in due if check not in retry])
+
+    def _sync_storage(self):
+        # What this cycle journaled is fsynced before the monitor goes idle,
+        # rather than whenever the next write happens to come along.
+        for storage in (self.storage, *self.group_storage.values()):
+            offload_io(storage.sync)
+
+    def _interval(self, key: str) -> int:
+        return max(10, int(self.config[key] or self.config["CHECK_INTERVAL"] or 60))
+
+    def _checks(self) -> list:
+        default = self._interval("CHECK_INTERVAL")
+        checks = [
+            Check("robux", self._check_robux, self._interval("ROBUX_INTERVAL"), priority=0),
+            Check("transactions", self._check_transactions, self._interval("TOTALS_INTERVAL"), priority=1),
+            Check("status", self._check_account_status, self._interval("STATUS_INTERVAL"), priority=5),
+        ]
+        if parse_id_list(self.config["TRANSACTION_TYPES"]):
+            checks.append(Check("ledger", self._check_transaction_log, default, priority=2))
+        if self.group_ids:
+            checks.append(Check("groups", self._check_groups, default, priority=3))
+        return checks
+
+    def _api_healthy(self) -> bool:
+        # One reachability probe per CHECK_INTERVAL rather than per scheduled check.
+        if self._api_known_good():
+            return True
+        healthy = self._check_api()
+        if healthy:
+            self._api_probed()
+        return healthy
+
+    def _api_known_good(self) -> bool:
+        # A session just resumed from the auth cache was validated recently;
+        # that stands in for the first probe instead of hitting /authenticated
+        # at startup. After that the cookie is only rechecked on a 401 or once
+        # the cache entry expires.
+        if self.api.resumed:
+            self.api.resumed = False
+            self._api_probed()
+        return clock.time() < self.api_ok_until
+
+    def _api_probed(self):
+        self.api_ok_until = clock.time() + self._interval("CHECK_INTERVAL")
+
+    def _emit(self, kind: str, **data):
+        self.stats["changes"] += 1
+        if self.on_event:
+            self.on_event({"kind": kind, "user_id": self.api.user_id, "time": clock.time(), **data})
 
     def _check_api(self) -> bool:
         try:
-            r = rate_limited_request("GET", "https://users.roblox.com/v1/users/authenticated", cookies=self.api.cookies, timeout=10)
+            r = rate_limited_request("GET", f"{RobloxAPI.USERS_API}/v1/users/authenticated", cookies=self.api.cookies, timeout=10)
             if r.status_code == 200:
-                if self.downtime_start:
-                    duration = time.time() - self.downtime_start
-                    self.notifier.api_downtime("RECOVERED", duration)
-                    print(f"{Colors.GREEN}API recovered after {duration:.1f}s{Colors.RESET}")
-                    self.downtime_start = None
-                return True
+                return self._api_result(decode_json(r).get("id"))
         except:
             pass
+        return self._api_result(None)
+
+    def _api_result(self, user_id) -> bool:
+        # ``user_id`` is None when the probe failed.
+        if user_id is not None:
+            self.api.mark_validated(user_id)
+            if self.downtime_start:
+                duration = clock.time() - self.downtime_start
+                self.notifier.api_downtime("RECOVERED", duration)
+                print(f"{Colors.GREEN}API recovered after {duration:.1f}s{Colors.RESET}")
+                self.downtime_start = None
+            return True
 
         if not self.downtime_start:
-            self.downtime_start = time.time()
+            self.downtime_start = clock.time()
             self.notifier.api_downtime("STARTED")
             print(f"{Colors.RED}Roblox API unreachable. Retrying...{Colors.RESET}")
         return False
 
     def _check_transactions(self):
-        data = self.api.get_transaction_totals(self.config["TOTAL_CHECKS_TYPE"])
+        return self._apply_totals(self.api.get_transaction_totals(self.config["TOTAL_CHECKS_TYPE"]))
+
+    def _apply_totals(self, data: Optional[dict]):
         if not data: return
+        self.storage.record_history("totals", data)
         last = self.storage.load_transactions()
         changes = {k: (last.get(k, 0), v) for k, v in data.items() if v != last.get(k, 0)}
         if changes:
             print(f"{Colors.YELLOW}Transaction changes detected:{Colors.RESET}")
             for k, (o, n) in changes.items():
                 print(f"  {Colors.CYAN}{k}: {abbreviate_number(o)} to {abbreviate_number(n)}{Colors.RESET}")
-            self.notifier.transaction_change(changes)
+            self._totals_changes = changes
             self.storage.save_transactions(data)
+            self._emit("transactions", changes=changes)
+        self._totals_fetched = True
+        return data
+
+    def _check_transaction_log(self):
+        for tx_type in parse_id_list(self.config["TRANSACTION_TYPES"]):
+            state = self.storage.load_tx_cursor(tx_type)
+            count = 0
+            try:
+                for items, update in self.api.iter_transaction_pages(tx_type, state):
+                    count += self._flush_page(tx_type, state, items, update)
+            finally:
+                self._finish_transaction_log(tx_type, state, count)
+
+    def _flush_page(self, tx_type: str, state: dict, items: list, update: dict) -> int:
+        # The cursor is persisted after every batch, so a walk cut short
+        # (deadline, network, storage) resumes after the last delivered item
+        # instead of sending it again.
+        count = 0
+        for i in range(0, len(items), 25):
+            batch = items[i:i + 25]
+            count += self._flush_transactions(tx_type, batch)
+            state["flushed_id"] = int(batch[-1].get("id", 0))
+            self.storage.save_tx_cursor(tx_type, state)
+        state.update(update)
+        return count
+
+    def _finish_transaction_log(self, tx_type: str, state: dict, count: int):
+        self.storage.save_tx_cursor(tx_type, state)
+        if count:
+            print(f"{Colors.YELLOW}{count} new {tx_type} transaction(s) recorded{Colors.RESET}")
+
+    def _flush_transactions(self, tx_type: str, batch: list) -> int:
+        self.storage.append_transactions(batch)
+        self.notifier.new_transactions(tx_type, batch)
+        self._emit("ledger", tx_type=tx_type, count=len(batch))
+        return len(batch)
 
     def _check_robux(self):
-        robux = self.api.get_robux()
+        return self._apply_robux(self.api.get_robux())
+
+    def _apply_robux(self, robux: Optional[int]):
         if robux is None: return
+        self.storage.record_history("robux", {"robux": robux})
+        known = self.storage.journal.get("robux") is not None
         last = self.storage.load_robux()
         if robux != last:
             change = "Increased" if robux > last else "Decreased"
             print(f"{Colors.MAGENTA}Robux {change}: {abbreviate_number(last)} to {abbreviate_number(robux)}{Colors.RESET}")
-            self.notifier.robux_change(last, robux)
+            if known:
+                self._balance_change = (last, robux)
+            else:
+                # First reading for this account: nothing to attribute against.
+                for sinks, _ in self._route(self.account_key, {"robux": (last, robux)}):
+                    self.notifier.robux_change(last, robux, sinks=sinks)
             self.storage.save_robux(robux)
+            self._emit("robux", old=last, new=robux)
+        return robux
+
+    def _check_groups(self):
+        if not self.pool:
+            return
+        order = self._groups_in_turn()
+        futures = {gid: self.pool.submit(contextvars.copy_context().run, self._check_group, gid) for gid in order}
+        errors = {}
+        for gid, future in futures.items():
+            try:
+                future.result()
+            except Exception as e:
+                errors[gid] = e
+        self._groups_polled(order, errors)
+
+    def _groups_in_turn(self) -> list:
+        # Groups are polled starting where the last budget cut-off stopped,
+        # so a budget too small for every group still covers each in turn
+        # instead of starving the same tail every cycle.
+        start = self._group_cursor % len(self.group_ids)
+        return self.group_ids[start:] + self.group_ids[:start]
+
+    def _groups_polled(self, order: list, errors: dict):
+        late = [gid for gid in order if isinstance(errors.get(gid), DeadlineExceeded)]
+        for gid, e in errors.items():
+            if gid not in late:
+                print(f"{Colors.RED}Group {gid} error: {e}{Colors.RESET}")
+        if late:
+            self._group_cursor = self.group_ids.index(late[0])
+            raise DeadlineExceeded(f"{len(late)} group(s) not polled before the cycle deadline")
+
+    def _check_group(self, group_id: str):
+        self._apply_group_funds(group_id, self.api.get_group_funds(group_id))
+        self._apply_group_revenue(group_id, self.api.get_group_revenue(group_id, self.config["TOTAL_CHECKS_TYPE"]))
+
+    def _apply_group_funds(self, group_id: str, funds: Optional[int]):
+        storage = self.group_storage[group_id]
+        if funds is not None:
+            storage.record_history("robux", {"robux": funds})
+            last = storage.load_robux()
+            if funds != last:
+                print(f"{Colors.MAGENTA}Group {group_id} funds: {abbreviate_number(last)} to {abbreviate_number(funds)}{Colors.RESET}")
+                for sinks, _ in self._route(f"group:{group_id}", {"robux": (last, funds)}):
+                    self.notifier.robux_change(last, funds, title=f"Group {group_id} Funds Changed", sinks=sinks)
+                storage.save_robux(funds)
+                self._emit("group_funds", group_id=group_id, old=last, new=funds)
+
+    def _apply_group_revenue(self, group_id: str, data: Optional[dict]):
+        storage = self.group_storage[group_id]
+        if not data: return
+        storage.record_history("revenue", data)
+        if storage.journal.get("transactions") is None:
+            # First reading for this group: it becomes the baseline. Comparing
+            # against the user-level zero defaults would alert on every field.
+            storage.save_transactions(data)
+            return
+        last = storage.load_transactions()
+        changes = {k: (last.get(k, 0), v) for k, v in data.items() if v != last.get(k, 0)}
+        if changes:
+            print(f"{Colors.YELLOW}Group {group_id} revenue changes detected:{Colors.RESET}")
+            for k, (o, n) in changes.items():
+                print(f"  {Colors.CYAN}{k}: {abbreviate_number(o)} to {abbreviate_number(n)}{Colors.RESET}")
+            for sinks, routed in self._route(f"group:{group_id}", changes):
+                self.notifier.transaction_change(routed, title=f"Group {group_id} Revenue Updated", sinks=sinks)
+            storage.save_transactions(data)
+            self._emit("group_revenue", group_id=group_id, changes=changes)
 
     def _check_account_status(self):
-        status = self.api.get_account_status()
+        return self._apply_status(self.api.get_account_status())
+
+    def _apply_status(self, status: Optional[dict]):
         if not status: return
         if self.last_status != status:
             banned = status.get("is_banned", False)
             print(f"{Colors.RED if banned else Colors.GREEN}Account {'BANNED' if banned else 'ACTIVE'}: {status['username']}{Colors.RESET}")
             self.notifier.account_status(status, self.last_status)
             self.last_status = status
+            self._emit("status", status=status)
+        return status
 
-    def _wait(self):
-        interval = max(10, int(self.config["CHECK_INTERVAL"] or 60))
+    def _wait(self, seconds: Optional[float] = None):
+        interval = max(1, int(round(seconds))) if seconds is not None else self._interval("CHECK_INTERVAL")
+        if not self.interactive:
+            clock.wait(self.stop_event, interval)
+            return
         for i in range(interval):
             if self.stop_event.is_set():
                 break
             mins, secs = divmod(interval - i, 60)
             print(f"\r{Colors.BLUE}Next check in {mins:02d}:{secs:02d}{Colors.RESET}", end="", flush=True)
-            time.sleep(1)
+            clock.sleep(1)
         print()
 
     def _signal_handler(self, signum, frame):
         print(f"\n{Colors.YELLOW}Shutting down gracefully... (signal {signum}){Colors.RESET}")
         self.stop_event.set()
 
+# ─────────────────────────────────────────────────────────────────────────────
+#  Supervisor (multi-process sharding)
+# ─────────────────────────────────────────────────────────────────────────────
+def configured_accounts(config) -> list:
+    cookies = [config["ROBLOSECURITY"]] + list(config["ACCOUNTS"] or [])
+    return list(dict.fromkeys(c for c in cookies if c))
+
+def _start_shard_monitor(shard_id: int, cookie: str, config: Config, events) -> Optional[Monitor]:
+    monitor = Monitor(cookie, config=config, interactive=False)
+    monitor.on_event = lambda event, s=shard_id: events.put(("event", s, event))
+    if not monitor.claim():
+        events.put(("event", shard_id, {"kind": "locked", "account": cookie_fingerprint(cookie)}))
+    elif not monitor.api.login():
+        monitor.instance_lock.release()
+        events.put(("event", shard_id, {"kind": "auth_failed", "account": cookie_fingerprint(cookie)}))
+    else:
+        return monitor
+    monitor.notifier.close(wait=False)
+    return None
+
+def _shard_worker(shard_id: int, cookies: list, config_data: dict, events, stop, control):
+    # Runs inside a child process: one Monitor thread per account, events and
+    # periodic metrics are pushed back to the parent through ``events``.
+    # The parent sends a new account list on ``control`` when the layout
+    # changes (None to stop), so only the accounts that moved are touched.
+    # Accounts that are locked elsewhere or fail to authenticate are retried
+    # with a doubling backoff instead of being dropped for the process life.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    config = Config(config_data)
+    running = {}  # cookie -> (monitor, thread)
+    pending = {}  # cookie -> (next try, backoff)
+
+    def assign(cookies: list):
+        for cookie in [c for c in running if c not in cookies]:
+            monitor, thread = running.pop(cookie)
+            monitor.stop_event.set()
+            thread.join(timeout=15)
+        for cookie in [c for c in pending if c not in cookies]:
+            del pending[cookie]
+        for cookie in cookies:
+            if cookie not in running and cookie not in pending:
+                pending[cookie] = (0.0, Supervisor.RETRY_BACKOFF)
+
+    assign(cookies)
+    next_metrics = time.time() + Supervisor.METRICS_INTERVAL
+    while not stop.is_set():
+        now = time.time()
+        for cookie, (due, backoff) in list(pending.items()):
+            if due > now:
+                continue
+            monitor = _start_shard_monitor(shard_id, cookie, config, events)
+            if monitor is None:
+                pending[cookie] = (now + backoff, min(backoff * 2, Supervisor.RETRY_BACKOFF_MAX))
+                continue
+            del pending[cookie]
+            thread = threading.Thread(target=monitor.run, daemon=True)
+            thread.start()
+            running[cookie] = (monitor, thread)
+        if now >= next_metrics:
+            totals = {"accounts": len(running), "cycles": 0, "errors": 0, "changes": 0}
+            for monitor, _ in running.values():
+                for key, value in monitor.stats.items():
+                    totals[key] += value
+            events.put(("metrics", shard_id, totals))
+            events.put(("rate", shard_id, request_meter.buckets()))
+            next_metrics = now + Supervisor.METRICS_INTERVAL
+        wake = min([next_metrics] + [due for due, _ in pending.values()])
+        try:
+            update = control.get(timeout=max(0.0, wake - time.time()))
+        except queue.Empty:
+            continue
+        if update is None:
+            break
+        assign(update)
+
+    for monitor, _ in running.values():
+        monitor.stop_event.set()
+    for _, thread in running.values():
+        thread.join(timeout=15)
+
+class Supervisor:
+    METRICS_INTERVAL = 10
+    RESTART_BACKOFF = 5
+    RETRY_BACKOFF = 5
+    RETRY_BACKOFF_MAX = 900
+
+    def __init__(self, workers: Optional[int] = None):
+        self.config = Config()
+        self.workers_override = workers
+        self.events = multiprocessing.Queue()
+        self.shards = {}  # shard_id -> {"proc", "stop", "cookies", "started"}
+        self.metrics = {}
+        self.rates = {}
+        self.restarts = 0
+        self.stop_event = threading.Event()
+
+    def _accounts(self) -> list:
+        return configured_accounts(self.config)
+
+    def _worker_count(self, accounts: list) -> int:
+        wanted = self.workers_override or int(self.config["WORKERS"] or 0) or os.cpu_count() or 1
+        return max(1, min(wanted, len(accounts)))
+
+    @staticmethod
+    def split(accounts: list, workers: int) -> list:
+        # Accounts are placed on a hash ring of shard ids, so changing the
+        # worker count moves only about 1/N of them.
+        ring = HashRing([str(shard_id) for shard_id in range(workers)])
+        shards = [[] for _ in range(workers)]
+        for cookie in accounts:
+            shards[int(ring.owner(cookie_fingerprint(cookie)))].append(cookie)
+        return shards
+
+    def _spawn(self, shard_id: int, cookies: list):
+        stop = multiprocessing.Event()
+        control = multiprocessing.Queue()
+        proc = multiprocessing.Process(
+            target=_shard_worker,
+            args=(shard_id, cookies, self.config.data, self.events, stop, control),
+            name=f"monitor-shard-{shard_id}",
+            daemon=True
+        )
+        proc.start()
+        self.shards[shard_id] = {"proc": proc, "stop": stop, "control": control, "cookies": cookies, "started": time.time()}
+
+    def _stop_all(self):
+        self._stop_shards(list(self.shards))
+
+    def _stop_shards(self, shard_ids: list):
+        for shard_id in shard_ids:
+            self.shards[shard_id]["stop"].set()
+            self.shards[shard_id]["control"].put(None)
+        for shard_id in shard_ids:
+            shard = self.shards.pop(shard_id)
+            shard["proc"].join(timeout=20)
+            if shard["proc"].is_alive():
+                shard["proc"].terminate()
+            self.metrics.pop(shard_id, None)
+            self.rates.pop(shard_id, None)
+
+    def _rebalance(self):
+        # Running shards are sent their new account list rather than being
+        # restarted, so only the accounts that moved stop or start. A moved
+        # account is picked up by its new shard on a retry once the old one
+        # has let go of its lock.
+        accounts = self._accounts()
+        layout = {shard_id: cookies for shard_id, cookies in enumerate(self.split(accounts, self._worker_count(accounts))) if cookies}
+        if layout == {shard_id: shard["cookies"] for shard_id, shard in self.shards.items()}:
+            return
+        if self.shards:
+            print(f"{Colors.YELLOW}Rebalancing {len(accounts)} account(s) across {len(layout)} worker(s)...{Colors.RESET}")
+        self._stop_shards([shard_id for shard_id in self.shards if shard_id not in layout])
+        for shard_id, cookies in sorted(layout.items()):
+            shard = self.shards.get(shard_id)
+            if shard is None:
+                self._spawn(shard_id, cookies)
+            elif shard["cookies"] != cookies:
+                shard["control"].put(cookies)
+                shard["cookies"] = cookies
+
+    def _revive(self):
+        for shard_id, shard in list(self.shards.items()):
+            proc = shard["proc"]
+            if proc.is_alive() or time.time() - shard["started"] < self.RESTART_BACKOFF:
+                continue
+            print(f"{Colors.RED}Worker {shard_id} exited (code {proc.exitcode}), restarting...{Colors.RESET}")
+            self.restarts += 1
+            self._spawn(shard_id, shard["cookies"])
+
+    def _drain(self, timeout: float):
+        try:
+            kind, shard_id, payload = self.events.get(timeout=timeout)
+        except Exception:
+            return
+        if kind == "metrics":
+            self.metrics[shard_id] = payload
+        elif kind == "rate":
+            self.rates[shard_id] = payload
+        else:
+            print(f"{Colors.CYAN}[shard {shard_id}] {payload.get('kind')} user={payload.get('user_id')}{Colors.RESET}")
+
+    def summary(self) -> dict:
+        totals = {"workers": len(self.shards), "restarts": self.restarts, "accounts": 0, "cycles": 0, "errors": 0, "changes": 0}
+        for metrics in self.metrics.values():
+            for key, value in metrics.items():
+                totals[key] += value
+        # Request demand summed per second across shards; all share one wall clock.
+        merged = {}
+        for buckets in self.rates.values():
+            for second, count in buckets.items():
+                merged[second] = merged.get(second, 0) + count
+        totals.update(RequestRateMeter.smoothness(merged))
+        return totals
+
+    def start(self):
+        print(f"{Colors.BOLD}{Colors.MAGENTA}Roblox Monitor Supervisor{Colors.RESET}\n")
+        signal.signal(signal.SIGINT, self._signal_handler)
+        self._rebalance()
+        print(f"{Colors.GREEN}Supervising {len(self._accounts())} account(s) on {len(self.shards)} worker(s). Press Ctrl+C to stop.{Colors.RESET}")
+        last_report = time.time()
+        while not self.stop_event.is_set():
+            self._drain(timeout=1.0)
+            self._revive()
+            if time.time() - last_report >= self.METRICS_INTERVAL * 6:
+                # Config edits (accounts or WORKERS) are picked up here.
+                self.config = Config()
+                self._rebalance()
+                print(f"{Colors.BLUE}Supervisor: {self.summary()}{Colors.RESET}")
+                last_report = time.time()
+        self._stop_all()
+
+    def _signal_handler(self, signum, frame):
+        print(f"\n{Colors.YELLOW}Stopping workers... (signal {signum}){Colors.RESET}")
+        self.stop_event.set()
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  Cluster (lease-based sharding across hosts)
+# ─────────────────────────────────────────────────────────────────────────────
+class LeaseStore:
+    # Host heartbeats, per-account leases and per-account monitor state in
+    # one SQLite file on a shared volume. Every mutation is a short
+    # BEGIN IMMEDIATE transaction. The default rollback journal is kept on
+    # purpose: WAL needs shared memory, which network filesystems lack.
+    # A lease's epoch goes up each time it changes hands; state writes and
+    # renewals must present the current epoch, so a host that lost its lease
+    # can never overwrite its successor's state.
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS hosts (host_id TEXT PRIMARY KEY, heartbeat REAL NOT NULL);
+        CREATE TABLE IF NOT EXISTS leases (account TEXT PRIMARY KEY, host_id TEXT NOT NULL, expires REAL NOT NULL, epoch INTEGER NOT NULL);
+        CREATE TABLE IF NOT EXISTS state (account TEXT PRIMARY KEY, epoch INTEGER NOT NULL, updated REAL NOT NULL, data BLOB NOT NULL);
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.db.executescript(self.SCHEMA)
+
+    @contextlib.contextmanager
+    def _tx(self):
+        with self._lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.db
+            except BaseException:
+                self.db.execute("ROLLBACK")
+                raise
+            self.db.execute("COMMIT")
+
+    def heartbeat(self, host_id: str, now: float):
+        with self._tx() as db:
+            db.execute("INSERT OR REPLACE INTO hosts (host_id, heartbeat) VALUES (?, ?)", (host_id, now))
+
+    def live_hosts(self, since: float) -> list:
+        with self._lock:
+            rows = self.db.execute("SELECT host_id FROM hosts WHERE heartbeat >= ? ORDER BY host_id", (since,))
+            return [row[0] for row in rows]
+
+    def leave(self, host_id: str):
+        with self._tx() as db:
+            db.execute("DELETE FROM hosts WHERE host_id = ?", (host_id,))
+            db.execute("UPDATE leases SET expires = 0 WHERE host_id = ?", (host_id,))
+
+    def acquire(self, account: str, host_id: str, now: float, ttl: float) -> Optional[int]:
+        # Returns the lease epoch, or None while another host holds it.
+        with self._tx() as db:
+            row = db.execute("SELECT host_id, expires, epoch FROM leases WHERE account = ?", (account,)).fetchone()
+            if row is None:
+                db.execute("INSERT INTO leases (account, host_id, expires, epoch) VALUES (?, ?, ?, 1)", (account, host_id, now + ttl))
+                return 1
+            holder, expires, epoch = row
+            if holder == host_id and expires >= now:
+                db.execute("UPDATE leases SET expires = ? WHERE account = ?", (now + ttl, account))
+                return epoch
+            if expires < now:
+                db.execute("UPDATE leases SET host_id = ?, expires = ?, epoch = ? WHERE account = ?", (host_id, now + ttl, epoch + 1, account))
+                return epoch + 1
+            return None
+
+    def renew(self, host_id: str, leases: dict, now: float, ttl: float) -> set:
+        # ``leases`` maps account -> epoch; returns the accounts still held.
+        held = set()
+        with self._tx() as db:
+            for account, epoch in leases.items():
+                cur = db.execute("UPDATE leases SET expires = ? WHERE account = ? AND host_id = ? AND epoch = ?",
+                                 (now + ttl, account, host_id, epoch))
+                if cur.rowcount:
+                    held.add(account)
+        return held
+
+    def release(self, account: str, host_id: str, epoch: int):
+        with self._tx() as db:
+            db.execute("UPDATE leases SET expires = 0 WHERE account = ? AND host_id = ? AND epoch = ?", (account, host_id, epoch))
+
+    def save_states(self, host_id: str, states: dict, now: float) -> int:
+        # ``states`` maps account -> (epoch, state); fenced by the lease epoch.
+        saved = 0
+        with self._tx() as db:
+            for account, (epoch, state) in states.items():
+                row = db.execute("SELECT 1 FROM leases WHERE account = ? AND host_id = ? AND epoch = ?", (account, host_id, epoch)).fetchone()
+                if row is None:
+                    continue
+                data = zlib.compress(codec.dumps(state))
+                db.execute("INSERT OR REPLACE INTO state (account, epoch, updated, data) VALUES (?, ?, ?, ?)", (account, epoch, now, data))
+                saved += 1
+        return saved
+
+    def load_state(self, account: str) -> Optional[dict]:
+        with self._lock:
+            row = self.db.execute("SELECT data FROM state WHERE account = ?", (account,)).fetchone()
+        return codec.loads(zlib.decompress(row[0])) if row else None
+
+    def close(self):
+        with self._lock:
+            self.db.close()
+
+class HashRing:
+    # Each host owns VNODES points on a 64-bit ring and an account belongs to
+    # the first point at or after its own hash, so adding or removing one of
+    # N hosts moves only about 1/N of the accounts.
+    VNODES = 160
+
+    def __init__(self, hosts: list):
+        self.points = sorted((self._hash(f"{host}#{i}"), host) for host in hosts for i in range(self.VNODES))
+        self.keys = [point for point, _ in self.points]
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        return int.from_bytes(hashlib.sha256(value.encode()).digest()[:8], "big")
+
+    def owner(self, key: str) -> Optional[str]:
+        if not self.points:
+            return None
+        return self.points[bisect.bisect(self.keys, self._hash(key)) % len(self.points)][1]
+
+class ClusterNode:
+    # One per host, all sharing a LeaseStore. Every LEASE_TTL/3 a node
+    # heartbeats and renews its leases. It hands off accounts the ring now
+    # gives to another live host, and claims accounts the ring gives to it
+    # once their lease is free. Monitor state is pushed to the store each
+    # tick and on hand-off, and pulled before a monitor starts, so an account
+    # resumes where its previous host left it. A crashed host's leases and
+    # heartbeat age out after LEASE_TTL.
+    STOP_TIMEOUT = 30
+
+    def __init__(self, db_path: Optional[str] = None, host_id: Optional[str] = None, lease_ttl: Optional[float] = None):
+        self.config = Config()
+        self.host_id = host_id or self.config["HOST_ID"] or f"{socket.gethostname()}-{os.getpid()}"
+        self.lease_ttl = float(lease_ttl or self.config["LEASE_TTL"] or 30)
+        self.store = LeaseStore(db_path or self.config["CLUSTER_DB"] or os.path.join(APP_DIR, "cluster.db"))
+        self.held = {}  # fingerprint -> {"epoch", "monitor", "thread"}
+        self.renewed_at = clock.time()
+        self.stop_event = threading.Event()
+
+    def _accounts(self) -> dict:
+        return {cookie_fingerprint(cookie): cookie for cookie in configured_accounts(self.config)}
+
+    def tick(self):
+        # The clock is read at each lease operation rather than once per
+        # tick: logins in _start() can take seconds each, and a lease taken
+        # or renewed with a stale time would start out near its expiry.
+        now = clock.time()
+        self.store.heartbeat(self.host_id, now)
+        ring = HashRing(self.store.live_hosts(now - self.lease_ttl))
+        accounts = self._accounts()
+        lost = self._renew()
+
+        states, moved = {}, []
+        for fp in list(self.held):
+            if fp in lost:
+                continue
+            if fp not in accounts or ring.owner(fp) != self.host_id:
+                print(f"{Colors.YELLOW}[cluster] Handing {fp} off to {ring.owner(fp)}.{Colors.RESET}")
+                moved.append(fp)
+            else:
+                states[fp] = (self.held[fp]["epoch"], self.held[fp]["monitor"].export_state())
+        self._stop(lost, handoff=False)
+        self._stop(moved, handoff=True)
+        if states:
+            self.store.save_states(self.host_id, states, clock.time())
+
+        for fp, cookie in accounts.items():
+            if fp in self.held or ring.owner(fp) != self.host_id:
+                continue
+            epoch = self.store.acquire(fp, self.host_id, clock.time(), self.lease_ttl)
+            if epoch is not None:
+                self._start(fp, cookie, epoch)
+            if clock.time() - self.renewed_at >= self.lease_ttl / 3:
+                # A long run of logins would otherwise outlast the leases
+                # renewed at the top of the tick.
+                self._stop(self._renew(), handoff=False)
+
+    def _renew(self) -> list:
+        # Renews every held lease from the current time; returns the ones
+        # that were lost (taken over or expired), still in self.held.
+        now = clock.time()
+        still_held = self.store.renew(self.host_id, {fp: held["epoch"] for fp, held in self.held.items()}, now, self.lease_ttl)
+        self.renewed_at = now
+        lost = [fp for fp in self.held if fp not in still_held]
+        for fp in lost:
+            print(f"{Colors.RED}[cluster] Lease on {fp} lost; stopping its monitor.{Colors.RESET}")
+        return lost
+
+    def _start(self, fp: str, cookie: str, epoch: int):
+        monitor = Monitor(cookie, config=self.config, interactive=False)
+        if not monitor.claim():
+            print(f"{Colors.YELLOW}[cluster] {fp} is already monitored on this host; skipping.{Colors.RESET}")
+            self.store.release(fp, self.host_id, epoch)
+            return
+        state = self.store.load_state(fp)
+        if state:
+            monitor.import_state(state)
+        if not monitor.api.login():
+            monitor.instance_lock.release()
+            self.store.release(fp, self.host_id, epoch)
+            return
+        thread = threading.Thread(target=monitor.run, name=f"monitor-{fp}", daemon=True)
+        thread.start()
+        self.held[fp] = {"epoch": epoch, "monitor": monitor, "thread": thread}
+        print(f"{Colors.GREEN}[cluster] Monitoring {fp} (lease epoch {epoch}).{Colors.RESET}")
+
+    def _stop(self, fps: list, handoff: bool):
+        # All monitors are told to stop at once and their joins share one
+        # budget of a tick period, so a tick handing off many accounts still
+        # renews the rest well inside the lease TTL.
+        stopping = {fp: self.held.pop(fp) for fp in fps}
+        for held in stopping.values():
+            held["monitor"].stop_event.set()
+        deadline = time.monotonic() + min(self.STOP_TIMEOUT, self.lease_ttl / 3)
+        for held in stopping.values():
+            held["thread"].join(timeout=max(0.0, deadline - time.monotonic()))
+        if handoff and stopping:
+            states = {fp: (held["epoch"], held["monitor"].export_state()) for fp, held in stopping.items()}
+            self.store.save_states(self.host_id, states, clock.time())
+            for fp, held in stopping.items():
+                self.store.release(fp, self.host_id, held["epoch"])
+
+    def start(self):
+        print(f"{Colors.BOLD}{Colors.MAGENTA}Roblox Monitor Cluster Node {self.host_id}{Colors.RESET}\n")
+        print(f"{Colors.CYAN}Lease store: {self.store.path} (lease TTL {self.lease_ttl:.0f}s){Colors.RESET}")
+        signal.signal(signal.SIGINT, self._signal_handler)
+        while not self.stop_event.is_set():
+            try:
+                self.tick()
+            except sqlite3.Error as e:
+                print(f"{Colors.RED}[cluster] Lease store unavailable: {e}{Colors.RESET}")
+                if clock.time() - self.renewed_at > self.lease_ttl:
+                    # Our leases have lapsed and may already be someone else's.
+                    self._stop(list(self.held), handoff=False)
+            clock.wait(self.stop_event, self.lease_ttl / 3)
+        self._stop(list(self.held), handoff=True)
+        self.store.leave(self.host_id)
+        self.store.close()
+
+    def _signal_handler(self, signum, frame):
+        print(f"\n{Colors.YELLOW}Handing off accounts... (signal {signum}){Colors.RESET}")
+        self.stop_event.set()
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  Async Monitor (asyncio)
+# ─────────────────────────────────────────────────────────────────────────────
+class _AsyncResponse:
+    # Body is read before the connection goes back to the pool, so the sync
+    # helpers (decode_json, status checks) work on it unchanged.
+    __slots__ = ("status_code", "content")
+
+    def __init__(self, status_code: int, body: bytes):
+        self.status_code = status_code
+        self.content = body
+
+    def json(self):
+        return codec.loads(self.content)
+
+class AsyncRobloxAPI(RobloxAPI):
+    # Same endpoints, session cache and cursor walk as RobloxAPI, over one
+    # shared aiohttp session. Requests wait for their rate-limit slot with an
+    # await instead of a sleeping thread.
+    def __init__(self, cookie: str, http):
+        super().__init__(cookie)
+        self.http = http
+        # Sent as a header: the shared session's jar must never mix accounts.
+        self.headers = {"Cookie": f".ROBLOSECURITY={cookie}"}
+        self.slots = AccountRequestSlots()
+
+    async def _request(self, url: str, params: Optional[dict] = None) -> _AsyncResponse:
+        check_budget()
+        delay = await self.slots.reserve()
+        if delay > 0:
+            with profiler.phase("rate_limit"):
+                await clock.asleep(delay)
+        if params:
+            params = {k: str(v) for k, v in params.items()}
+        timeout = remaining_time(10)
+        with profiler.phase("network"):
+            hedge_after = hedging.delay(timeout)
+            if hedge_after is None:
+                return await self._fetch(url, params, timeout)
+            return await self._hedged(url, params, timeout, hedge_after)
+
+    async def _fetch(self, url: str, params: Optional[dict], timeout: float) -> _AsyncResponse:
+        # Connect/read timeouts like requests' timeout=10; time spent queued
+        # for a pooled connection does not count against the request.
+        started = time.perf_counter()
+        client_timeout = aiohttp.ClientTimeout(total=None, sock_connect=timeout, sock_read=timeout)
+        async with self.http.get(url, params=params, headers=self.headers, timeout=client_timeout) as r:
+            response = _AsyncResponse(r.status, await r.read())
+        hedging.latency.record(time.perf_counter() - started)
+        return response
+
+    async def _hedged(self, url: str, params: Optional[dict], timeout: float, hedge_after: float) -> _AsyncResponse:
+        first = asyncio.ensure_future(self._fetch(url, params, timeout))
+        done, _ = await asyncio.wait({first}, timeout=hedge_after)
+        if done or not hedging.allow():
+            return await first
+        hedge = asyncio.ensure_future(self._fetch(url, params, max(0.001, timeout - hedge_after)))
+        pending = {first, hedge}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def authenticate(self) -> bool:
+        try:
+            r = await self._request(f"{self.USERS_API}/v1/users/authenticated")
+            return self._auth_result(r.status_code, decode_json(r) if r.status_code == 200 else None)
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            print(f"{Colors.RED}Auth failed: {e}{Colors.RESET}")
+        return False
+
+    async def login(self) -> bool:
+        return self.resume() or await self.authenticate()
+
+    async def probe(self) -> Optional[int]:
+        # The monitor's API health check: the user id on success, else None.
+        try:
+            r = await self._request(f"{self.USERS_API}/v1/users/authenticated")
+            return decode_json(r).get("id") if r.status_code == 200 else None
+        except Exception:
+            return None
+
+    async def _get(self, url: str, params: Optional[dict] = None) -> _AsyncResponse:
+        if self._expired():
+            await self.authenticate()
+        r = await self._request(url, params)
+        if self._should_revalidate(r.status_code):
+            await self.authenticate()
+        return r
+
+    async def get_transaction_totals(self, timeframe: str) -> Optional[dict]:
+        if not self.user_id: return None
+        url = f"{self.ECONOMY_API}/v2/users/{self.user_id}/transaction-totals?timeFrame={timeframe}&transactionType=summary"
+        r = await self._get(url)
+        return decode_json(r) if r.status_code == 200 else None
+
+    async def get_robux(self) -> Optional[int]:
+        if not self.user_id: return None
+        r = await self._get(f"{self.ECONOMY_API}/v1/users/{self.user_id}/currency")
+        return decode_json(r).get("robux") if r.status_code == 200 else None
+
+    async def get_transactions_page(self, tx_type: str, cursor: Optional[str] = None) -> Optional[dict]:
+        if not self.user_id: return None
+        url, params = self._transactions_request(tx_type, cursor)
+        r = await self._get(url, params)
+        return decode_json(r) if r.status_code == 200 else None
+
+    async def iter_transaction_pages(self, tx_type: str, state: dict, max_pages: int = TRANSACTION_MAX_PAGES):
+        walk = self.start_walk(state)
+        while True:
+            cursor = walk["cursor"]
+            page = await self.get_transactions_page(tx_type, cursor)
+            if page is None:
+                return
+            items, update, done = self.walk_transactions_page(walk, page, max_pages)
+            state.update({"head_id": walk["head_id"], "cursor": cursor})
+            yield items, update
+            if done:
+                return
+
+    async def get_group_funds(self, group_id: str) -> Optional[int]:
+        r = await self._get(f"{self.ECONOMY_API}/v1/groups/{group_id}/currency")
+        return decode_json(r).get("robux") if r.status_code == 200 else None
+
+    async def get_group_revenue(self, group_id: str, timeframe: str) -> Optional[dict]:
+        r = await self._get(f"{self.ECONOMY_API}/v1/groups/{group_id}/revenue/summary/{timeframe.lower()}")
+        return decode_json(r) if r.status_code == 200 else None
+
+    async def get_account_status(self) -> Optional[dict]:
+        if not self.user_id: return None
+        r = await self._get(f"{self.USERS_API}/v1/users/{self.user_id}")
+        return self.account_status_from(decode_json(r)) if r.status_code == 200 else None
+
+class AsyncNotifier(DiscordNotifier):
+    # Embeds are rendered exactly as in DiscordNotifier; delivery becomes a
+    # task per sink instead of a job on the sink's thread. A per-sink lock
+    # keeps each endpoint's deliveries in order, and MAX_PENDING still caps
+    # the backlog.
+    def __init__(self, url: str, emoji_name: str, emoji_id: str, sinks: Optional[list] = None, digest_window: float = 0, http=None):
+        super().__init__(url, emoji_name, emoji_id, sinks, digest_window)
+        self.http = http
+        self.tasks = set()
+        self._locks = {}
+
+    def send(self, embed: dict, sinks: Optional[frozenset] = None):
+        with profiler.phase("notify"):
+            loop = asyncio.get_running_loop()
+            for sink in self._targets(sinks):
+                if sink.pending >= sink.MAX_PENDING:
+                    sink.failures += 1
+                    continue
+                sink.pending += 1
+                task = loop.create_task(self._deliver(sink, embed))
+                self.tasks.add(task)
+                task.add_done_callback(self.tasks.discard)
+
+    async def _deliver(self, sink: NotificationSink, embed: dict):
+        lock = self._locks.get(sink.name)
+        if lock is None:
+            lock = self._locks[sink.name] = asyncio.Lock()
+        try:
+            async with lock:
+                for attempt in range(sink.retries + 1):
+                    try:
+                        await sink.deliver_async(self.http, embed)
+                        return
+                    except Exception as e:
+                        if attempt == sink.retries:
+                            sink.failures += 1
+                            print(f"{Colors.RED}Notification sink '{sink.name}' failed: {e}{Colors.RESET}")
+                            return
+                        await clock.asleep(min(2 ** attempt, sink.timeout))
+        finally:
+            sink.pending -= 1
+
+    async def aclose(self):
+        if self.tasks:
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.close(wait=False)
+
+class AsyncMonitor(Monitor):
+    # One coroutine per account. The scheduler, cache, storage and change
+    # handling are Monitor's; only fetching and waiting are awaited, so any
+    # number of accounts share one loop and one connection pool. Must be
+    # created inside the running loop.
+    def __init__(self, cookie: Optional[str] = None, config: Optional[Config] = None, http=None):
+        super().__init__(cookie, config, interactive=False)
+        if self.pool:
+            self.pool.shutdown(wait=False)
+            self.pool = None
+        self.api = AsyncRobloxAPI(self.api.cookies[".ROBLOSECURITY"], http)
+        self.notifier = AsyncNotifier(
+            self.config["DISCORD_WEBHOOK_URL"],
+            self.config["DISCORD_EMOJI_NAME"],
+            self.config["DISCORD_EMOJI_ID"],
+            sinks=self.notifier.sinks,
+            digest_window=float(self.config["DIGEST_WINDOW"] or 0),
+            http=http
+        )
+        self.stop_event = asyncio.Event()
+
+    def stop(self):
+        self.stop_event.set()
+
+    async def run(self):
+        self._spread()
+        try:
+            while not self.stop_event.is_set():
+                await self.run_once()
+        finally:
+            auth_cache.flush(force=True)
+            self.notifier.flush_digest(force=True)
+            await self.notifier.aclose()
+            self.storage.close()
+            for storage in self.group_storage.values():
+                storage.close()
+            self.instance_lock.release()
+
+    async def run_once(self):
+        auth_cache.flush()
+        due = self.scheduler.pop_due()
+        if not due:
+            await self._wait(self.scheduler.next_due() - clock.time())
+            return
+        if not await self._api_healthy():
+            self.scheduler.defer(due)
+            await self._wait()
+            return
+        with cycle_budget(self.cycle_budget):
+            finished = await asyncio.gather(*(self._run_check(check) for check in due))
+            try:
+                await self._fetch_for_attribution()
+            except Exception as e:
+                print(f"{Colors.RED}Error in attribution: {e}{Colors.RESET}")
+        self._attribute()
+        self.notifier.flush_digest()
+        self._settle(due, [check for check, ok in zip(due, finished) if not ok])
+        self._sync_storage()
+        self.stats["cycles"] += 1
+
+    async def _run_check(self, check: Check) -> bool:
+        # False when the cycle budget cut the check off.
+        try:
+            with profiler.phase(f"check:{check.name}"):
+                await check.func()
+        except DeadlineExceeded:
+            return False
+        except Exception as e:
+            self.stats["errors"] += 1
+            print(f"{Colors.RED}Error in {check.name}: {e}{Colors.RESET}")
+        return True
+
+    async def _api_healthy(self) -> bool:
+        if self._api_known_good():
+            return True
+        healthy = self._api_result(await self.api.probe())
+        if healthy:
+            self._api_probed()
+        return healthy
+
+    async def _check_transactions(self):
+        return self._apply_totals(await self.api.get_transaction_totals(self.config["TOTAL_CHECKS_TYPE"]))
+
+    async def _fetch_for_attribution(self):
+        if self._balance_change and not self._totals_fetched:
+            await self._check_transactions()
+
+    async def _check_transaction_log(self):
+        for tx_type in parse_id_list(self.config["TRANSACTION_TYPES"]):
+            state = self.storage.load_tx_cursor(tx_type)
+            count = 0
+            try:
+                async for items, update in self.api.iter_transaction_pages(tx_type, state):
+                    count += self._flush_page(tx_type, state, items, update)
+            finally:
+                self._finish_transaction_log(tx_type, state, count)
+
+    async def _check_robux(self):
+        return self._apply_robux(await self.api.get_robux())
+
+    async def _check_groups(self):
+        order = self._groups_in_turn()
+        results = await asyncio.gather(*(self._check_group(gid) for gid in order), return_exceptions=True)
+        self._groups_polled(order, {gid: result for gid, result in zip(order, results) if isinstance(result, Exception)})
+
+    async def _check_group(self, group_id: str):
+        self._apply_group_funds(group_id, await self.api.get_group_funds(group_id))
+        self._apply_group_revenue(group_id, await self.api.get_group_revenue(group_id, self.config["TOTAL_CHECKS_TYPE"]))
+
+    async def _check_account_status(self):
+        return self._apply_status(await self.api.get_account_status())
+
+    async def _wait(self, seconds: Optional[float] = None):
+        interval = max(1, int(round(seconds))) if seconds is not None else self._interval("CHECK_INTERVAL")
+        await clock.wait_async(self.stop_event, interval)
+
+def raise_fd_limit(needed: int):
+    # Each account holds three descriptors for the life of the process (its
+    # monitor.lock, journal log and journal write lock), on top of the
+    # connection pool. Raises the
+    # soft RLIMIT_NOFILE toward the hard limit when that would not fit.
+    if resource is None:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft != resource.RLIM_INFINITY and soft < needed:
+        target = needed if hard == resource.RLIM_INFINITY else min(needed, hard)
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+        except (ValueError, OSError):
+            target = soft
+        if target < needed:
+            print(f"{Colors.YELLOW}Warning: Open file limit is {target}, about {needed} needed; "
+                  f"raise it (ulimit -n) or split accounts across workers{Colors.RESET}")
+
+async def run_monitors_async(cookies: list, config: Config, stop: Optional[asyncio.Event] = None) -> list:
+    # Every account as a coroutine on this loop. Stops on SIGINT/SIGTERM
+    # (where the loop supports signal handlers) or when ``stop`` is set.
+    raise_fd_limit(3 * len(cookies) + ASYNC_MAX_CONNECTIONS + 64)
+    connector = aiohttp.TCPConnector(limit=ASYNC_MAX_CONNECTIONS)
+    async with aiohttp.ClientSession(connector=connector, cookie_jar=aiohttp.DummyCookieJar()) as http:
+        monitors = []
+        for cookie in cookies:
+            monitor = AsyncMonitor(cookie, config, http)
+            if not monitor.claim():
+                print(f"{Colors.YELLOW}Skipping {cookie_fingerprint(cookie)}: already monitored elsewhere.{Colors.RESET}")
+                continue
+            monitors.append(monitor)
+
+        logins = await asyncio.gather(*(monitor.api.login() for monitor in monitors))
+        for monitor, ok in zip(monitors, logins):
+            if not ok:
+                print(f"{Colors.RED}Skipping {monitor.api.fingerprint}: authentication failed.{Colors.RESET}")
+                monitor.instance_lock.release()
+        monitors = [monitor for monitor, ok in zip(monitors, logins) if ok]
+
+        def stop_all():
+            for monitor in monitors:
+                monitor.stop()
+
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop_all)
+            except (NotImplementedError, RuntimeError):
+                pass  # Windows: Ctrl+C cancels the loop instead
+        if stop is not None:
+            async def watch():
+                await stop.wait()
+                stop_all()
+            loop.create_task(watch())
+
+        await asyncio.gather(*(monitor.run() for monitor in monitors))
+        return monitors
+
+def run_async_supervisor():
+    if aiohttp is None:
+        print(f"{Colors.RED}supervise --async needs the optional 'aiohttp' package (pip install aiohttp){Colors.RESET}")
+        raise SystemExit(1)
+    config = Config()
+    cookies = configured_accounts(config)
+    if not cookies:
+        print(f"{Colors.RED}No accounts configured.{Colors.RESET}")
+        return
+    print(f"{Colors.GREEN}Monitoring {len(cookies)} account(s) on one event loop. Press Ctrl+C to stop.{Colors.RESET}")
+    try:
+        monitors = asyncio.run(run_monitors_async(cookies, config))
+    except KeyboardInterrupt:
+        return
+    totals = {"cycles": 0, "errors": 0, "changes": 0}
+    for monitor in monitors:
+        for key, value in monitor.stats.items():
+            totals[key] += value
+    print(f"{Colors.CYAN}{len(monitors)} account(s): {totals['cycles']} cycles, {totals['errors']} errors, {totals['changes']} changes{Colors.RESET}")
+    print(f"{Colors.CYAN}Request rate: {RequestRateMeter.smoothness(request_meter.buckets())}{Colors.RESET}")
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  History Export
+# ─────────────────────────────────────────────────────────────────────────────
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+def iter_accounts() -> Iterator[tuple]:
+    yield "primary", STORAGE_DIR
+    for folder, prefix in (("accounts", ""), ("groups", "group:")):
+        base = os.path.join(STORAGE_DIR, folder)
+        if os.path.isdir(base):
+            for name in sorted(os.listdir(base)):
+                yield f"{prefix}{name}", os.path.join(base, name)
+
+class HistoryExporter:
+    # Everything is pulled through generators; the only buffering is one
+    # chunk of CHUNK_ROWS rows for the columnar formats.
+    CHUNK_ROWS = 65536
+    CHUNK_MAGIC = b"RTXC1\n"
+    FORMATS = ("csv", "chunks", "parquet")
+
+    def __init__(self, kind: str = "robux", fields: Optional[list] = None, since: Optional[float] = None,
+                 until: Optional[float] = None, accounts: Optional[list] = None):
+        self.kind = kind
+        self.fields = fields or {"robux": ["robux"], "totals": TRANSACTION_FIELDS}.get(kind)
+        self.since = since
+        self.until = until
+        self.accounts = set(accounts or [])
+
+    def rows(self) -> Iterator[dict]:
+        for account, directory in iter_accounts():
+            if self.accounts and account not in self.accounts:
+                continue
+            storage = Storage(directory)
+            try:
+                for row in storage.iter_history(self.kind, self.since, self.until):
+                    row["account"] = account
+                    yield row
+            finally:
+                storage.close()
+
+    def columns(self, rows: Iterator[dict]) -> tuple:
+        # Kinds without a fixed schema (group revenue) take theirs from the first row.
+        if self.fields:
+            return ["account", "ts"] + list(self.fields), rows
+        first = next(rows, None)
+        if first is None:
+            return ["account", "ts"], iter(())
+        fields = [k for k in first if k not in ("account", "ts")]
+        return ["account", "ts"] + fields, self._prepend(first, rows)
+
+    @staticmethod
+    def _prepend(first: dict, rows: Iterator[dict]) -> Iterator[dict]:
+        yield first
+        yield from rows
+
+    def export(self, fmt: str, output: str, rows: Optional[Iterator[dict]] = None) -> int:
+        columns, rows = self.columns(iter(rows) if rows is not None else self.rows())
+        if fmt == "csv":
+            return self.write_csv(columns, rows, output)
+        if fmt == "chunks":
+            return self.write_chunks(columns, rows, output)
+        if fmt == "parquet":
+            return self.write_parquet(columns, rows, output)
+        raise ValueError(f"Unknown export format: {fmt}")
+
+    def write_csv(self, columns: list, rows: Iterator[dict], output: str) -> int:
+        count = 0
+        handle = sys.stdout if output == "-" else open(output, "w", newline="")
+        try:
+            writer = csv.writer(handle)
+            writer.writerow(columns)
+            for row in rows:
+                writer.writerow([row.get(c, "") for c in columns])
+                count += 1
+        finally:
+            if handle is not sys.stdout:
+                handle.close()
+        return count
+
+    def _chunks(self, columns: list, rows: Iterator[dict]) -> Iterator[dict]:
+        chunk = {c: [] for c in columns}
+        size = 0
+        for row in rows:
+            for c in columns:
+                chunk[c].append(row.get(c))
+            size += 1
+            if size >= self.CHUNK_ROWS:
+                yield chunk
+                chunk = {c: [] for c in columns}
+                size = 0
+        if size:
+            yield chunk
+
+    def write_chunks(self, columns: list, rows: Iterator[dict], output: str) -> int:
+        # Layout: magic, then repeated [u32 length][zlib(JSON {"rows", "columns"})].
+        count = 0
+        with open(output, "wb") as f:
+            f.write(self.CHUNK_MAGIC)
+            for chunk in self._chunks(columns, rows):
+                size = len(chunk["ts"])
+                blob = zlib.compress(json.dumps({"rows": size, "columns": chunk}, separators=(",", ":")).encode(), 6)
+                f.write(struct.pack("<I", len(blob)))
+                f.write(blob)
+                count += size
+        return count
+
+    @classmethod
+    def read_chunks(cls, path: str) -> Iterator[dict]:
+        with open(path, "rb") as f:
+            if f.read(len(cls.CHUNK_MAGIC)) != cls.CHUNK_MAGIC:
+                raise ValueError(f"{path} is not a chunked history export")
+            while True:
+                header = f.read(4)
+                if len(header) < 4:
+                    return
+                (length,) = struct.unpack("<I", header)
+                yield json.loads(zlib.decompress(f.read(length)))
+
+    def write_parquet(self, columns: list, rows: Iterator[dict], output: str) -> int:
+        if pyarrow is None:
+            raise RuntimeError("Parquet export needs the optional 'pyarrow' package (pip install pyarrow)")
+        count, writer = 0, None
+        try:
+            for chunk in self._chunks(columns, rows):
+                table = pyarrow.table(chunk)
+                if writer is None:
+                    writer = pyarrow.parquet.ParquetWriter(output, table.schema)
+                writer.write_table(table)
+                count += table.num_rows
+        finally:
+            if writer is not None:
+                writer.close()
+        return count
+
+    def benchmark(self, total: int, fmt: str, output: str) -> dict:
+        def synthetic():
+            start = int(time.time()) - total
+            for i in range(total):
+                yield {"account": "bench", "ts": start + i, **{f: i * 7 % 100003 for f in self.fields or ["robux"]}}
+        begin = time.perf_counter()
+        count = self.export(fmt, output, synthetic())
+        elapsed = time.perf_counter() - begin
+        size = os.path.getsize(output) if output != "-" and os.path.exists(output) else 0
+        return {"rows": count, "seconds": round(elapsed, 2), "rows_per_sec": int(count / elapsed) if elapsed else count, "bytes": size}
+
+def run_export(args: argparse.Namespace):
+    exporter = HistoryExporter(
+        kind=args.kind,
+        fields=parse_id_list(args.fields) or None,
+        since=parse_time(args.since),
+        until=parse_time(args.until),
+        accounts=parse_id_list(args.accounts)
+    )
+    if args.format != "csv" and args.output == "-":
+        raise SystemExit(f"--output is required for the {args.format} format")
+    if args.bench:
+        result = exporter.benchmark(args.bench, args.format, args.output if args.output != "-" else os.devnull)
+        print(f"{Colors.CYAN}Export benchmark ({args.format}): {result}{Colors.RESET}", file=sys.stderr)
+        return
+    count = exporter.export(args.format, args.output)
+    print(f"{Colors.GREEN}Exported {count} row(s){Colors.RESET}", file=sys.stderr)
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  History Query
+# ─────────────────────────────────────────────────────────────────────────────
+# Per-field summary: [first, last, min, max, sum, gain, count]. ``gain`` is
+# the sum of upward steps, so it stays meaningful across the totals window
+# resetting (and is a balance's total inflow).
+def summary_add(fields: dict, row: dict, only: Optional[set] = None):
+    for k, v in row.items():
+        if k == "ts" or isinstance(v, bool) or not isinstance(v, (int, float)) or (only and k not in only):
+            continue
+        s = fields.get(k)
+        if s is None:
+            fields[k] = [v, v, v, v, v, 0, 1]
+            continue
+        if v > s[1]:
+            s[5] += v - s[1]
+        s[1] = v
+        if v < s[2]:
+            s[2] = v
+        if v > s[3]:
+            s[3] = v
+        s[4] += v
+        s[6] += 1
+
+def summary_merge(a: Optional[list], b: list) -> list:
+    # ``a`` covers the earlier span.
+    if a is None:
+        return list(b)
+    return [a[0], b[1], min(a[2], b[2]), max(a[3], b[3]), a[4] + b[4], a[5] + b[5] + max(0, b[0] - a[1]), a[6] + b[6]]
+
+def summary_metrics(s: list) -> dict:
+    first, last, low, high, total, gain, count = s
+    return {"count": count, "first": first, "last": last, "min": low, "max": high,
+            "mean": round(total / count, 2), "delta": last - first, "gain": gain}
+
+def parse_duration(value: str) -> float:
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+    value = str(value).strip().lower()
+    if value and value[-1] in units:
+        return float(value[:-1]) * units[value[-1]]
+    return float(value)
+
+def day_start(day: str) -> float:
+    return datetime(int(day[:4]), int(day[5:7]), int(day[8:10]), tzinfo=timezone.utc).timestamp()
+
+class HistoryIndex:
+    # Sidecar index over one account's history of one kind, kept next to the
+    # day files. index.json holds per day: bytes indexed, rows, ts range and
+    # per-field summary. offsets.json holds a byte offset every OFFSET_STEP
+    # seconds and is only loaded to seek into a partial day. Day files are
+    # append-only, so a file that grew is indexed from where the previous
+    # pass stopped. Sealed days are summarised from their segment footers,
+    # which are only reopened when the set of segment files changes.
+    VERSION = 1
+    OFFSET_STEP = 3600
+
+    def __init__(self, storage: Storage, kind: str):
+        self.storage = storage
+        self.kind = kind
+        self.folder = os.path.join(storage.history_dir, kind)
+        self.path = os.path.join(self.folder, "index.json")
+        self.offsets_path = os.path.join(self.folder, "offsets.json")
+        self.days = {}
+        self._offsets = None
+
+    def _read(self, path: str) -> dict:
+        try:
+            with open(path, "rb") as f:
+                data = codec.loads(f.read())
+            return data if data.get("version") == self.VERSION else {}
+        except (OSError, ValueError):
+            return {}
+
+    @property
+    def offsets(self) -> dict:
+        if self._offsets is None:
+            self._offsets = self._read(self.offsets_path).get("days", {})
+        return self._offsets
+
+    def _segment_files(self) -> dict:
+        if not os.path.isdir(self.folder):
+            return {}
+        return {name: os.path.getsize(os.path.join(self.folder, name))
+                for name in os.listdir(self.folder) if name.endswith(HistorySegment.SUFFIX)}
+
+    def refresh(self) -> "HistoryIndex":
+        data = self._read(self.path)
+        self.days = data.get("days", {})
+        self.segments = self._segment_files()
+        footers = None
+        if self.segments == data.get("segments"):
+            sealed = {day for day, entry in self.days.items() if entry.get("sealed")}
+        else:
+            footers = self.storage.sealed_days(self.kind)
+            sealed = set(footers)
+        present = sorted(sealed.union(self.storage.log_days(self.kind)))
+        changed = footers is not None or len(self.days) != len(present)
+        if changed:
+            keep = set(present)
+            self.days = {day: entry for day, entry in self.days.items() if day in keep}
+        for day in present:
+            if day in sealed:
+                if footers is not None and not self.days.get(day, {}).get("sealed"):
+                    meta = footers[day].days[day]
+                    self.days[day] = {"sealed": True, "size": 0, "rows": meta["rows"], "first_ts": meta["first_ts"],
+                                      "last_ts": meta["last_ts"], "fields": meta["fields"]}
+                    changed = True
+                continue
+            try:
+                size = os.path.getsize(self._file(day))
+            except OSError:
+                continue
+            entry = self.days.get(day)
+            if entry and not entry.get("sealed") and entry["size"] == size:
+                continue
+            if not entry or entry.get("sealed") or entry["size"] > size or day not in self.offsets:
+                entry = {"size": 0, "rows": 0, "first_ts": None, "last_ts": None, "fields": {}}
+                self.offsets[day] = []
+            self.days[day] = self._extend(day, entry)
+            changed = True
+        if changed:
+            try:
+                self._save()
+            except OSError:
+                pass  # read-only history still answers, just without a cached index
+        return self
+
+    def _save(self):
+        offsets = {day: self.offsets[day] for day, entry in self.days.items() if day in self.offsets and not entry.get("sealed")}
+        safe_write(self.offsets_path, {"version": self.VERSION, "days": offsets}, indent=None)
+        safe_write(self.path, {"version": self.VERSION, "segments": self.segments, "days": self.days}, indent=None)
+
+    def _file(self, day: str) -> str:
+        return os.path.join(self.folder, f"{day}.jsonl")
+
+    def _extend(self, day: str, entry: dict) -> dict:
+        offset = entry["size"]
+        offsets = self.offsets[day]
+        with profiler.phase("index"), open(self._file(day), "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # append in progress; indexed on a later pass
+                try:
+                    row = codec.loads(line)
+                except ValueError:
+                    offset += len(line)
+                    continue
+                ts = row["ts"]
+                if not offsets or ts >= offsets[-1][0] + self.OFFSET_STEP:
+                    offsets.append([ts, offset])
+                if entry["first_ts"] is None:
+                    entry["first_ts"] = ts
+                entry["last_ts"] = ts
+                entry["rows"] += 1
+                summary_add(entry["fields"], row)
+                offset += len(line)
+        entry["size"] = offset
+        return entry
+
+    def rows(self, day: str, since: Optional[float] = None, until: Optional[float] = None,
+             seek: Optional[float] = None) -> Iterator[dict]:
+        # Rows of one day in [since, until), read from the nearest offset at
+        # or before ``seek`` (default: since).
+        if self.days.get(day, {}).get("sealed"):
+            segment = self.storage.segment(self.kind, day[:7])
+            if segment is not None and day in segment.days:
+                yield from segment.rows(day, since, until)
+                return
+        start = 0
+        seek = since if seek is None else seek
+        offsets = (self.offsets.get(day) or []) if seek is not None else []
+        if seek is not None and offsets:
+            i = bisect.bisect_right([ts for ts, _ in offsets], seek) - 1
+            if i > 0:
+                start = offsets[i][1]
+        with open(self._file(day), "rb") as f:
+            f.seek(start)
+            for line in f:
+                try:
+                    row = codec.loads(line)
+                except ValueError:
+                    continue
+                if since is not None and row["ts"] < since:
+                    continue
+                if until is not None and row["ts"] >= until:
+                    return
+                yield row
+
+class HistoryQuery:
+    # Range, aggregate and top-N queries over every account's history. Whole
+    # days inside the range are answered from the index summaries; only the
+    # partial days at either edge are read, from their nearest offset.
+    # Results are generators, written out as they are produced.
+    METRICS = ("count", "first", "last", "min", "max", "mean", "delta", "gain")
+
+    def __init__(self, kind: str = "robux", since: Optional[float] = None, until: Optional[float] = None,
+                 accounts: Optional[list] = None, fields: Optional[list] = None):
+        self.kind = kind
+        self.since = since
+        self.until = until
+        self.accounts = set(accounts or [])
+        self.fields = set(fields or [])
+
+    def indexes(self) -> Iterator[tuple]:
+        for account, directory in iter_accounts():
+            if self.accounts and account not in self.accounts:
+                continue
+            if os.path.isdir(os.path.join(directory, "history", self.kind)):
+                storage = Storage(directory)
+                try:
+                    yield account, HistoryIndex(storage, self.kind).refresh()
+                finally:
+                    # Also when the consumer stops early (top, head) or raises.
+                    storage.close()
+
+    def _select(self, fields: dict) -> dict:
+        if not self.fields:
+            return fields
+        return {k: v for k, v in fields.items() if k in self.fields}
+
+    def day_summaries(self, index: HistoryIndex) -> Iterator[tuple]:
+        for day in sorted(index.days):
+            start = day_start(day)
+            if (self.until is not None and start >= self.until) or (self.since is not None and start + 86400 <= self.since):
+                continue
+            if (self.since is None or self.since <= start) and (self.until is None or start + 86400 <= self.until):
+                fields = self._select(index.days[day]["fields"])
+            else:
+                fields = {}
+                for row in index.rows(day, self.since, self.until):
+                    summary_add(fields, row, self.fields)
+            if fields:
+                yield day, fields
+
+    def aggregate(self, bucket: Optional[str] = None) -> Iterator[dict]:
+        for account, index in self.indexes():
+            if bucket == "day":
+                for day, fields in self.day_summaries(index):
+                    for field, s in fields.items():
+                        yield {"account": account, "day": day, "field": field, **summary_metrics(s)}
+                continue
+            merged = {}
+            for _, fields in self.day_summaries(index):
+                for field, s in fields.items():
+                    merged[field] = summary_merge(merged.get(field), s)
+            for field, s in merged.items():
+                yield {"account": account, "field": field, **summary_metrics(s)}
+
+    def top(self, limit: int, metric: str = "gain", group: str = "account", ascending: bool = False) -> list:
+        # group="account" ranks (account, field) pairs; group="field" adds
+        # the metric up across accounts first.
+        pick = heapq.nsmallest if ascending else heapq.nlargest
+        if group == "field":
+            totals = {}
+            for row in self.aggregate():
+                entry = totals.setdefault(row["field"], {"field": row["field"], metric: 0, "accounts": 0})
+                entry[metric] += row[metric]
+                entry["accounts"] += 1
+            return pick(limit, totals.values(), key=lambda row: row[metric])
+        return pick(limit, self.aggregate(), key=lambda row: row[metric])
+
+    def range(self, every: Optional[float] = None) -> Iterator[dict]:
+        if every:
+            yield from self._sampled(every)
+            return
+        for account, index in self.indexes():
+            for day in sorted(index.days):
+                start = day_start(day)
+                if (self.until is not None and start >= self.until) or (self.since is not None and start + 86400 <= self.since):
+                    continue
+                for row in index.rows(day, self.since, self.until):
+                    values = self._select({k: v for k, v in row.items() if k != "ts"})
+                    yield {"account": account, "ts": row["ts"], **values}
+
+    def _sampled(self, every: float) -> Iterator[dict]:
+        # The value as of each step (the last row at or before it).
+        if self.since is None:
+            raise ValueError("--every needs --since")
+        until = self.until if self.until is not None else clock.time()
+        for account, index in self.indexes():
+            days = sorted(index.days)
+            point = self.since
+            while point < until:
+                row = self._as_of(index, days, point)
+                if row is not None:
+                    yield {"account": account, "at": int(point), **row}
+                point += every
+
+    def _as_of(self, index: HistoryIndex, days: list, point: float) -> Optional[dict]:
+        i = bisect.bisect_right(days, utc_day(point)) - 1
+        while i >= 0:
+            entry = index.days[days[i]]
+            if entry["first_ts"] is None or entry["first_ts"] > point:
+                i -= 1
+                continue
+            # The row itself, not the day summary: a field's summary "last"
+            # may come from an earlier row than the day's final one.
+            last = None
+            for row in index.rows(days[i], until=int(point) + 1, seek=min(point, entry["last_ts"])):
+                last = row
+            if last is None:
+                i -= 1
+                continue
+            return {"ts": last["ts"], **self._select({k: v for k, v in last.items() if k != "ts"})}
+        return None
+
+def write_query_rows(rows: Iterator[dict], fmt: str, output: str) -> int:
+    count = 0
+    handle = sys.stdout if output == "-" else open(output, "w", newline="")
+    try:
+        writer = None
+        for row in rows:
+            if fmt == "jsonl":
+                handle.write(codec.dumps(row).decode() + "\n")
+            else:
+                if writer is None:
+                    writer = csv.DictWriter(handle, fieldnames=list(row), extrasaction="ignore")
+                    writer.writeheader()
+                writer.writerow(row)
+            count += 1
+            if output == "-" and count % 1000 == 0:
+                handle.flush()
+    finally:
+        if handle is not sys.stdout:
+            handle.close()
+    return count
+
+def run_query(args: argparse.Namespace):
+    query = HistoryQuery(
+        kind=args.kind,
+        since=parse_time(args.since),
+        until=parse_time(args.until),
+        accounts=parse_id_list(args.accounts),
+        fields=parse_id_list(args.fields)
+    )
+    begin = time.perf_counter()
+    if args.mode == "range":
+        rows = query.range(parse_duration(args.every) if args.every else None)
+    elif args.mode == "agg":
+        rows = query.aggregate(args.bucket)
+    else:
+        rows = iter(query.top(args.limit, args.metric, args.group, args.ascending))
+    count = write_query_rows(rows, args.format, args.output)
+    print(f"{Colors.GREEN}{count} row(s) in {time.perf_counter() - begin:.2f}s{Colors.RESET}", file=sys.stderr)
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  History Archive
+# ─────────────────────────────────────────────────────────────────────────────
+class HistorySegment:
+    # A sealed month of one history kind: history/<kind>/<YYYY-MM>.seg.
+    # Layout: MAGIC, one zlib block per UTC day, a zlib(JSON) footer, and a
+    # trailer (footer offset, footer length, MAGIC). A block holds the day's
+    # columns (ts first) back to back as little-endian int64 deltas from
+    # the previous value; the footer maps each day to its block, columns,
+    # ts range and field summary. Reads go through mmap, so only the blocks
+    # asked for are paged in.
+    MAGIC = b"RTXSEG1\n"
+    TRAILER = struct.Struct("<QQ8s")
+    SUFFIX = ".seg"
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if self._mm[:len(self.MAGIC)] != self.MAGIC or len(self._mm) < len(self.MAGIC) + self.TRAILER.size:
+                raise ValueError(f"{path} is not a history segment")
+            offset, length, magic = self.TRAILER.unpack(self._mm[-self.TRAILER.size:])
+            if magic != self.MAGIC:
+                raise ValueError(f"{path} is truncated")
+            self.days = codec.loads(zlib.decompress(self._mm[offset:offset + length]))["days"]
+        except Exception:
+            self._mm.close()
+            raise
+
+    def close(self):
+        self._mm.close()
+
+    def block(self, day: str) -> bytes:
+        entry = self.days[day]
+        return self._mm[entry["offset"]:entry["offset"] + entry["length"]]
+
+    def rows(self, day: str, since: Optional[float] = None, until: Optional[float] = None) -> Iterator[dict]:
+        entry = self.days[day]
+        if (since is not None and entry["last_ts"] < since) or (until is not None and entry["first_ts"] >= until):
+            return
+        data = array("q")
+        data.frombytes(zlib.decompress(self.block(day)))
+        if sys.byteorder == "big":
+            data.byteswap()
+        count, columns = entry["rows"], entry["columns"]
+        values = [accumulate(data[i * count:(i + 1) * count]) for i in range(len(columns))]
+        for record in zip(*values):
+            ts = record[0]
+            if since is not None and ts < since:
+                continue
+            if until is not None and ts >= until:
+                return
+            yield dict(zip(columns, record))
+
+    @staticmethod
+    def encode_day(rows: list) -> Optional[tuple]:
+        # -> (footer entry, block), or None when the day does not fit the
+        # format (a row with other keys, a non-integer value, or a value or
+        # delta outside int64); such days stay as JSON lines.
+        if not rows:
+            return None
+        columns = ["ts"] + [k for k in rows[0] if k != "ts"]
+        keys = set(columns)
+        data, fields = array("q"), {}
+        for row in rows:
+            if row.keys() != keys or any(type(row[k]) is not int for k in columns):
+                return None
+            summary_add(fields, row)
+        try:
+            for column in columns:
+                previous = 0
+                for row in rows:
+                    value = row[column]
+                    data.append(value - previous)
+                    previous = value
+        except OverflowError:
+            return None
+        if sys.byteorder == "big":
+            data.byteswap()
+        entry = {"rows": len(rows), "columns": columns, "first_ts": rows[0]["ts"], "last_ts": rows[-1]["ts"], "fields": fields}
+        return entry, zlib.compress(data.tobytes(), 9)
+
+    @classmethod
+    def write(cls, path: str, days: dict) -> int:
+        # ``days``: day -> (footer entry, block). Segments are immutable:
+        # adding days writes a new file and renames it over the old one.
+        tmp = f"{path}.{os.getpid()}.tmp"
+        footer = {}
+        with open(tmp, "wb") as f:
+            f.write(cls.MAGIC)
+            for day in sorted(days):
+                entry, block = days[day]
+                footer[day] = {**entry, "offset": f.tell(), "length": len(block)}
+                f.write(block)
+            blob = zlib.compress(codec.dumps({"version": 1, "days": footer}), 6)
+            offset = f.tell()
+            f.write(blob)
+            f.write(cls.TRAILER.pack(offset, len(blob), cls.MAGIC))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        return os.path.getsize(path)
+
+def archive_history(storage: Storage, kind: str, before_day: str) -> dict:
+    # Seals every JSON-lines day file older than ``before_day`` into its
+    # month's segment, then removes the day files. The monitor only appends
+    # to today's file, so sealed days are never written again.
+    folder = os.path.join(storage.history_dir, kind)
+    report = {"days": 0, "skipped": 0, "before": 0, "after": 0}
+    lock = FileLock(os.path.join(folder, ".archive.lock"))
+    if not lock.acquire(blocking=False):
+        print(f"{Colors.YELLOW}Skipping {folder}: another archive run holds it.{Colors.RESET}")
+        return report
+    try:
+        months = {}
+        for day in storage.log_days(kind):
+            if day < before_day:
+                months.setdefault(day[:7], []).append(day)
+        for month, days in sorted(months.items()):
+            path = os.path.join(folder, f"{month}{HistorySegment.SUFFIX}")
+            blocks, sealed = {}, []
+            if os.path.exists(path):
+                existing = HistorySegment(path)
+                try:
+                    for day, entry in existing.days.items():
+                        meta = {k: v for k, v in entry.items() if k not in ("offset", "length")}
+                        blocks[day] = (meta, existing.block(day))
+                    report["before"] += os.path.getsize(path)
+                finally:
+                    existing.close()
+            for day in days:
+                log = os.path.join(folder, f"{day}.jsonl")
+                report["before"] += os.path.getsize(log)
+                rows = []
+                with open(log, "rb") as f:
+                    for line in f:
+                        try:
+                            rows.append(codec.loads(line))
+                        except ValueError:
+                            continue
+                encoded = HistorySegment.encode_day(rows)
+                if encoded is None:
+                    report["skipped"] += 1
+                    report["after"] += os.path.getsize(log)
+                    continue
+                blocks[day] = encoded
+                sealed.append(log)
+            if not sealed:
+                continue
+            report["after"] += HistorySegment.write(path, blocks)
+            for log in sealed:
+                os.remove(log)
+            fsync_dir(folder)
+            report["days"] += len(sealed)
+    finally:
+        lock.release()
+    return report
+
+def run_archive(args: argparse.Namespace):
+    before_day = utc_day(clock.time() - max(1, args.older_than) * 86400)
+    kinds = parse_id_list(args.kinds)
+    accounts = set(parse_id_list(args.accounts))
+    totals = {"days": 0, "skipped": 0, "before": 0, "after": 0}
+    for account, directory in iter_accounts():
+        if accounts and account not in accounts:
+            continue
+        storage = Storage(directory)
+        for kind in kinds:
+            if not storage.log_days(kind):
+                continue
+            report = archive_history(storage, kind, before_day)
+            if report["days"]:
+                print(f"{Colors.CYAN}{account} {kind}: sealed {report['days']} day(s), "
+                      f"{report['before'] / 1e6:.1f}MB -> {report['after'] / 1e6:.1f}MB{Colors.RESET}")
+            for key in totals:
+                totals[key] += report[key]
+        storage.close()
+    ratio = totals["before"] / totals["after"] if totals["after"] else 0
+    print(f"{Colors.GREEN}Archived {totals['days']} day(s) before {before_day}: "
+          f"{totals['before'] / 1e6:.1f}MB -> {totals['after'] / 1e6:.1f}MB ({ratio:.1f}x){Colors.RESET}")
+    if totals["skipped"]:
+        print(f"{Colors.YELLOW}{totals['skipped']} day(s) left as JSON lines (non-integer or mixed rows).{Colors.RESET}")
+
+# ─────────────────────────────────────────────────────────────────────────────
+#  Soak Test
+# ─────────────────────────────────────────────────────────────────────────────
+class _StubRobloxHandler(http.server.BaseHTTPRequestHandler):
+    # Minimal stand-in for the Roblox and Discord endpoints the monitor uses.
+    # Values drift with every request so every check keeps producing changes.
+    protocol_version = "HTTP/1.1"
+    requests_served = 0
+
+    def setup(self):
+        super().setup()
+        # Headers and body go out as separate writes; without this every
+        # keep-alive response stalls on delayed ACKs.
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, payload: Optional[dict], status: int = 200):
+        body = json.dumps(payload).encode() if payload is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        type(self).requests_served += 1
+        n = type(self).requests_served
+        path = urlparse(self.path).path
+        if path.endswith("/authenticated"):
+            return self._reply({"id": 1, "name": "soak"})
+        if "/groups/" in path and path.endswith("/currency"):
+            return self._reply({"robux": n // 7})
+        if path.endswith("/currency"):
+            return self._reply({"robux": n // 3})
+        if "/revenue/summary/" in path:
+            return self._reply({"itemSaleRobux": n // 11, "pendingRobux": n // 13})
+        if path.endswith("/transaction-totals"):
+            return self._reply({field: n // (i + 5) for i, field in enumerate(TRANSACTION_FIELDS)})
+        if path.endswith("/transactions"):
+            item = {"id": n, "created": "2025-01-01T00:00:00Z", "agent": {"name": "soak"},
+                    "details": {"name": "Item"}, "currency": {"amount": 10}}
+            return self._reply({"data": [item], "nextPageCursor": None})
+        if path.startswith("/v1/users/"):
+            return self._reply({"name": "soak", "isBanned": False, "created": "2020-01-01T00:00:00Z"})
+        self._reply({"errors": [{"message": "not found"}]}, 404)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self._reply(None, 204)
+
+def process_rss() -> int:
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        return 0
+
+def open_fd_count() -> int:
+    try:
+        import psutil
+        proc = psutil.Process()
+        return proc.num_fds() if hasattr(proc, "num_fds") else proc.num_handles()
+    except ImportError:
+        pass
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return -1
+
+class SoakTest:
+    def __init__(self, cycles: int = 1_000_000, sample_every: int = 10_000, warmup: int = 1_000,
+                 max_growth_mb: float = 20.0, max_fd_growth: int = 16):
+        self.cycles = cycles
+        self.sample_every = max(1, sample_every)
+        self.warmup = warmup
+        self.max_growth = max_growth_mb * 1024 * 1024
+        self.max_fd_growth = max_fd_growth
+        self.samples = []
+
+    def _sample(self, cycles: int) -> dict:
+        gc.collect()
+        traced, _ = tracemalloc.get_traced_memory()
+        sample = {"cycles": cycles, "traced": traced, "rss": process_rss(), "fds": open_fd_count()}
+        self.samples.append(sample)
+        mb = 1024 * 1024
+        print(f"{Colors.BLUE}[soak] cycles={cycles} traced={traced / mb:.1f}MB "
+              f"rss={sample['rss'] / mb:.1f}MB fds={sample['fds']}{Colors.RESET}", file=sys.stderr)
+        return sample
+
+    def _violations(self, base: dict, sample: dict) -> list:
+        problems = []
+        for key in ("traced", "rss"):
+            growth = sample[key] - base[key]
+            if growth > self.max_growth:
+                problems.append(f"{key} grew {growth / 1024 / 1024:.1f}MB since cycle {base['cycles']}")
+        if base["fds"] >= 0 and sample["fds"] - base["fds"] > self.max_fd_growth:
+            problems.append(f"open fds grew from {base['fds']} to {sample['fds']}")
+        return problems
+
+    def _monitor(self, base_url: str) -> Monitor:
+        config = Config()
+        config.data.update({
+            "ROBLOSECURITY": "_|WARNING:-soak-test", "TRANSACTION_TYPES": "Sale", "GROUP_IDS": "1",
+            "DISCORD_WEBHOOK_URL": "", "NOTIFY_SINKS": []
+        })
+        monitor = Monitor(config=config, interactive=False)
+        monitor.notifier = DiscordNotifier(base_url, "soak", "0", sinks=[DiscordSink("soak", f"{base_url}/webhook")])
+        return monitor
+
+    def run(self) -> bool:
+        workdir = tempfile.mkdtemp(prefix="roblox-soak-")
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _StubRobloxHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        previous_dirs = use_app_dir(workdir)
+        previous_clock = use_clock(FakeClock())
+        previous_hosts = (RobloxAPI.USERS_API, RobloxAPI.ECONOMY_API)
+        RobloxAPI.USERS_API = RobloxAPI.ECONOMY_API = base_url
+        monitor = None
+        problems = []
+        try:
+            monitor = self._monitor(base_url)
+            if not monitor.api.authenticate():
+                print(f"{Colors.RED}[soak] stub authentication failed{Colors.RESET}", file=sys.stderr)
+                return False
+            tracemalloc.start()
+            base, base_snapshot = None, None
+            next_sample = self.sample_every
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                while monitor.stats["cycles"] < self.cycles and not problems:
+                    monitor.run_once()
+                    cycles = monitor.stats["cycles"]
+                    if base is None and cycles >= self.warmup:
+                        base = self._sample(cycles)
+                        base_snapshot = tracemalloc.take_snapshot()
+                    elif cycles >= next_sample:
+                        next_sample += self.sample_every
+                        if base is not None:
+                            problems = self._violations(base, self._sample(cycles))
+            if base is not None and not problems and self.samples[-1]["cycles"] != monitor.stats["cycles"]:
+                problems = self._violations(base, self._sample(monitor.stats["cycles"]))
+            if problems and base_snapshot is not None:
+                print(f"{Colors.YELLOW}[soak] top allocation growth:{Colors.RESET}", file=sys.stderr)
+                for stat in tracemalloc.take_snapshot().compare_to(base_snapshot, "lineno")[:10]:
+                    print(f"  {stat}", file=sys.stderr)
+        finally:
+            tracemalloc.stop()
+            if monitor:
+                monitor.notifier.close()
+                if monitor.pool:
+                    monitor.pool.shutdown(wait=True)
+            RobloxAPI.USERS_API, RobloxAPI.ECONOMY_API = previous_hosts
+            use_clock(previous_clock)
+            use_app_dir(previous_dirs[0])
+            server.shutdown()
+            server.server_close()
+            shutil.rmtree(workdir, ignore_errors=True)
+
+        for problem in problems:
+            print(f"{Colors.RED}[soak] FAIL: {problem}{Colors.RESET}", file=sys.stderr)
+        if not problems:
+            print(f"{Colors.GREEN}[soak] PASS: {monitor.stats['cycles']} cycles, {monitor.stats['errors']} errors{Colors.RESET}", file=sys.stderr)
+        return not problems
+
 # ─────────────────────────────────────────────────────────────────────────────
 #  Setup Wizard (First Run) – ALL INPUTS HIDDEN
 # ─────────────────────────────────────────────────────────────────────────────
@@ -469,7 +4384,7 @@ class Setup_Wizard:
     #  Start
     # ─────────────────────────────────────────────────────────────────────────────
     def start(self):
-        check_for_update()
+        start_update_check()
         try:
             # First run?
             if not self.config["ROBLOSECURITY"]:
@@ -488,6 +4403,98 @@ class Setup_Wizard:
             print(f"{Colors.RED}Fatal error in start: {e}{Colors.RESET}")
             raise SystemExit(1)
 
-if __name__ == "__main__":
+# ─────────────────────────────────────────────────────────────────────────────
+#  Main
+# ─────────────────────────────────────────────────────────────────────────────
+def parse_args(argv: Optional[list] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Roblox Transaction & Robux Monitor (CLI)")
+    parser.add_argument("--version", action="version", version=read_version())
+    parser.add_argument("--profile", choices=["phases", "cprofile"], default=None,
+                        help="Print a per-phase timing breakdown or cProfile stats on exit (and on SIGUSR1)")
+    commands = parser.add_subparsers(dest="command")
+    supervise = commands.add_parser("supervise", help="Shard all configured accounts across worker processes")
+    supervise.add_argument("--workers", type=int, default=None, help="Worker processes (default: WORKERS or CPU count)")
+    supervise.add_argument("--async", dest="use_async", action="store_true",
+                           help="Run every account as a coroutine in this process instead (needs aiohttp)")
+    cluster = commands.add_parser("cluster", help="Share accounts with other hosts through leases in a shared SQLite file")
+    cluster.add_argument("--db", default=None, help="Lease store path on a shared volume (default: CLUSTER_DB or APP_DIR/cluster.db)")
+    cluster.add_argument("--host-id", default=None, help="Unique name for this host (default: HOST_ID or hostname-pid)")
+    cluster.add_argument("--lease-ttl", type=float, default=None, help="Seconds a lease lives without renewal (default: LEASE_TTL)")
+    export = commands.add_parser("export", help="Stream stored history to CSV or chunked columnar files")
+    export.add_argument("--kind", default="robux", help="History kind: robux, totals or revenue (default: robux)")
+    export.add_argument("--since", default=None, help="Start time (ISO date/datetime or epoch seconds)")
+    export.add_argument("--until", default=None, help="End time, exclusive (ISO date/datetime or epoch seconds)")
+    export.add_argument("--accounts", default="", help="Comma-separated accounts (primary, <fingerprint>, group:<id>)")
+    export.add_argument("--fields", default="", help="Comma-separated fields (default: all fields of the kind)")
+    export.add_argument("--format", choices=HistoryExporter.FORMATS, default="csv")
+    export.add_argument("--output", default="-", help="Output path (default: stdout, csv only)")
+    export.add_argument("--bench", type=int, default=0, help="Write N synthetic rows and report throughput")
+    query = commands.add_parser("query", help="Indexed range, aggregate and top-N queries over stored history")
+    query.add_argument("mode", choices=["range", "agg", "top"])
+    query.add_argument("--kind", default="robux", help="History kind: robux, totals or revenue (default: robux)")
+    query.add_argument("--since", default=None, help="Start time (ISO date/datetime or epoch seconds)")
+    query.add_argument("--until", default=None, help="End time, exclusive (ISO date/datetime or epoch seconds)")
+    query.add_argument("--accounts", default="", help="Comma-separated accounts (primary, <fingerprint>, group:<id>)")
+    query.add_argument("--fields", default="", help="Comma-separated fields (default: all fields of the kind)")
+    query.add_argument("--every", default=None, help="range: value as of every step, e.g. 1d, 6h, 900 (needs --since)")
+    query.add_argument("--bucket", choices=["day"], default=None, help="agg: one row per UTC day instead of per range")
+    query.add_argument("--metric", choices=HistoryQuery.METRICS, default="gain", help="top: ranking metric (default: gain)")
+    query.add_argument("--group", choices=["account", "field"], default="account",
+                       help="top: rank (account, field) pairs, or fields summed across accounts")
+    query.add_argument("--limit", "-n", type=int, default=10, help="top: rows returned (default: 10)")
+    query.add_argument("--ascending", action="store_true", help="top: smallest first")
+    query.add_argument("--format", choices=["csv", "jsonl"], default="csv")
+    query.add_argument("--output", default="-", help="Output path (default: stdout)")
+    archive = commands.add_parser("archive", help="Seal old history into compressed, memory-mapped monthly segments")
+    archive.add_argument("--older-than", type=int, default=7, help="Seal days at least this many days old (default: 7)")
+    archive.add_argument("--kinds", default="robux,totals,revenue", help="Comma-separated history kinds")
+    archive.add_argument("--accounts", default="", help="Comma-separated accounts (primary, <fingerprint>, group:<id>)")
+    bench_json = commands.add_parser("bench-json", help="Measure JSON decode/encode cost per monitor cycle for each codec")
+    bench_json.add_argument("--cycles", type=int, default=20_000)
+    soak = commands.add_parser("soak", help="Drive the monitor against a local stub server to catch leaks")
+    soak.add_argument("--cycles", type=int, default=1_000_000)
+    soak.add_argument("--sample-every", type=int, default=10_000, help="Cycles between memory/fd samples")
+    soak.add_argument("--warmup", type=int, default=1_000, help="Cycles before the baseline sample")
+    soak.add_argument("--max-growth-mb", type=float, default=20.0, help="Allowed traced/RSS growth over baseline")
+    soak.add_argument("--max-fd-growth", type=int, default=16, help="Allowed open-fd growth over baseline")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[list] = None):
+    args = parse_args(argv)
+    if args.profile:
+        profiler.enable(args.profile)
+    try:
+        run_command(args)
+    finally:
+        profiler.dump()
+
+def run_command(args: argparse.Namespace):
+    if args.command == "supervise":
+        if args.use_async:
+            run_async_supervisor()
+        else:
+            Supervisor(args.workers).start()
+        return
+    if args.command == "cluster":
+        ClusterNode(args.db, args.host_id, args.lease_ttl).start()
+        return
+    if args.command == "export":
+        run_export(args)
+        return
+    if args.command == "query":
+        run_query(args)
+        return
+    if args.command == "archive":
+        run_archive(args)
+        return
+    if args.command == "bench-json":
+        run_json_bench(args)
+        return
+    if args.command == "soak":
+        soak = SoakTest(args.cycles, args.sample_every, args.warmup, args.max_growth_mb, args.max_fd_growth)
+        raise SystemExit(0 if soak.run() else 1)
     Setup = Setup_Wizard()
-    Setup.start()
\ No newline at end of file
+    Setup.start()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
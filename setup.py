@@ -1,10 +1,12 @@
+import os
 import shutil
 import sys
 import subprocess
 import argparse
+import statistics
 import psutil
-from time import sleep
-from typing import Optional, List
+from time import sleep, perf_counter
+from typing import Optional, List, Dict, Set
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -25,12 +27,21 @@ def _color_print(level: str, message: str) -> None:
     color = colors.get(level.lower(), "")
     print(f"{color}[{level.upper()}] {message}{reset}")
 
+BUILD_MODES = ("onefile", "onedir", "trimmed")
+
+# Standard-library packages the monitor never imports; left out of trimmed builds.
+TRIMMED_EXCLUDES = (
+    "tkinter", "unittest", "pydoc", "doctest", "test", "lib2to3", "xmlrpc",
+    "pdb", "setuptools", "pip", "ensurepip", "idlelib", "turtle", "curses",
+)
+
 @dataclass
 class Config:
     optimization_lvl: int = 2
     app_name: str = "main"
     app_title: str = "Roblox Transaction Monitor (CTL Edition)"
     debug_mode: bool = False
+    build_mode: str = "onefile"
 
 class _FallbackLogger:
     @staticmethod
@@ -60,12 +71,16 @@ except Exception:
 class PyInstallerBuilder:
     """Manages the build process for creating executables using PyInstaller."""
 
-    def __init__(self, script_file: Optional[str] = None, enable_debug: bool = False):
+    def __init__(self, script_file: Optional[str] = None, enable_debug: bool = False, mode: Optional[str] = None):
         self.logger = logger
         self.config = Config()
         self.script_file = Path(script_file or (sys.argv[1] if len(sys.argv) > 1 else "main.py"))
         self.logger.enable_debug(self.config.debug_mode or enable_debug)
         self.optimization_lvl = self.config.optimization_lvl
+        self.mode = mode or self.config.build_mode
+        if self.mode not in BUILD_MODES:
+            self.logger.Log("error", f"Unknown build mode '{self.mode}' (expected one of {', '.join(BUILD_MODES)}).")
+            self._exit_script()
 
         self._validate_script_file()
         self.pyinstaller_args = self._build_pyinstaller_args()
@@ -88,42 +103,95 @@ class PyInstallerBuilder:
         return "Robux.ico"
 
     def _build_pyinstaller_args(self) -> List[str]:
-        return [
+        args = [
             str(self.script_file),
             "--noconfirm",
             "--console",
-            "--onefile",
+            "--onefile" if self.mode == "onefile" else "--onedir",
             "--clean",
             f"--icon={self._get_icon_path()}",
             f"--name={self._get_executable_name()}",
             f"--optimize={self.config.optimization_lvl}",
-            f"--add-data={self._get_icon_path()};.",
-            f"--add-data=VERSION;.",
+            f"--add-data={self._get_icon_path()}{os.pathsep}.",
+            f"--add-data=VERSION{os.pathsep}.",
             "--collect-submodules=Roblox-Transaction-Monitor/",
+            f"--distpath={self._dist_dir()}",
+            f"--workpath={Path('build') / self.mode}",
             "--log-level=WARN",
         ]
+        if self.mode == "trimmed":
+            args += [f"--exclude-module={module}" for module in TRIMMED_EXCLUDES]
+        return args
+
+    def _dist_dir(self) -> Path:
+        return Path("dist") / self.mode
+
+    def _executable_path(self) -> Path:
+        name = self._get_executable_name() + (".exe" if sys.platform.startswith("win") else "")
+        if self.mode == "onefile":
+            return self._dist_dir() / name
+        return self._dist_dir() / self._get_executable_name() / name
+
+    def _bundle_size(self) -> int:
+        exe = self._executable_path()
+        if self.mode == "onefile":
+            return exe.stat().st_size if exe.exists() else 0
+        return sum(f.stat().st_size for f in exe.parent.rglob("*") if f.is_file())
 
     # ------------------------------------------------------------------
     # Cleanup
     # ------------------------------------------------------------------
-    def _kill_locking_processes(self, path: Path) -> None:
-        """Attempt to terminate processes that have open handles to the given path."""
+    @staticmethod
+    def _path_prefix(path: Path) -> str:
+        return os.path.normcase(str(path.resolve())) + os.sep
+
+    def _index_open_files(self, path: Path) -> Dict[str, Set[int]]:
+        """Map open file paths under ``path`` to the PIDs holding them.
+
+        Each process's open files are read once. Paths are matched with a
+        normalized string prefix rather than resolved one by one.
+        """
+        prefix = self._path_prefix(path)
+        own_pid = os.getpid()
+        index: Dict[str, Set[int]] = {}
+        for proc in psutil.process_iter(["pid"]):
+            if proc.pid == own_pid:
+                continue
+            try:
+                files = proc.open_files()
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+            for file in files:
+                file_path = os.path.normcase(file.path)
+                if file_path.startswith(prefix):
+                    index.setdefault(file_path, set()).add(proc.pid)
+        return index
+
+    def _kill_locking_processes(self, path: Path, index: Optional[Dict[str, Set[int]]] = None) -> Dict[str, Set[int]]:
+        """Attempt to terminate processes that have open handles to the given path.
+
+        Returns the path -> pids index so retries can reuse it; pass it back in
+        as ``index`` to skip the scan of every process's open files.
+        """
         try:
-            for proc in psutil.process_iter(["pid", "name", "open_files"]):
+            if index is None:
+                started = perf_counter()
+                index = self._index_open_files(path)
+                self.logger.Log(
+                    "debug", f"Lock scan for '{path}' indexed {len(index)} open file(s) in {perf_counter() - started:.2f}s"
+                )
+            pids = set().union(*index.values()) if index else set()
+            for pid in pids:
                 try:
-                    for file in proc.info["open_files"] or []:
-                        if file and path.resolve() in Path(file.path).resolve().parents:
-                            self.logger.Log(
-                                "warning",
-                                f"Killing process {proc.info['name']} (PID {proc.info['pid']}) locking {path}",
-                            )
-                            proc.kill()
-                            proc.wait(timeout=3)
-                            break
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    proc = psutil.Process(pid)
+                    self.logger.Log("warning", f"Killing process {proc.name()} (PID {pid}) locking {path}")
+                    proc.kill()
+                    proc.wait(timeout=3)
+                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.TimeoutExpired):
                     continue
         except Exception as exc:
             self.logger.Log("warning", f"Could not inspect locking processes: {exc}")
+        return index or {}
 
     def _remove_directory(self, path: Path) -> None:
         self.logger.Log("debug", f"Attempting to remove directory: {path}")
@@ -131,23 +199,29 @@ class PyInstallerBuilder:
             self.logger.Log("info", f"'{path}' directory not found — skipping.")
             return
 
-        for attempt in range(1, 4):
+        attempts = 3
+        index = None
+        for attempt in range(1, attempts + 1):
             try:
-                self._kill_locking_processes(path)
                 shutil.rmtree(path, ignore_errors=False)
                 self.logger.Log("success", f"'{path}' directory removed successfully.")
                 return
             except PermissionError as exc:
                 self.logger.Log(
                     "warning",
-                    f"Attempt {attempt}/3: Permission denied removing '{path}': {exc}",
+                    f"Attempt {attempt}/{attempts}: Permission denied removing '{path}': {exc}",
                 )
+                if attempt == attempts:
+                    break
+                # Only look for lock holders once a removal has actually failed,
+                # and scan for them once; later attempts reuse the index.
+                index = self._kill_locking_processes(path, index)
                 sleep(attempt * 1.5)
             except Exception as exc:
                 self.logger.Log("warning", f"Failed to remove '{path}': {exc}")
                 return
 
-        self.logger.Log("error", f"Could not remove '{path}' after 3 attempts.")
+        self.logger.Log("error", f"Could not remove '{path}' after {attempts} attempts.")
 
     def _remove_file(self, file_path: Path) -> bool:
         self.logger.Log("debug", f"Attempting to remove file: {file_path}")
@@ -164,7 +238,7 @@ class PyInstallerBuilder:
 
     def cleanup_dirs(self) -> None:
         self.logger.Log("debug", "Starting cleanup of directories and spec files")
-        for folder in (Path("build"), Path("dist")):
+        for folder in (Path("build") / self.mode, self._dist_dir()):
             self._remove_directory(folder)
 
         base_name = self.script_file.stem
@@ -215,6 +289,46 @@ class PyInstallerBuilder:
             self.logger.Log("error", f"PyInstaller build failed: {exc}")
             self._exit_script(2)
 
+    # ------------------------------------------------------------------
+    # Benchmark
+    # ------------------------------------------------------------------
+    def benchmark(self, runs: int = 5, launch_args: Optional[List[str]] = None,
+                  timeout: float = 120.0) -> Dict[str, float]:
+        """Launch the built executable ``runs`` times and report startup timings.
+
+        The first launch after a build is reported as cold; the rest as warm.
+        ``launch_args`` should make the program exit right away (e.g. ``--version``).
+        A launch that outlives ``timeout`` seconds or exits non-zero fails the
+        whole benchmark, since its timing would not be a startup time.
+        """
+        exe = self._executable_path()
+        if not exe.exists():
+            self.logger.Log("error", f"Executable not found for benchmark: {exe}")
+            return {}
+        launch_args = launch_args if launch_args is not None else ["--version"]
+        timings = []
+        for run in range(1, max(1, runs) + 1):
+            started = perf_counter()
+            try:
+                result = subprocess.run([str(exe), *launch_args], stdin=subprocess.DEVNULL,
+                                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=timeout)
+            except subprocess.TimeoutExpired:
+                self.logger.Log("error", f"[{self.mode}] run {run} did not exit within {timeout:.0f}s "
+                                         f"(launch args: {' '.join(launch_args) or 'none'})")
+                return {}
+            if result.returncode != 0:
+                self.logger.Log("error", f"[{self.mode}] run {run} exited with code {result.returncode}")
+                return {}
+            timings.append(perf_counter() - started)
+            self.logger.Log("debug", f"[{self.mode}] run {run}: {timings[-1]:.3f}s")
+        warm = timings[1:] or timings
+        return {
+            "cold_s": round(timings[0], 3),
+            "warm_median_s": round(statistics.median(warm), 3),
+            "warm_min_s": round(min(warm), 3),
+            "size_mb": round(self._bundle_size() / (1024 * 1024), 2),
+        }
+
     # ------------------------------------------------------------------
     # Flow control
     # ------------------------------------------------------------------
@@ -255,6 +369,41 @@ class AddArguments:
                     "help": "Enable debug logging",
                 },
             },
+            {
+                "name": "--mode",
+                "kwargs": {
+                    "choices": BUILD_MODES + ("all",),
+                    "default": Config.build_mode,
+                    "help": "Packaging mode: onefile, onedir, trimmed (onedir without unused modules) or all",
+                },
+            },
+            {
+                "name": "--benchmark",
+                "kwargs": {
+                    "type": int,
+                    "default": 0,
+                    "metavar": "N",
+                    "help": "After building, launch the executable N times and report startup time and size",
+                },
+            },
+            {
+                "name": "--bench-timeout",
+                "kwargs": {
+                    "type": float,
+                    "default": 120.0,
+                    "metavar": "SECONDS",
+                    "help": "Fail the benchmark if one launch runs longer than this (default: 120)",
+                },
+            },
+            {
+                "name": "--bench-args",
+                "kwargs": {
+                    "nargs": argparse.REMAINDER,
+                    "default": ["--version"],
+                    "help": "Arguments passed to the executable during the benchmark; takes everything "
+                            "after it, so put it last (default: --version)",
+                },
+            },
         ]
         for arg in args:
             parser.add_argument(arg["name"], **arg["kwargs"])
@@ -262,10 +411,30 @@ class AddArguments:
 
     def build_executable(self) -> None:
         args = self._parse_cli()
-        builder = PyInstallerBuilder(
-            script_file=args.target_script, enable_debug=args.debug
-        )
-        builder.run()
+        modes = BUILD_MODES if args.mode == "all" else (args.mode,)
+        results = {}
+        for mode in modes:
+            builder = PyInstallerBuilder(
+                script_file=args.target_script, enable_debug=args.debug, mode=mode
+            )
+            builder.run()
+            if args.benchmark:
+                results[mode] = builder.benchmark(args.benchmark, args.bench_args, args.bench_timeout)
+        if results:
+            self._report(results)
+
+    @staticmethod
+    def _report(results: Dict[str, Dict[str, float]]) -> None:
+        logger.Log("info", f"{'mode':<10}{'cold s':>10}{'warm med s':>12}{'warm min s':>12}{'size MB':>10}")
+        for mode, result in results.items():
+            if not result:
+                logger.Log("error", f"{mode:<10} (failed)")
+                continue
+            logger.Log(
+                "info",
+                f"{mode:<10}{result['cold_s']:>10.3f}{result['warm_median_s']:>12.3f}"
+                f"{result['warm_min_s']:>12.3f}{result['size_mb']:>10.2f}",
+            )
 
 if __name__ == "__main__":
     AddArgs = AddArguments()
@@ -1,9 +1,12 @@
 import subprocess
 import sys
+import hashlib
 import logging
+import argparse
 from time import sleep
 from pathlib import Path
-from typing import Optional
+from typing import Optional, List
+from concurrent.futures import ThreadPoolExecutor
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -11,11 +14,19 @@ logger = logging.getLogger()
 
 class VirtualEnvManager:
     """Manages creation and package installation for a virtual environment."""
-    def __init__(self, venv_path: Optional[str] = "Roblox-Transaction-Monitor", requirements_file: Optional[str] = "requirements.txt"):
+    STAMP_FILE = ".requirements-stamp"
+
+    def __init__(self, venv_path: Optional[str] = "Roblox-Transaction-Monitor", requirements_file: Optional[str] = "requirements.txt",
+                 wheel_dir: Optional[str] = None, offline: bool = False, jobs: int = 4, force: bool = False):
         """Initialize with virtual environment path and optional requirements file."""
         self.venv_path = Path(venv_path)
         self.requirements_file = Path(requirements_file)
         self.venv_python = self._get_venv_python()
+        self.wheel_dir = Path(wheel_dir) if wheel_dir else None
+        self.offline = offline
+        self.jobs = max(1, jobs)
+        self.force = force
+        self.stamp_path = self.venv_path / self.STAMP_FILE
 
     def _get_venv_python(self) -> Path:
         """Determine the virtual environment's Python executable path."""
@@ -48,12 +59,72 @@ class VirtualEnvManager:
             "Failed to create virtual environment"
         )
 
+    def _interpreter_version(self) -> str:
+        """Read the venv's Python version from pyvenv.cfg (no subprocess)."""
+        try:
+            for line in (self.venv_path / "pyvenv.cfg").read_text().splitlines():
+                key, _, value = line.partition("=")
+                if key.strip() in ("version", "version_info"):
+                    return value.strip()
+        except OSError:
+            pass
+        return sys.version.split()[0]
+
+    def requirements_hash(self) -> str:
+        """Hash of the requirements file contents plus the venv interpreter version."""
+        digest = hashlib.sha256(self.requirements_file.read_bytes())
+        digest.update(self._interpreter_version().encode())
+        return digest.hexdigest()
+
+    def is_up_to_date(self) -> bool:
+        """True when the venv was last provisioned from identical requirements."""
+        if self.force or not self.stamp_path.exists() or not self.requirements_file.exists():
+            return False
+        return self.stamp_path.read_text().strip() == self.requirements_hash()
+
+    def write_stamp(self) -> None:
+        self.stamp_path.write_text(self.requirements_hash())
+
+    def _requirement_lines(self) -> List[str]:
+        """Plain requirement specifiers, or [] if the file uses options pip must see whole."""
+        lines = []
+        for raw in self.requirements_file.read_text().splitlines():
+            line = raw.split("#", 1)[0].strip()
+            if not line:
+                continue
+            if line.startswith("-"):
+                return []
+            lines.append(line)
+        return lines
+
+    def prefetch_wheels(self) -> bool:
+        """Build or download a wheel for each requirement into the wheel cache, in parallel."""
+        self.wheel_dir.mkdir(parents=True, exist_ok=True)
+        requirements = self._requirement_lines()
+        if not requirements:
+            requirements = [f"-r{self.requirements_file}"]
+        base = [str(self.venv_python), "-m", "pip", "wheel", "--disable-pip-version-check",
+                "--wheel-dir", str(self.wheel_dir), "--find-links", str(self.wheel_dir)]
+        if self.offline:
+            base.append("--no-index")
+
+        def fetch(requirement: str) -> bool:
+            return self._run_subprocess(base + [requirement], f"Cached wheel(s) for {requirement}", f"Failed to cache {requirement}")
+
+        logger.info(f"Caching {len(requirements)} requirement(s) into {self.wheel_dir} with {self.jobs} job(s)...")
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            return all(pool.map(fetch, requirements))
+
     def upgrade_pip(self) -> bool:
         """Upgrade pip inside the virtual environment."""
         if not self.venv_python.exists():
             logger.error(f"Virtual environment Python executable not found at {self.venv_python}")
             return False
 
+        if self.offline:
+            logger.info("Offline mode: skipping pip upgrade.")
+            return True
+
         logger.info("Checking pip version...")
         try:
             result = subprocess.run(
@@ -86,9 +157,19 @@ class VirtualEnvManager:
             logger.error(f"Virtual environment Python executable not found at {self.venv_python}")
             return False
 
+        command = [str(self.venv_python), "-m", "pip", "install", "--disable-pip-version-check", "-r", str(self.requirements_file)]
+        if self.wheel_dir:
+            # Downloads and builds happen in parallel in prefetch_wheels; the
+            # install itself stays a single pip run against the local cache.
+            if not self.prefetch_wheels():
+                return False
+            command += ["--no-index", "--find-links", str(self.wheel_dir)]
+        elif self.offline:
+            command.append("--no-index")
+
         logger.info(f"Installing requirements from {self.requirements_file} using {self.venv_python}...")
         return self._run_subprocess(
-            [str(self.venv_python), "-m", "pip", "install", "-r", str(self.requirements_file)],
+            command,
             f"Requirements installed from {self.requirements_file}",
             "Failed to install requirements"
         )
@@ -100,13 +181,18 @@ class VirtualEnvManager:
             if not self.setup_venv():
                 return False
 
-        logger.info("Virtual environment detected. Proceeding with package installation...")
+        if self.is_up_to_date():
+            logger.info("Requirements unchanged since last install. Skipping package installation.")
+        else:
+            logger.info("Virtual environment detected. Proceeding with package installation...")
 
-        if not self.upgrade_pip():
-            return False
+            if not self.upgrade_pip():
+                return False
 
-        if not self.install_requirements():
-            return False
+            if not self.install_requirements():
+                return False
+
+            self.write_stamp()
 
         # Provide instructions for manual activation
         if sys.platform.startswith("win"):
@@ -132,6 +218,17 @@ class VirtualEnvManager:
             logger.error(f"Unexpected error in main: {e}")
             self.exit_script(duration)
 
+def parse_cli() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Create the monitor's virtual environment and install its requirements.")
+    parser.add_argument("--venv", default="Roblox-Transaction-Monitor", help="Virtual environment path")
+    parser.add_argument("--requirements", default="requirements.txt", help="Requirements file")
+    parser.add_argument("--wheel-dir", default=None, help="Local wheel cache to fill and install from")
+    parser.add_argument("--offline", action="store_true", help="Never contact a package index")
+    parser.add_argument("--jobs", type=int, default=4, help="Parallel wheel downloads/builds (with --wheel-dir)")
+    parser.add_argument("--force", action="store_true", help="Reinstall even if requirements are unchanged")
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    venv_manager = VirtualEnvManager()
+    args = parse_cli()
+    venv_manager = VirtualEnvManager(args.venv, args.requirements, args.wheel_dir, args.offline, args.jobs, args.force)
     venv_manager.run()  # Adjust duration as needed
\ No newline at end of file
@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import maindev  # noqa: E402
+
+
+@pytest.fixture
+def app_dir(tmp_path):
+    previous = maindev.use_app_dir(str(tmp_path))
+    clock = maindev.use_clock(maindev.FakeClock(1_760_000_000))
+    yield tmp_path
+    maindev.use_clock(clock)
+    maindev.use_app_dir(previous[0])
@@ -0,0 +1,141 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import maindev
+
+
+def test_authenticate_lets_deadline_through(app_dir, monkeypatch):
+    def out_of_budget(*args, **kwargs):
+        raise maindev.DeadlineExceeded("cycle time budget exhausted")
+
+    monkeypatch.setattr(maindev, "rate_limited_request", out_of_budget)
+    api = maindev.RobloxAPI("_|WARNING-test")
+    with pytest.raises(maindev.DeadlineExceeded):
+        api.authenticate()
+
+
+def test_authenticate_reports_other_failures(app_dir, monkeypatch):
+    def offline(*args, **kwargs):
+        raise ConnectionError("offline")
+
+    monkeypatch.setattr(maindev, "rate_limited_request", offline)
+    assert maindev.RobloxAPI("_|WARNING-test").authenticate() is False
+
+
+def test_async_authenticate_lets_deadline_through(app_dir, monkeypatch):
+    async def out_of_budget(self, url, params=None):
+        raise maindev.DeadlineExceeded("cycle time budget exhausted")
+
+    monkeypatch.setattr(maindev.AsyncRobloxAPI, "_request", out_of_budget)
+    api = maindev.AsyncRobloxAPI("_|WARNING-test", None)
+    with pytest.raises(maindev.DeadlineExceeded):
+        asyncio.run(api.authenticate())
+
+
+def test_request_slots_are_per_account(app_dir):
+    async def reserve():
+        first, second = maindev.AccountRequestSlots(), maindev.AccountRequestSlots()
+        return [await first.reserve(), await second.reserve(), await first.reserve()]
+
+    assert asyncio.run(reserve()) == [0.0, 0.0, 1.0]
+
+
+def test_history_appends_from_the_loop_keep_their_order(app_dir):
+    storage = maindev.Storage()
+
+    async def record():
+        for robux in range(200):
+            storage.record_history("robux", {"robux": robux}, ts=1_760_000_000 + robux)
+
+    asyncio.run(record())
+    storage.close()
+    assert [row["robux"] for row in storage.iter_history("robux")] == list(range(200))
+
+
+def test_resumed_session_skips_the_first_probe(app_dir, monkeypatch):
+    calls = []
+
+    def request(method, url, **kwargs):
+        calls.append(url)
+        raise ConnectionError("offline")
+
+    monkeypatch.setattr(maindev, "rate_limited_request", request)
+    config = maindev.Config({"ROBLOSECURITY": "_|WARNING-test"})
+    monitor = maindev.Monitor(config=config, interactive=False)
+    maindev.auth_cache.put(monitor.api.fingerprint, 42, maindev.clock.time())
+    assert monitor.api.login()
+    assert monitor._api_healthy() and calls == []
+
+    maindev.clock.sleep(monitor._interval("CHECK_INTERVAL") + 1)
+    assert not monitor._api_healthy() and len(calls) == 1
+    monitor.notifier.close()
+
+
+def test_request_timeout_is_clamped_to_the_cycle_budget(app_dir):
+    assert maindev.remaining_time(10) == 10
+    with maindev.cycle_budget(4):
+        assert maindev.remaining_time(10) == 4
+        maindev.clock.sleep(3)
+        assert maindev.remaining_time(10) == 1
+        maindev.clock.sleep(1)
+        with pytest.raises(maindev.DeadlineExceeded):
+            maindev.remaining_time(10)
+
+
+def test_limiter_refuses_slots_past_the_deadline(app_dir, monkeypatch):
+    now = maindev.clock.time()
+    monkeypatch.setattr(maindev, "_last_call", now + 1.5)
+    with maindev.cycle_budget(2):
+        with pytest.raises(maindev.DeadlineExceeded):
+            maindev.reserve_request_slot()
+    assert maindev._last_call == now + 1.5
+    with maindev.cycle_budget(5):
+        assert maindev.reserve_request_slot() == 2.5
+
+
+def test_hedge_delay_follows_recent_p95(app_dir):
+    policy = maindev.HedgePolicy()
+    assert policy.delay(10) is None
+    policy.enabled = True
+    assert policy.delay(10) is None  # too few samples yet
+    for i in range(100):
+        policy.latency.record(i / 100)
+    assert policy.delay(10) == 0.95
+    assert policy.delay(0.5) is None
+
+
+def test_hedges_are_capped_at_a_share_of_requests(app_dir):
+    policy = maindev.HedgePolicy()
+    policy.requests = 40
+    assert [policy.allow() for _ in range(3)] == [True, True, False]
+
+
+def test_hedged_get_returns_the_first_answer(app_dir, monkeypatch):
+    sent = []
+    released = threading.Event()
+
+    def send(session, method, url, kwargs):
+        sent.append(kwargs["timeout"])
+        if len(sent) == 1:
+            released.wait(5)
+            return "slow"
+        return "hedge"
+
+    monkeypatch.setattr(maindev, "_send", send)
+    monkeypatch.setattr(maindev, "hedging", maindev.HedgePolicy())
+    maindev.hedging.requests = 100
+    try:
+        assert maindev._hedged_get(None, "https://example.invalid", 0.05, {"timeout": 10}) == "hedge"
+    finally:
+        released.set()
+    assert sent == [10, pytest.approx(9.95)]
+
+
+def test_hedged_get_waits_for_the_original_when_over_the_cap(app_dir, monkeypatch):
+    monkeypatch.setattr(maindev, "_send", lambda session, method, url, kwargs: time.sleep(0.1) or "original")
+    monkeypatch.setattr(maindev, "hedging", maindev.HedgePolicy())
+    assert maindev._hedged_get(None, "https://example.invalid", 0.01, {"timeout": 10}) == "original"
+    assert maindev.hedging.hedges == 0
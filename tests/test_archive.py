@@ -0,0 +1,93 @@
+import os
+import shutil
+
+import maindev
+
+DAY = 86400
+START = 1_738_195_200  # 2025-01-30, so the rows cross into February
+
+
+def fill(storage):
+    for day in range(6):
+        for i in range(40):
+            ts = START + day * DAY + i * 1800 + 7
+            values = {"sales": day * 1000 + i * (i % 3), "pending": 500 - i}
+            if day == 3 and i == 5:
+                del values["pending"]  # does not fit a segment: stays as JSON lines
+            if day == 4 and i in (8, 9):
+                # Both fit int64 but the delta between them does not: stays as JSON lines.
+                values["sales"] = -2 ** 62 if i == 8 else 2 ** 63 - 1
+            storage.record_history("totals", values, ts=ts)
+
+
+def snapshot(storage):
+    query = maindev.HistoryQuery("totals", since=START + DAY // 2, until=START + 5 * DAY)
+    return {
+        "rows": list(storage.iter_history("totals")),
+        "window": list(storage.iter_history("totals", START + DAY + 3600, START + 4 * DAY)),
+        "agg": list(query.aggregate()),
+        "daily": list(query.aggregate("day")),
+        "range": list(query.range()),
+    }
+
+
+def test_archive_round_trip(app_dir):
+    storage = maindev.Storage()
+    fill(storage)
+    before = snapshot(storage)
+
+    report = maindev.archive_history(storage, "totals", maindev.utc_day(START + 6 * DAY))
+    assert report["days"] == 4 and report["skipped"] == 2
+    assert sorted(name for name in os.listdir(os.path.join(storage.history_dir, "totals")) if name.endswith(".seg")) == [
+        "2025-01.seg", "2025-02.seg"]
+    storage.close()
+
+    archived = maindev.Storage()
+    assert snapshot(archived) == before
+    archived.close()
+
+
+def test_interrupted_archive_leaves_no_duplicates(app_dir):
+    storage = maindev.Storage()
+    fill(storage)
+    before = snapshot(storage)
+    folder = os.path.join(storage.history_dir, "totals")
+    kept = os.path.join(str(app_dir), "kept.jsonl")
+    shutil.copy(os.path.join(folder, "2025-01-31.jsonl"), kept)
+
+    maindev.archive_history(storage, "totals", maindev.utc_day(START + 6 * DAY))
+    # A crash between writing the segment and removing the day files.
+    shutil.copy(kept, os.path.join(folder, "2025-01-31.jsonl"))
+    storage.close()
+
+    storage = maindev.Storage()
+    assert snapshot(storage) == before
+    maindev.archive_history(storage, "totals", maindev.utc_day(START + 6 * DAY))
+    assert not os.path.exists(os.path.join(folder, "2025-01-31.jsonl"))
+    storage.close()
+    storage = maindev.Storage()
+    assert snapshot(storage) == before
+    storage.close()
+
+
+def test_encode_day_rejects_values_outside_int64():
+    assert maindev.HistorySegment.encode_day([{"ts": 1, "robux": 2 ** 63}]) is None
+    # In range, but the delta between the two rows is not.
+    assert maindev.HistorySegment.encode_day([{"ts": 1, "robux": -2 ** 62}, {"ts": 2, "robux": 2 ** 63 - 1}]) is None
+
+
+def test_corrupt_segment_is_skipped(app_dir):
+    storage = maindev.Storage()
+    fill(storage)
+    maindev.archive_history(storage, "totals", maindev.utc_day(START + 2 * DAY))
+    path = os.path.join(storage.history_dir, "totals", "2025-01.seg")
+    storage.close()
+    with open(path, "r+b") as f:
+        # Garbles the compressed footer but keeps the trailer intact.
+        f.seek(-maindev.HistorySegment.TRAILER.size - 16, os.SEEK_END)
+        f.write(b"\xff" * 16)
+
+    storage = maindev.Storage()
+    assert storage.segment("totals", "2025-01") is None
+    assert all(row["ts"] >= START + 2 * DAY for row in storage.iter_history("totals"))
+    storage.close()
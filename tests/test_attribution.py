@@ -0,0 +1,72 @@
+import maindev
+
+
+def attribution_monitor(digest_window=0):
+    config = maindev.Config({"ROBLOSECURITY": "_|WARNING-test", "CYCLE_BUDGET": "0"})
+    monitor = maindev.Monitor(config=config, interactive=False)
+    monitor.notifier = maindev.DiscordNotifier("", "r", "1", sinks=[], digest_window=digest_window)
+    monitor.sent = []
+    monitor.notifier.send = lambda embed, sinks=None: monitor.sent.append(embed)
+    return monitor
+
+
+def attribute(monitor, balance, changes):
+    monitor._balance_change, monitor._totals_changes, monitor._totals_fetched = balance, changes, True
+    monitor._attribute()
+
+
+def test_attributed_alert_lists_every_changed_totals_field(app_dir):
+    monitor = attribution_monitor()
+    attribute(monitor, (100, 150), {"salesTotal": (0, 50), "pendingRobuxTotal": (0, 400), "incomingRobuxTotal": (0, 50)})
+    [embed] = monitor.sent
+    fields = {field["name"]: field["value"] for field in embed["fields"]}
+    assert list(fields) == ["Before", "After", "salesTotal", "pendingRobuxTotal", "incomingRobuxTotal"]
+    assert fields["salesTotal"].endswith("(+<:r:1> 50)")
+    assert "400" in fields["pendingRobuxTotal"]
+    monitor.storage.close()
+
+
+def test_totals_routed_away_from_the_balance_still_alert(app_dir):
+    monitor = attribution_monitor()
+    monitor.rules = maindev.RuleSet({"default": "drop", "rules": [{"field": "pendingRobuxTotal", "sinks": ["ops"]}]})
+    attribute(monitor, (100, 150), {"salesTotal": (0, 50), "pendingRobuxTotal": (0, 400)})
+    [embed] = monitor.sent
+    assert embed["title"] == "Roblox Transaction Updated"
+    assert [field["name"] for field in embed["fields"]] == ["pendingRobuxTotal"]
+    monitor.storage.close()
+
+
+def test_digest_keeps_totals_changed_alongside_the_balance(app_dir):
+    monitor = attribution_monitor(digest_window=3600)
+    attribute(monitor, (100, 150), {"salesTotal": (0, 50), "pendingRobuxTotal": (0, 400)})
+    assert monitor.sent == []
+    monitor.notifier.flush_digest(force=True)
+    [message] = monitor.sent
+    names = {embed["title"]: [field["name"] for field in embed["fields"]] for embed in message}
+    assert names == {"Robux Balance Changed (1h digest)": ["Robux"],
+                     "Roblox Transaction Updated (1h digest)": ["salesTotal", "pendingRobuxTotal"]}
+    monitor.storage.close()
+
+
+def test_digest_embeds_split_at_the_field_and_character_limits(app_dir):
+    notifier = maindev.DiscordNotifier("", "r", "1", sinks=[], digest_window=300)
+    fields = {f"field{i}": [i, i + 1, 1, i, i + 1] for i in range(60)}
+    embeds = notifier._digest_embeds("Totals", fields, -7)
+    assert [len(embed["fields"]) for embed in embeds] == [25, 25, 11]
+    assert embeds[0]["title"] == "Totals (5m digest)"
+    assert all(embed["title"] == "Totals (continued)" for embed in embeds[1:])
+    assert embeds[-1]["fields"][-1]["name"] == "⚠️ Unexplained"
+    wide = {"x" * 200 + str(i): [0, 1, 1, 0, 1] for i in range(24)}
+    embeds = notifier._digest_embeds("Totals", wide, 0)
+    assert len(embeds) > 1
+    assert all(maindev.embed_size(embed) <= maindev.DISCORD_MAX_CHARS for embed in embeds)
+
+
+def test_pack_embeds_respects_embed_and_character_limits():
+    small = [{"title": f"t{i}"} for i in range(23)]
+    assert [len(message) for message in maindev.pack_embeds(small)] == [10, 10, 3]
+    large = [{"title": "t", "description": "x" * 2500} for _ in range(5)]
+    messages = maindev.pack_embeds(large)
+    assert [len(message) for message in messages] == [2, 2, 1]
+    assert all(sum(maindev.embed_size(embed) for embed in message) <= maindev.DISCORD_MAX_CHARS for message in messages)
+    assert maindev.pack_embeds([]) == []
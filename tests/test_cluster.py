@@ -0,0 +1,62 @@
+import threading
+import time
+
+import maindev
+
+
+def test_exported_state_carries_the_account_status(app_dir):
+    config = maindev.Config({"ROBLOSECURITY": "_|WARNING-test"})
+    old = maindev.Monitor("_|WARNING-other", config=config, interactive=False)
+    old.last_status = {"is_banned": False, "username": "builder"}
+    new = maindev.Monitor("_|WARNING-other", config=config, interactive=False)
+    new.import_state(old.export_state())
+    alerts = []
+    new.notifier.account_status = lambda status, previous: alerts.append(status)
+    new._apply_status({"is_banned": False, "username": "builder"})
+    assert alerts == []
+    for monitor in (old, new):
+        monitor.storage.close()
+
+
+class StuckMonitor:
+    def __init__(self):
+        self.stop_event = threading.Event()
+
+    def export_state(self):
+        return {}
+
+
+def test_handoff_joins_share_one_budget(app_dir, tmp_path):
+    node = maindev.ClusterNode(str(tmp_path / "cluster.db"), "A", lease_ttl=0.6)
+    release = threading.Event()
+    for i in range(5):
+        thread = threading.Thread(target=release.wait, daemon=True)
+        thread.start()
+        node.held[f"fp{i}"] = {"epoch": 1, "monitor": StuckMonitor(), "thread": thread}
+
+    started = time.monotonic()
+    node._stop(list(node.held), handoff=True)
+    assert time.monotonic() - started < 0.5
+    assert node.held == {}
+    release.set()
+    node.store.close()
+
+
+def test_leases_start_from_the_clock_at_acquire(app_dir, tmp_path):
+    node = maindev.ClusterNode(str(tmp_path / "cluster.db"), "A", lease_ttl=30)
+    node._accounts = lambda: {"fp-a": "a", "fp-b": "b", "fp-c": "c"}
+
+    def slow_start(fp, cookie, epoch):
+        maindev.clock.sleep(8)  # login
+        node.held[fp] = {"epoch": epoch, "monitor": StuckMonitor(), "thread": None}
+
+    node._start = slow_start
+    started = maindev.clock.time()
+    node.tick()
+    assert sorted(node.held) == ["fp-a", "fp-b", "fp-c"]
+    # fp-b and fp-c were taken after slow logins; fp-a was renewed once the
+    # loop ran past a third of the TTL.
+    expires = dict(node.store.db.execute("SELECT account, expires FROM leases"))
+    assert expires == {"fp-a": started + 46, "fp-b": started + 46, "fp-c": started + 46}
+    assert node.renewed_at == started + 16
+    node.store.close()
@@ -0,0 +1,46 @@
+import pytest
+
+import maindev
+
+CODECS = [name for name in maindev.JSON_CODECS if name == "json" or maindev.orjson is not None]
+PAYLOAD = {"robux": 123456, "name": "Cool Hat ✨", "pending": False, "agent": None, "rate": 0.25,
+           "items": [{"id": 2 ** 53 + 1, "amount": -75}], "nested": {"a": [1, [2, {}]]}}
+
+
+@pytest.fixture(params=CODECS)
+def codec(request):
+    previous = maindev.use_codec(request.param)
+    yield maindev.codec
+    maindev.use_codec(previous.name)
+
+
+def test_round_trip(codec):
+    data = codec.dumps(PAYLOAD)
+    assert isinstance(data, bytes)
+    assert codec.loads(data) == PAYLOAD
+    assert codec.loads(data.decode()) == PAYLOAD
+
+
+@pytest.mark.parametrize("reader", CODECS)
+def test_codecs_read_each_other(codec, reader):
+    assert maindev.JSON_CODECS[reader]().loads(codec.dumps(PAYLOAD)) == PAYLOAD
+    assert codec.dumps({7: "x"}) == b'{"7":"x"}'
+
+
+def test_decode_json_uses_the_active_codec(codec):
+    class Response:
+        content = codec.dumps(PAYLOAD)
+
+    assert maindev.decode_json(Response()) == PAYLOAD
+
+
+def test_journal_survives_a_codec_switch(codec, tmp_path):
+    journal = maindev.Journal(str(tmp_path))
+    journal.put("robux", 10)
+    journal.patch("transactions", {"sales": 3})
+    journal.close()
+    for name in CODECS:
+        maindev.use_codec(name)
+        reopened = maindev.Journal(str(tmp_path))
+        assert reopened.get("robux") == 10 and reopened.get("transactions") == {"sales": 3}
+        reopened.close()
@@ -0,0 +1,62 @@
+import csv
+
+import pytest
+
+import maindev
+
+START = 1_759_900_000
+
+
+@pytest.fixture
+def history(app_dir):
+    for account, directory in (("primary", maindev.STORAGE_DIR), ("5f0c9d1e2a3b4c6d", f"{maindev.STORAGE_DIR}/accounts/5f0c9d1e2a3b4c6d")):
+        storage = maindev.Storage(directory)
+        for i in range(5):
+            storage.record_history("robux", {"robux": 100 * i}, ts=START + 60 * i)
+        storage.close()
+
+
+def test_csv_export_covers_every_account(history, tmp_path):
+    output = str(tmp_path / "robux.csv")
+    assert maindev.HistoryExporter("robux", since=START + 60).export("csv", output) == 8
+    with open(output, newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["account", "ts", "robux"]
+    assert sorted({row[0] for row in rows[1:]}) == ["5f0c9d1e2a3b4c6d", "primary"]
+    assert [row[2] for row in rows[1:5]] == ["100", "200", "300", "400"]
+
+
+def test_chunk_export_round_trips(history, tmp_path, monkeypatch):
+    monkeypatch.setattr(maindev.HistoryExporter, "CHUNK_ROWS", 3)
+    output = str(tmp_path / "robux.chunks")
+    exporter = maindev.HistoryExporter("robux", accounts=["primary"])
+    assert exporter.export("chunks", output) == 5
+    chunks = list(maindev.HistoryExporter.read_chunks(output))
+    assert [chunk["rows"] for chunk in chunks] == [3, 2]
+    assert sum((chunk["columns"]["robux"] for chunk in chunks), []) == [0, 100, 200, 300, 400]
+    assert {account for chunk in chunks for account in chunk["columns"]["account"]} == {"primary"}
+
+
+def test_schemaless_kinds_take_columns_from_the_first_row(app_dir):
+    exporter = maindev.HistoryExporter("revenue")
+    columns, rows = exporter.columns(iter([{"account": "group:7", "ts": 1, "sales": 5}]))
+    assert columns == ["account", "ts", "sales"]
+    assert list(rows) == [{"account": "group:7", "ts": 1, "sales": 5}]
+    assert exporter.columns(iter(()))[0] == ["account", "ts"]
+
+
+def test_rows_close_storage_when_the_consumer_stops(history, monkeypatch):
+    closed = []
+    close = maindev.Storage.close
+    monkeypatch.setattr(maindev.Storage, "close", lambda self: closed.append(self) or close(self))
+    rows = maindev.HistoryExporter("robux").rows()
+    next(rows)
+    rows.close()
+    assert len(closed) == 1
+    assert len(list(maindev.HistoryExporter("robux").rows())) == 10
+    assert len(closed) == 3
+
+
+def test_unknown_format_is_rejected(history, tmp_path):
+    with pytest.raises(ValueError):
+        maindev.HistoryExporter("robux").export("xml", str(tmp_path / "out"))
@@ -0,0 +1,51 @@
+import pytest
+
+import maindev
+
+
+def group_monitor(group_ids="7"):
+    config = maindev.Config({"ROBLOSECURITY": "_|WARNING-test", "GROUP_IDS": group_ids})
+    monitor = maindev.Monitor(config=config, interactive=False)
+    monitor.sent = []
+    monitor.notifier.transaction_change = lambda changes, **kwargs: monitor.sent.append(changes)
+    return monitor
+
+
+def test_first_group_revenue_reading_is_the_baseline(app_dir):
+    monitor = group_monitor()
+    monitor._apply_group_revenue("7", {"sales": 120, "pendingRobux": 40})
+    assert monitor.sent == []
+    assert monitor.group_storage["7"].load_transactions() == {"sales": 120, "pendingRobux": 40}
+
+    monitor._apply_group_revenue("7", {"sales": 150, "pendingRobux": 40})
+    assert monitor.sent == [{"sales": (120, 150)}]
+    for storage in (monitor.storage, *monitor.group_storage.values()):
+        storage.close()
+    monitor.pool.shutdown()
+
+
+def test_groups_cut_off_by_the_budget_go_first_next_cycle(app_dir):
+    monitor = group_monitor("1,2,3,4")
+    late = {"3", "4"}
+
+    def check_group(gid):
+        if gid in late:
+            raise maindev.DeadlineExceeded("no rate-limit slot left before the cycle deadline")
+        if gid == "2":
+            raise ConnectionError("offline")
+
+    monitor._check_group = check_group
+    with pytest.raises(maindev.DeadlineExceeded):
+        monitor._check_groups()
+    assert monitor._groups_in_turn() == ["3", "4", "1", "2"]
+
+    late = {"1"}
+    with pytest.raises(maindev.DeadlineExceeded):
+        monitor._check_groups()
+    assert monitor._groups_in_turn() == ["1", "2", "3", "4"]
+
+    late = set()
+    monitor._check_groups()  # other errors are reported, not raised
+    for storage in (monitor.storage, *monitor.group_storage.values()):
+        storage.close()
+    monitor.pool.shutdown()
@@ -0,0 +1,88 @@
+import os
+
+import pytest
+
+import maindev
+
+
+def test_torn_tail_is_dropped_on_recovery(tmp_path):
+    journal = maindev.Journal(str(tmp_path))
+    journal.put("robux", 10)
+    journal.patch("transactions", {"sales": 3})
+    journal.close()
+    with open(journal.journal_file, "ab") as f:
+        f.write(b'{"k":"robux","v":99')  # crash mid-append
+    size = os.path.getsize(journal.journal_file)
+
+    journal = maindev.Journal(str(tmp_path))
+    assert journal.get("robux") == 10
+    assert journal.get("transactions") == {"sales": 3}
+    assert os.path.getsize(journal.journal_file) < size
+    journal.put("robux", 11)
+    journal.close()
+    assert maindev.Journal(str(tmp_path)).get("robux") == 11
+
+
+
+def test_tail_missing_its_newline_is_dropped(tmp_path):
+    journal = maindev.Journal(str(tmp_path))
+    journal.put("robux", 2)
+    journal.close()
+    with open(journal.journal_file, "ab") as f:
+        f.write(b'{"k":"robux","v":3}')  # parses, but the newline never made it
+
+    journal = maindev.Journal(str(tmp_path))
+    assert journal.get("robux") == 2
+    journal.put("robux", 4)
+    journal.put("robux", 5)
+    journal.patch("transactions", {"sales": 1})
+    journal.close()
+
+    reopened = maindev.Journal(str(tmp_path))
+    assert reopened.get("robux") == 5
+    assert reopened.get("transactions") == {"sales": 1}
+    reopened.close()
+
+def test_compaction_folds_the_log_into_the_snapshot(tmp_path, monkeypatch):
+    monkeypatch.setattr(maindev.Journal, "COMPACT_BYTES", 512)
+    journal = maindev.Journal(str(tmp_path))
+    for robux in range(100):
+        journal.put("robux", robux)
+        journal.patch("transactions", {"sales": robux})
+    assert os.path.getsize(journal.journal_file) < 512
+    assert os.path.exists(journal.snapshot_file)
+    journal.close()
+
+    reopened = maindev.Journal(str(tmp_path))
+    assert reopened.get("robux") == 99
+    assert reopened.get("transactions") == {"sales": 99}
+    reopened.close()
+
+
+def test_close_syncs_pending_records(tmp_path, monkeypatch):
+    synced = []
+    monkeypatch.setattr(maindev.os, "fsync", synced.append)
+    journal = maindev.Journal(str(tmp_path))
+    journal.put("robux", 1)
+    assert journal._unsynced == 1
+    journal.close()
+    assert journal._unsynced == 0 and synced
+
+
+def test_second_writer_is_refused(app_dir):
+    first, second = maindev.Storage(), maindev.Storage()
+    first.save_robux(5)
+    with pytest.raises(maindev.StorageBusy):
+        second.save_robux(6)
+    first.close()
+    assert second.load_robux() == 5
+    second.close()
+
+
+def test_export_does_not_take_the_writer_lock(app_dir):
+    writer = maindev.Storage()
+    writer.save_robux(7)
+    reader = maindev.Storage()
+    assert reader.export_state()["robux"] == 7
+    reader.close()
+    writer.close()
@@ -0,0 +1,69 @@
+import pytest
+
+import maindev
+
+
+class Listing:
+    # Newest-first transaction listing, PAGE items per page.
+    PAGE = 30
+
+    def __init__(self, count):
+        self.ids = list(range(count, 0, -1))
+
+    def add(self, count):
+        top = self.ids[0]
+        self.ids = list(range(top + count, top, -1)) + self.ids
+
+    def page(self, tx_type, cursor):
+        # Cursors name the last id served, so they stay valid as new rows arrive.
+        older = [i for i in self.ids if cursor is None or i < int(cursor)]
+        chunk = older[:self.PAGE]
+        more = len(older) > self.PAGE
+        return {"data": [{"id": i} for i in chunk], "nextPageCursor": str(chunk[-1]) if more else None}
+
+
+@pytest.fixture
+def monitor(app_dir):
+    config = maindev.Config({"ROBLOSECURITY": "_|WARNING-test", "TRANSACTION_TYPES": "Sale", "CYCLE_BUDGET": "0"})
+    mon = maindev.Monitor(config=config, interactive=False)
+    mon.notifier = maindev.DiscordNotifier("", "r", "1", sinks=[])
+    mon.delivered = []
+    original = mon._flush_transactions
+
+    def flush(tx_type, batch):
+        if mon.fail_after is not None and len(mon.delivered) >= mon.fail_after:
+            raise ConnectionError("network down")
+        mon.delivered.extend(item["id"] for item in batch)
+        return original(tx_type, batch)
+
+    mon.fail_after = None
+    mon._flush_transactions = flush
+    yield mon
+    mon.storage.close()
+
+
+def test_ledger_is_off_by_default(app_dir):
+    assert maindev.DEFAULT_CONFIG["TRANSACTION_TYPES"] == ""
+    mon = maindev.Monitor(config=maindev.Config({"ROBLOSECURITY": "_|WARNING-test"}), interactive=False)
+    assert "ledger" not in [check.name for check in mon._checks()]
+    mon.storage.close()
+
+
+@pytest.mark.parametrize("fail_after", [0, 25, 30, 55, 60, 85, 130])
+def test_interrupted_walk_resumes_without_duplicates(monitor, fail_after):
+    listing = Listing(10)
+    monitor.api.get_transactions_page = listing.page
+    monitor._check_transaction_log()  # first run only records the high-water mark
+    assert monitor.delivered == []
+
+    listing.add(150)
+    monitor.fail_after = fail_after
+    with pytest.raises(ConnectionError):
+        monitor._check_transaction_log()
+    listing.add(7)  # arrives while the walk is interrupted
+    monitor.fail_after = None
+    for _ in range(5):
+        monitor._check_transaction_log()
+
+    assert sorted(monitor.delivered) == list(range(11, 168))
+    assert len(monitor.delivered) == len(set(monitor.delivered))
@@ -0,0 +1,23 @@
+import maindev
+
+
+class InterruptingStats(dict):
+    # Stand-in for a SIGUSR1 dump landing while record() holds the lock.
+    def __init__(self, profiler, *args):
+        super().__init__(*args)
+        self.profiler = profiler
+        self.reports = []
+
+    def get(self, name, default=None):
+        self.reports.append(self.profiler.report())
+        return super().get(name, default)
+
+
+def test_report_from_inside_record_does_not_deadlock():
+    profiler = maindev.PhaseProfiler()
+    profiler.mode = "phases"
+    profiler.record("network", 0.002)
+    profiler._stats = stats = InterruptingStats(profiler, profiler._stats)
+    profiler.record("storage", 0.001)
+    assert "network" in stats.reports[0]
+    assert "storage" in profiler.report()
@@ -0,0 +1,117 @@
+import heapq
+import random
+
+import pytest
+
+import maindev
+
+DAY = 86400
+START = 1_759_968_000 - 9 * DAY  # UTC midnight, nine days before the test clock
+ACCOUNTS = ("primary", "5f0c9d1e2a3b4c6d")
+
+
+def directory(account):
+    return maindev.STORAGE_DIR if account == "primary" else f"{maindev.STORAGE_DIR}/accounts/{account}"
+
+
+@pytest.fixture(params=["jsonl", "archived"])
+def history(app_dir, request):
+    # Irregular row spacing; on days 3 and 6 the evening rows lack "pending",
+    # so those days keep JSON lines and their last row misses a field.
+    rng = random.Random(48)
+    source = {}
+    for account in ACCOUNTS:
+        storage = maindev.Storage(directory(account))
+        rows, sales, ts = [], 1000, START
+        while ts < START + 9 * DAY:
+            ts += rng.choice((60, 600, 3600, 5 * 3600))
+            sales += rng.randint(-40, 60)
+            row = {"ts": ts, "sales": sales}
+            if (ts - START) // DAY not in (3, 6) or (ts - START) % DAY < 20 * 3600:
+                row["pending"] = rng.randint(0, 500)
+            storage.record_history("totals", {k: v for k, v in row.items() if k != "ts"}, ts=ts)
+            rows.append(row)
+        if request.param == "archived":
+            report = maindev.archive_history(storage, "totals", maindev.utc_day(START + 7 * DAY))
+            assert report["days"] > 0
+        storage.close()
+        source[account] = rows
+    return source
+
+
+def brute_summary(values):
+    gain = sum(max(0, b - a) for a, b in zip(values, values[1:]))
+    return {"count": len(values), "first": values[0], "last": values[-1], "min": min(values), "max": max(values),
+            "mean": round(sum(values) / len(values), 2), "delta": values[-1] - values[0], "gain": gain}
+
+
+def brute_aggregate(source, since, until, by_day=False):
+    out = []
+    for account, rows in source.items():
+        groups = {}
+        for row in rows:
+            if since <= row["ts"] < until:
+                key = maindev.utc_day(row["ts"]) if by_day else None
+                for field, value in row.items():
+                    if field != "ts":
+                        groups.setdefault(key, {}).setdefault(field, []).append(value)
+        for key in sorted(groups, key=str):
+            for field, values in groups[key].items():
+                head = {"account": account, "day": key} if by_day else {"account": account}
+                out.append({**head, "field": field, **brute_summary(values)})
+    return out
+
+
+def as_set(rows):
+    return sorted(sorted(row.items()) for row in rows)
+
+
+WINDOW = (START + 2 * DAY + 5000, START + 8 * DAY - 7000)
+
+
+def test_aggregate_matches_brute_force(history):
+    query = maindev.HistoryQuery("totals", *WINDOW)
+    assert as_set(query.aggregate()) == as_set(brute_aggregate(history, *WINDOW))
+    assert as_set(query.aggregate("day")) == as_set(brute_aggregate(history, *WINDOW, by_day=True))
+
+
+def test_range_matches_brute_force(history):
+    query = maindev.HistoryQuery("totals", *WINDOW, fields=["pending"])
+    expected = [{"account": account, "ts": row["ts"], **({"pending": row["pending"]} if "pending" in row else {})}
+                for account, rows in history.items() for row in rows if WINDOW[0] <= row["ts"] < WINDOW[1]]
+    assert list(query.range()) == expected
+
+
+@pytest.mark.parametrize("every", [3600, 5 * 3600 + 17, DAY])
+def test_sampled_range_matches_brute_force(history, every):
+    query = maindev.HistoryQuery("totals", *WINDOW)
+    expected = []
+    for account, rows in history.items():
+        point = WINDOW[0]
+        while point < WINDOW[1]:
+            before = [row for row in rows if row["ts"] <= point]
+            if before:
+                expected.append({"account": account, "at": int(point), **before[-1]})
+            point += every
+    assert list(query.range(every)) == expected
+
+
+@pytest.mark.parametrize("metric", ["gain", "delta", "max", "count"])
+def test_top_by_field_matches_brute_force(history, metric):
+    totals = {}
+    for row in brute_aggregate(history, *WINDOW):
+        entry = totals.setdefault(row["field"], {"field": row["field"], metric: 0, "accounts": 0})
+        entry[metric] += row[metric]
+        entry["accounts"] += 1
+    expected = heapq.nlargest(5, totals.values(), key=lambda row: row[metric])
+    assert maindev.HistoryQuery("totals", *WINDOW).top(5, metric, group="field") == expected
+
+
+def test_indexes_close_storage_when_the_consumer_stops(history, monkeypatch):
+    closed = []
+    close = maindev.Storage.close
+    monkeypatch.setattr(maindev.Storage, "close", lambda self: closed.append(self) or close(self))
+    indexes = maindev.HistoryQuery("totals").indexes()
+    next(indexes)
+    indexes.close()
+    assert len(closed) == 1
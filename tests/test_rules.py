@@ -0,0 +1,72 @@
+import json
+from datetime import datetime
+
+import maindev
+
+NOW = 1_760_000_000
+
+
+def write_rules(app_dir, spec):
+    path = app_dir / "rules.json"
+    path.write_text(json.dumps(spec))
+    return maindev.Config({"RULES_FILE": str(path)})
+
+
+def test_rules_file_must_be_an_object(app_dir):
+    config = write_rules(app_dir, [{"field": "robux"}])
+    assert maindev.load_rules(config) is None
+    monitor = maindev.Monitor(config=maindev.Config({"ROBLOSECURITY": "_|WARNING-test"}), interactive=False)
+    assert monitor.rules is None
+    monitor.storage.close()
+    config = write_rules(app_dir, {"rules": [{"field": "robux"}]})
+    assert len(maindev.load_rules(config).rules) == 1
+
+
+def test_invalid_rules_are_skipped(app_dir):
+    rules = maindev.RuleSet({"rules": [{"field": "robux", "direction": "sideways"}, {"field": "robux"}, "robux"]})
+    assert [rule.name for rule in rules.rules] == ["rule-2"]
+
+
+def test_conditions_must_all_hold():
+    rule = maindev.AlertRule({"direction": "up", "min_delta": 100, "above": 1000}, 0)
+    assert rule.matches(950, 1050, NOW, ())
+    assert not rule.matches(990, 1050, NOW, ())  # moved less than min_delta
+    assert not rule.matches(1050, 950, NOW, ())  # wrong direction
+    assert not rule.matches(1050, 1200, NOW, ())  # already above
+    below = maindev.AlertRule({"below": 10}, 0)
+    assert below.matches(20, 10, NOW, ()) and not below.matches(10, 5, NOW, ())
+
+
+def test_quiet_hours_suppress_matches():
+    local = datetime.fromtimestamp(NOW)
+    start = f"{local.hour:02d}:00"
+    end = f"{(local.hour + 1) % 24:02d}:00"
+    rule = maindev.AlertRule({"quiet_hours": f"{start}-{end}"}, 0)
+    assert rule.is_quiet(NOW) and not rule.matches(1, 2, NOW, ())
+    assert not rule.is_quiet(NOW + 2 * 3600) and rule.matches(1, 2, NOW + 2 * 3600, ())
+
+
+def test_rate_rule_fires_on_net_movement_within_the_window():
+    rules = maindev.RuleSet({"default": "drop", "rules": [{"field": "robux", "rate_per_hour": 1000, "window": 600}]})
+    history = {}
+    # 1000/h over a 10 minute window allows about 166 of net movement.
+    assert rules.route("primary", {"robux": (1000, 1100)}, NOW, history) == []
+    assert rules.route("primary", {"robux": (1100, 1180)}, NOW + 60, history) == [(None, {"robux": (1100, 1180)})]
+    assert rules.route("primary", {"robux": (1180, 1200)}, NOW + 900, history) == []
+
+
+def test_route_groups_changes_by_destination():
+    rules = maindev.RuleSet({
+        "default": "alert",
+        "rules": [
+            {"field": "salesTotal", "min_delta": 1000, "sinks": ["ops"]},
+            {"field": "salesTotal", "accounts": ["primary"], "sinks": ["audit"]},
+            {"field": "robux", "accounts": ["group:7"], "sinks": ["ops"]},
+        ]
+    })
+    routes = dict(rules.route("primary", {"salesTotal": (0, 5000), "robux": (1, 2), "pendingRobuxTotal": (0, 3)}, NOW, {}))
+    assert routes == {frozenset({"ops", "audit"}): {"salesTotal": (0, 5000)},
+                      None: {"robux": (1, 2), "pendingRobuxTotal": (0, 3)}}
+    # Covered by rules that do not match: no alert, even with an "alert" default.
+    assert rules.route("other", {"salesTotal": (0, 5)}, NOW, {}) == []
+    assert rules.route("group:7", {"robux": (1, 2)}, NOW, {}) == [(frozenset({"ops"}), {"robux": (1, 2)})]
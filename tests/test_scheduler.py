@@ -0,0 +1,124 @@
+import maindev
+
+NOW = 1_760_000_000
+
+
+def checks(*specs):
+    return [maindev.Check(name, lambda: None, interval, priority) for name, interval, priority in specs]
+
+
+def test_due_checks_run_in_priority_order(app_dir):
+    scheduler = maindev.CheckScheduler()
+    robux, totals, status = checks(("robux", 10, 5), ("totals", 60, 1), ("status", 300, 9))
+    scheduler.add(status, NOW)
+    scheduler.add(robux, NOW)
+    scheduler.add(totals, NOW + 5)
+    assert scheduler.pop_due(NOW) == [robux, status]
+    assert scheduler.next_due() == NOW + 5
+    assert scheduler.pop_due(NOW + 5) == [totals]
+    assert scheduler.pop_due(NOW + 100) == []
+
+
+def test_each_check_keeps_its_own_interval(app_dir):
+    scheduler = maindev.CheckScheduler()
+    robux, totals = checks(("robux", 10, 1), ("totals", 60, 2))
+    for check in (robux, totals):
+        scheduler.add(check, NOW)
+    runs = {"robux": 0, "totals": 0}
+    for second in range(NOW, NOW + 120):
+        due = scheduler.pop_due(second)
+        for check in due:
+            runs[check.name] += 1
+        scheduler.reschedule(due, second)
+    assert runs == {"robux": 12, "totals": 2}
+
+
+def test_late_checks_are_not_replayed(app_dir):
+    scheduler = maindev.CheckScheduler()
+    [robux] = checks(("robux", 10, 1))
+    scheduler.add(robux, NOW)
+    scheduler.reschedule(scheduler.pop_due(NOW + 95), NOW + 95)
+    assert robux.due == NOW + 95
+    assert len(scheduler.pop_due(NOW + 95)) == 1
+
+
+def test_deferred_checks_keep_their_due_time(app_dir):
+    scheduler = maindev.CheckScheduler()
+    robux, totals = checks(("robux", 10, 1), ("totals", 60, 2))
+    for check in (robux, totals):
+        scheduler.add(check, NOW)
+    assert scheduler.pop_due(NOW) == [robux, totals]
+    scheduler.defer([totals])
+    scheduler.reschedule([robux], NOW)
+    assert scheduler.pop_due(NOW) == [totals]
+    assert robux.due == NOW + 10
+
+
+def test_budget_overrun_is_retried_once(app_dir):
+    monitor = maindev.Monitor(config=maindev.Config({"ROBLOSECURITY": "_|WARNING-test"}), interactive=False)
+    [totals] = checks(("totals", 60, 2))
+    monitor.scheduler = maindev.CheckScheduler()
+    monitor.scheduler.add(totals, NOW)
+    for expected in (NOW, NOW + 60):
+        due = monitor.scheduler.pop_due(NOW)
+        monitor._settle(due, overran=due)
+        assert totals.due == expected
+    monitor.storage.close()
+
+
+def test_spread_slots_are_stable_per_user(app_dir):
+    slots = []
+    for _ in range(2):
+        scheduler = maindev.CheckScheduler()
+        robux, totals = checks(("robux", 60, 1), ("totals", 600, 2))
+        for check in (robux, totals):
+            scheduler.add(check, NOW)
+        scheduler.spread("1234", NOW)
+        slots.append((robux.slot % 60, totals.slot % 600, robux.due, totals.due))
+        for check in (robux, totals):
+            assert NOW <= check.slot < NOW + check.interval
+            assert check.slot <= check.due <= check.slot + min(check.interval * 0.05, 5.0)
+    assert slots[0] == slots[1]
+
+
+def test_spread_flattens_a_fleet_started_at_once(app_dir):
+    starts = []
+    for user in range(600):
+        scheduler = maindev.CheckScheduler()
+        [robux] = checks(("robux", 60, 1))
+        scheduler.add(robux, NOW)
+        scheduler.spread(str(user), NOW)
+        starts.append(int(robux.slot - NOW))
+    per_second = [starts.count(second) for second in range(60)]
+    assert max(per_second) <= 25 and min(per_second) > 0
+
+
+def test_spread_checks_stay_on_their_grid(app_dir):
+    scheduler = maindev.CheckScheduler()
+    [robux] = checks(("robux", 60, 1))
+    scheduler.add(robux, NOW)
+    scheduler.spread("1234", NOW)
+    slot = robux.slot
+    scheduler.reschedule(scheduler.pop_due(robux.due), robux.due)
+    assert robux.slot == slot + 60
+    # After a long stall the next run lands within one interval of now,
+    # still on the grid, instead of replaying every missed slot.
+    late = slot + 3600
+    scheduler.reschedule(scheduler.pop_due(late), late)
+    assert late - 60 < robux.slot <= late and (robux.slot - slot) % 60 == 0
+
+
+def test_peak_to_mean_over_the_meter_window(app_dir):
+    meter = maindev.RequestRateMeter()
+    for second in range(100):
+        for _ in range(10 if second == 50 else 1):
+            meter.record(NOW + second)
+    summary = meter.smoothness(meter.buckets(NOW + 99), NOW + 99)
+    assert summary == {"rps_mean": 1.09, "rps_peak": 10, "peak_to_mean": 9.17}
+    flat = {NOW + second: 2 for second in range(50)}
+    assert maindev.RequestRateMeter.smoothness(flat, NOW + 49)["peak_to_mean"] == 1.0
+    # Idle seconds since the first request count as zero.
+    assert maindev.RequestRateMeter.smoothness({NOW: 4}, NOW + 3)["rps_mean"] == 1.0
+    assert maindev.RequestRateMeter.smoothness({}, NOW)["peak_to_mean"] == 0.0
+    meter.record(NOW + maindev.RequestRateMeter.WINDOW + 50)
+    assert min(meter.buckets(NOW + maindev.RequestRateMeter.WINDOW + 50)) > NOW
@@ -0,0 +1,67 @@
+import threading
+
+import maindev
+
+
+class RecordingSink(maindev.NotificationSink):
+    def __init__(self, name, gate=None, fail=0, **kwargs):
+        super().__init__(name, **kwargs)
+        self.gate = gate
+        self.fail = fail
+        self.delivered = []
+
+    def deliver(self, embed):
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.fail:
+            self.fail -= 1
+            raise ConnectionError("endpoint down")
+        self.delivered.append(embed)
+
+
+def test_a_dead_sink_only_backs_up_its_own_queue(app_dir):
+    gate = threading.Event()
+    dead, live = RecordingSink("dead", gate=gate), RecordingSink("live")
+    dead.MAX_PENDING = 3
+    notifier = maindev.DiscordNotifier("", "r", "1", sinks=[dead, live])
+    for i in range(5):
+        notifier.send({"title": str(i)})
+    live.close()
+    assert [embed["title"] for embed in live.delivered] == ["0", "1", "2", "3", "4"]
+    assert dead.pending == 3 and dead.failures == 2
+    gate.set()
+    dead.close()
+    assert dead.pending == 0 and len(dead.delivered) == 3
+
+
+def test_routed_alerts_reach_only_the_named_sinks(app_dir):
+    ops, audit = RecordingSink("ops"), RecordingSink("audit")
+    notifier = maindev.DiscordNotifier("", "r", "1", sinks=[ops, audit])
+    notifier.send({"title": "ops only"}, frozenset({"ops"}))
+    notifier.send({"title": "everyone"})
+    notifier.close()
+    assert [embed["title"] for embed in ops.delivered] == ["ops only", "everyone"]
+    assert [embed["title"] for embed in audit.delivered] == ["everyone"]
+
+
+def test_failed_deliveries_are_retried_then_counted(app_dir):
+    flaky = RecordingSink("flaky", fail=1, timeout=0.01, retries=1)
+    down = RecordingSink("down", fail=5, timeout=0.01, retries=1)
+    for sink in (flaky, down):
+        sink.submit({"title": "x"})
+        sink.close()
+    assert (len(flaky.delivered), flaky.failures) == (1, 0)
+    assert (len(down.delivered), down.failures) == (0, 1)
+
+
+def test_file_sink_writes_one_line_per_embed(app_dir, tmp_path):
+    path = tmp_path / "alerts.jsonl"
+    sinks = maindev.build_sinks(maindev.Config({"NOTIFY_SINKS": [
+        {"type": "file", "path": str(path)},
+        {"type": "discord", "url": "https://example.invalid/hook"},
+        {"type": "pager"},
+    ]}))
+    assert [sink.name for sink in sinks] == ["file-1"]
+    sinks[0].submit([{"title": "a"}, {"title": "b"}])
+    sinks[0].close()
+    assert [maindev.codec.loads(line)["title"] for line in path.read_bytes().splitlines()] == ["a", "b"]
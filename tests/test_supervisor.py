@@ -0,0 +1,55 @@
+import queue
+import threading
+
+import maindev
+
+
+def test_changing_the_worker_count_moves_few_accounts():
+    accounts = [f"_|WARNING-{i}" for i in range(2000)]
+
+    def owners(workers):
+        return {cookie: shard for shard, cookies in enumerate(maindev.Supervisor.split(accounts, workers)) for cookie in cookies}
+
+    before, after = owners(4), owners(5)
+    moved = sum(before[cookie] != after[cookie] for cookie in accounts)
+    assert moved < len(accounts) * 0.3
+    assert set(after.values()) == set(range(5))
+
+
+class FakeMonitor:
+    def __init__(self):
+        self.stop_event = threading.Event()
+        self.stats = {"cycles": 0, "errors": 0, "changes": 0}
+
+    def run(self):
+        self.stop_event.wait()
+
+
+def test_shard_worker_retries_and_follows_reassignment(monkeypatch):
+    monkeypatch.setattr(maindev.Supervisor, "RETRY_BACKOFF", 0.01)
+    attempts, started = [], {}
+
+    def start(shard_id, cookie, config, events):
+        attempts.append(cookie)
+        if cookie == "b" and attempts.count("b") < 3:
+            return None  # locked elsewhere or auth failed, at first
+        started[cookie] = FakeMonitor()
+        return started[cookie]
+
+    monkeypatch.setattr(maindev, "_start_shard_monitor", start)
+    events, stop, control = queue.Queue(), threading.Event(), queue.Queue()
+
+    def drive():
+        while "b" not in started:
+            threading.Event().wait(0.01)
+        control.put(["b", "c"])
+        while "c" not in started:
+            threading.Event().wait(0.01)
+        stop.set()
+        control.put(None)
+
+    threading.Thread(target=drive, daemon=True).start()
+    maindev._shard_worker(0, ["a", "b"], {}, events, stop, control)
+
+    assert attempts.count("b") == 3 and attempts.count("a") == 1 and attempts.count("c") == 1
+    assert all(monitor.stop_event.is_set() for monitor in started.values())